@@ -0,0 +1,93 @@
+import os
+import asyncio
+from typing import Awaitable, Callable, List
+
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", 16))
+LLM_BATCH_WAIT = float(os.getenv("LLM_BATCH_WAIT", 0.05))  # seconds a partial batch waits for company
+LLM_BATCHES_IN_FLIGHT = int(os.getenv("LLM_BATCHES_IN_FLIGHT", 2))
+
+
+class MicroBatcher:
+    """Gathers single prompts from many callers into batched LLM calls.
+
+    `submit(prompt)` queues the prompt and waits for its own result. A batch
+    is sent when `max_batch_size` prompts are queued or `max_wait` seconds
+    after the first one arrived, whichever comes first, and at most
+    `max_in_flight` batches run at once. `dispatch` takes a list of prompts
+    and returns one result per prompt, an exception in place of a failed
+    one (ProviderRouter.abatch has this shape); each caller gets its own
+    result or exception back.
+
+    Meant for background and bulk work (check-ins, handbooks), where a few
+    tens of milliseconds of extra latency buy much higher throughput. Use
+    one instance per event loop.
+    """
+
+    def __init__(self, dispatch: Callable[[List[str]], Awaitable[list]],
+                 max_batch_size: int = LLM_BATCH_SIZE, max_wait: float = LLM_BATCH_WAIT,
+                 max_in_flight: int = LLM_BATCHES_IN_FLIGHT):
+        self.dispatch = dispatch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._queue = []  # (prompt, future)
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, prompt: str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((prompt, future))
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            batch, self._queue = self._queue[:self.max_batch_size], self._queue[self.max_batch_size:]
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list):
+        async with self._slots:
+            # Callers that gave up while the batch waited for a slot don't need an answer
+            batch = [(prompt, future) for prompt, future in batch if not future.done()]
+            if not batch:
+                return
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await self.dispatch([prompt for prompt, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            if len(results) != len(batch):
+                results = [RuntimeError(f"Batch returned {len(results)} results for {len(batch)} prompts")] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def drain(self):
+        """Send whatever is queued and wait for every batch in flight"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queued": len(self._queue),
+        }
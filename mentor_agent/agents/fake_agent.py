@@ -0,0 +1,50 @@
+import os
+import time
+import random
+import asyncio
+
+
+class FakeMentorAgent:
+    """Deterministic stand-in for an LLM provider, for tests and benchmarks.
+
+    Replies echo the start of the prompt in the same RESPONSE/SENTIMENT/TOPIC
+    layout the mentor prompt asks for, after `latency` seconds. A
+    `failure_rate` between 0 and 1 makes that share of calls raise.
+    """
+    cost_per_1k_tokens = 0.0
+
+    def __init__(self, name: str = "fake", latency: float = None, failure_rate: float = 0.0, seed: int = 0):
+        self.name = name
+        self.latency = float(os.getenv("FAKE_LLM_LATENCY", 0.05)) if latency is None else latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _reply(self, user_input: str) -> dict:
+        self.calls += 1
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise RuntimeError(f"{self.name} provider failure")
+        return {
+            "input": user_input,
+            "output": f"RESPONSE:\nHere is some guidance ({len(user_input)} chars of context).\n\n"
+                      f"SENTIMENT: neutral\nTOPIC: general",
+        }
+
+    def run(self, user_input: str):
+        time.sleep(self.latency)
+        return self._reply(user_input)
+
+    async def arun(self, user_input: str):
+        await asyncio.sleep(self.latency)
+        return self._reply(user_input)
+
+    async def abatch(self, user_inputs: list) -> list:
+        """Answers the whole batch after a single `latency`, like a server-side batch"""
+        await asyncio.sleep(self.latency)
+        results = []
+        for user_input in user_inputs:
+            try:
+                results.append(self._reply(user_input))
+            except RuntimeError as e:
+                results.append(e)
+        return results
@@ -1,6 +1,6 @@
 import os
 from langchain_groq import ChatGroq
-from langchain.agents import initialize_agent, AgentType
+from mentor_agent.agents.llm_gateway import get_gateway, LLM_BATCH_CONCURRENCY
 
 from dotenv import load_dotenv, find_dotenv
 
@@ -8,20 +8,79 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 load_dotenv(find_dotenv(".env.local"))
 
+LLM_VERBOSE = os.getenv("LLM_VERBOSE", "false").lower() == "true"
+EXPECTED_COMPLETION_TOKENS = 512
+
+
+def estimate_request_tokens(prompt: str) -> int:
+    """Prompt tokens (~4 chars each) plus the completion we expect back, for rate limiting"""
+    return len(prompt) // 4 + EXPECTED_COMPLETION_TOKENS
+
 
 class GroqMentorAgent:
-    def __init__(self, groq_api_key: str = None, model: str = "llama3-8b-8192"):
+    name = "groq"
+    cost_per_1k_tokens = float(os.getenv("GROQ_COST_PER_1K_TOKENS", 0.0001))
+
+    def __init__(self, groq_api_key: str = None, model: str = "llama3-8b-8192", tools: list = None):
         self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
         if not self.groq_api_key:
             raise ValueError("GROQ_API_KEY is required")
 
-        self.llm = ChatGroq(api_key=self.groq_api_key, model_name=model)
-        self.agent = initialize_agent(
-            tools=[],
-            llm=self.llm,
-            agent=AgentType.OPENAI_FUNCTIONS,
-            verbose=True
+        self.gateway = get_gateway("groq")
+        self.llm = ChatGroq(
+            api_key=self.groq_api_key,
+            model_name=model,
+            http_client=self.gateway.http_client,
+            http_async_client=self.gateway.http_async_client,
+            timeout=self.gateway.request_timeout,
+            max_retries=0,  # the gateway retries with backoff
         )
+        self.tools = tools or []
+        # Without tools the agent loop only adds overhead; call the chat model directly
+        self.agent = None
+        if self.tools:
+            from langchain.agents import create_agent
+            self.agent = create_agent(self.llm, tools=self.tools, debug=LLM_VERBOSE)
+
+    @staticmethod
+    def _agent_input(user_input: str) -> dict:
+        return {"messages": [{"role": "user", "content": user_input}]}
+
+    @staticmethod
+    def _agent_output(user_input: str, state: dict) -> dict:
+        """The agent's final message in the same shape as a direct model reply"""
+        return {"input": user_input, "output": state["messages"][-1].content}
 
     def run(self, user_input: str):
-        return self.agent.invoke({"input": user_input})
+        tokens = estimate_request_tokens(user_input)
+        if self.agent is None:
+            message = self.gateway.invoke(lambda: self.llm.invoke(user_input), estimated_tokens=tokens)
+            return {"input": user_input, "output": message.content}
+        state = self.gateway.invoke(lambda: self.agent.invoke(self._agent_input(user_input)), estimated_tokens=tokens)
+        return self._agent_output(user_input, state)
+
+    async def arun(self, user_input: str):
+        tokens = estimate_request_tokens(user_input)
+        if self.agent is None:
+            message = await self.gateway.ainvoke(lambda: self.llm.ainvoke(user_input), estimated_tokens=tokens)
+            return {"input": user_input, "output": message.content}
+        state = await self.gateway.ainvoke(lambda: self.agent.ainvoke(self._agent_input(user_input)),
+                                           estimated_tokens=tokens)
+        return self._agent_output(user_input, state)
+
+    async def abatch(self, user_inputs: list) -> list:
+        """Results for several prompts, with the exception in place of any that failed"""
+        tokens = [estimate_request_tokens(user_input) for user_input in user_inputs]
+        config = {"max_concurrency": LLM_BATCH_CONCURRENCY}
+        if self.agent is None:
+            messages = await self.gateway.abatch(
+                lambda: self.llm.abatch(user_inputs, config=config, return_exceptions=True),
+                requests=len(user_inputs), estimated_tokens=tokens)
+            return [message if isinstance(message, Exception) else {"input": user_input, "output": message.content}
+                    for user_input, message in zip(user_inputs, messages)]
+        states = await self.gateway.abatch(
+            lambda: self.agent.abatch([self._agent_input(user_input) for user_input in user_inputs],
+                                      config=config, return_exceptions=True),
+            requests=len(user_inputs), estimated_tokens=tokens)
+        return [state if isinstance(state, Exception) else self._agent_output(user_input, state)
+                for user_input, state in zip(user_inputs, states)]
@@ -0,0 +1,198 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from typing import Awaitable, Callable, Optional
+import httpx
+from mentor_agent.backends.factory import state_backend
+from mentor_agent.backends.rate_limit import FixedWindowLimiter
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", 30))
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_POOL_CONNECTIONS = int(os.getenv("LLM_POOL_CONNECTIONS", 32))
+# Requests one batch call keeps in flight; kept below LLM_MAX_CONCURRENCY so interactive chats aren't starved
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", 8))
+
+# Groq per-model quotas (requests and tokens per minute); set to match your plan
+GROQ_RPM = float(os.getenv("GROQ_RPM", 30))
+GROQ_TPM = float(os.getenv("GROQ_TPM", 6000))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = ("RateLimit", "Timeout", "Connection", "InternalServer", "ServiceUnavailable")
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    pass
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`; callers wait for what they take"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: float) -> float:
+        """Take `amount` tokens (possibly going negative) and return how long to wait"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, amount: float = 1):
+        wait = self._reserve(amount)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self, amount: float = 1):
+        wait = self._reserve(amount)
+        if wait:
+            time.sleep(wait)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS
+    return any(name in type(error).__name__ for name in RETRYABLE_NAMES)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class LLMGateway:
+    """Shared entry point for calls to one LLM provider.
+
+    Owns the provider's pooled HTTP clients and applies, to every call, a
+    bounded concurrency semaphore, request/token rate limiting, jittered
+    exponential-backoff retries and a per-request deadline.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: float,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 request_timeout: float = LLM_REQUEST_TIMEOUT,
+                 deadline: float = LLM_DEADLINE,
+                 max_retries: int = LLM_MAX_RETRIES):
+        self.name = name
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        if state_backend.shared:
+            # Provider quotas are per account, so all workers draw from one shared budget
+            self.requests = FixedWindowLimiter(state_backend, f"llm:{name}:requests", rpm)
+            self.tokens = FixedWindowLimiter(state_backend, f"llm:{name}:tokens", tpm)
+        else:
+            self.requests = TokenBucket(rpm / 60, max(1.0, rpm / 6))
+            self.tokens = TokenBucket(tpm / 60, max(1.0, tpm / 6))
+
+        limits = httpx.Limits(max_connections=LLM_POOL_CONNECTIONS, max_keepalive_connections=LLM_POOL_CONNECTIONS)
+        self.http_client = httpx.Client(limits=limits, timeout=request_timeout)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=request_timeout)
+
+        self._sync_slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots = {}  # event loop -> asyncio.Semaphore
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_slots.get(loop)
+        if semaphore is None:
+            semaphore = self._async_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        hinted = retry_after(error)
+        if hinted is not None:
+            return hinted
+        # Full jitter keeps synchronized clients from retrying in lockstep
+        return random.uniform(0, min(8.0, 0.5 * 2 ** attempt))
+
+    async def ainvoke(self, call: Callable[[], Awaitable], estimated_tokens: int = 0):
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            remaining = self.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                raise LLMDeadlineExceeded(f"{self.name} call exceeded {self.deadline}s deadline")
+            try:
+                await self.requests.acquire()
+                await self.tokens.acquire(estimated_tokens)
+                async with self._async_semaphore():
+                    return await asyncio.wait_for(call(), timeout=min(self.request_timeout, remaining))
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                print(f"⚠️ {self.name} call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(min(delay, max(0.0, self.deadline - (time.monotonic() - started))))
+                attempt += 1
+
+    async def abatch(self, call: Callable[[], Awaitable[list]], requests: int, estimated_tokens: list = ()):
+        """Admit `requests` calls against the rate limits, then run one batch call.
+
+        The batch call is expected to return per-item exceptions rather than
+        raise, so there is no retry here; the router retries failed items
+        one by one through `ainvoke`.
+        """
+        for tokens in list(estimated_tokens) or [0] * requests:
+            await self.requests.acquire()
+            await self.tokens.acquire(tokens)
+        return await asyncio.wait_for(call(), timeout=self.deadline)
+
+    def invoke(self, call: Callable, estimated_tokens: int = 0):
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if time.monotonic() - started >= self.deadline:
+                raise LLMDeadlineExceeded(f"{self.name} call exceeded {self.deadline}s deadline")
+            try:
+                self.requests.acquire_blocking()
+                self.tokens.acquire_blocking(estimated_tokens)
+                with self._sync_slots:
+                    return call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                print(f"⚠️ {self.name} call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(min(delay, max(0.0, self.deadline - (time.monotonic() - started))))
+                attempt += 1
+
+
+_gateways = {}
+_gateways_lock = threading.Lock()
+
+
+def get_gateway(name: str = "groq") -> LLMGateway:
+    """Process-wide gateway per provider, so every agent shares one pool and one quota"""
+    with _gateways_lock:
+        gateway = _gateways.get(name)
+        if gateway is None:
+            if name == "groq":
+                gateway = LLMGateway(name, rpm=GROQ_RPM, tpm=GROQ_TPM)
+            else:
+                prefix = name.upper()
+                gateway = LLMGateway(
+                    name,
+                    rpm=float(os.getenv(f"{prefix}_RPM", 60)),
+                    tpm=float(os.getenv(f"{prefix}_TPM", 100000)),
+                )
+            _gateways[name] = gateway
+        return gateway
@@ -1,10 +1,17 @@
+import os
 from pica_langchain import PicaClient, create_pica_agent
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentType
 
 class PicaMentorAgent:
-    def __init__(self, pica_secret: str, model: str = "gpt-4.1", temperature: float = 0):
-        self.pica_client = PicaClient(secret=os.getencv("PICA_SECRET", pica_secret))
+    name = "pica"
+    cost_per_1k_tokens = float(os.getenv("PICA_COST_PER_1K_TOKENS", 0.002))
+
+    def __init__(self, pica_secret: str = None, model: str = "gpt-4.1", temperature: float = 0):
+        pica_secret = os.getenv("PICA_SECRET", pica_secret)
+        if not pica_secret:
+            raise ValueError("PICA_SECRET is required")
+        self.pica_client = PicaClient(secret=pica_secret)
         self.llm = ChatOpenAI(temperature=temperature, model=model)
         self.agent = create_pica_agent(
             client=self.pica_client,
@@ -13,4 +20,10 @@ class PicaMentorAgent:
         )
 
     def run(self, user_input: str):
-        return self.agent.invoke({"input": user_input})
\ No newline at end of file
+        return self.agent.invoke({"input": user_input})
+
+    async def arun(self, user_input: str):
+        return await self.agent.ainvoke({"input": user_input})
+
+    async def abatch(self, user_inputs: list) -> list:
+        return await self.agent.abatch([{"input": user_input} for user_input in user_inputs], return_exceptions=True)
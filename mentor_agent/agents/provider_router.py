@@ -0,0 +1,228 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import List, Optional
+from mentor_agent.services.metrics import observe_llm_call
+
+LLM_PROVIDERS = [p.strip() for p in os.getenv("LLM_PROVIDERS", "groq").split(",") if p.strip()]
+LLM_HEDGE_REQUESTS = os.getenv("LLM_HEDGE_REQUESTS", "false").lower() == "true"
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", 0))  # 0 = use the primary's p95 latency
+LLM_COST_WEIGHT = float(os.getenv("LLM_COST_WEIGHT", 1.0))  # seconds of latency one $/1k tokens is worth
+DEFAULT_HEDGE_DELAY = 2.0  # before a provider has latency samples
+ERROR_PENALTY = 5.0  # seconds added per unit of error rate, so failing providers sink even without latency data
+CIRCUIT_FAILURES = 3
+CIRCUIT_COOLDOWN = 30.0
+LATENCY_WINDOW = 200
+
+
+class NoProviderAvailable(RuntimeError):
+    pass
+
+
+class ProviderStats:
+    """Rolling latency window, error rate and circuit state for one provider"""
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.error_rate = 0.0  # exponentially weighted
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: Optional[float], ok: bool):
+        """Count a call; `latency` None leaves the window alone (batch items have no per-call latency)"""
+        with self._lock:
+            self.calls += 1
+            self.error_rate = 0.9 * self.error_rate + (0.0 if ok else 0.1)
+            if ok:
+                if latency is not None:
+                    self.latencies.append(latency)
+                self.consecutive_failures = 0
+            else:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= CIRCUIT_FAILURES:
+                    self.open_until = time.monotonic() + CIRCUIT_COOLDOWN
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "error_rate": round(self.error_rate, 4),
+            "circuit_open": not self.available,
+        }
+
+
+class ProviderRouter:
+    """Picks among LLM providers by observed latency, error rate and cost.
+
+    Providers are any objects with `name`, `run(prompt)` and `arun(prompt)`
+    (and optionally `abatch(prompts)` and `cost_per_1k_tokens`). Calls go to the best-scoring
+    provider and fail over down the ranking on errors; a provider that
+    fails repeatedly is skipped for a cooldown. With `hedge=True`, a second
+    provider is started if the first hasn't answered within its p95 latency
+    and whichever finishes first wins.
+    """
+
+    def __init__(self, providers: List, cost_weight: float = LLM_COST_WEIGHT, hedge_delay: float = LLM_HEDGE_DELAY):
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers = list(providers)
+        self.cost_weight = cost_weight
+        self.hedge_delay = hedge_delay
+        self.stats = {p.name: ProviderStats() for p in self.providers}
+
+    def _score(self, provider) -> float:
+        stats = self.stats[provider.name]
+        # Untried providers get an optimistic latency so they are sampled
+        latency = stats.percentile(0.95) or stats.percentile(0.50)
+        cost = getattr(provider, "cost_per_1k_tokens", 0.0) * self.cost_weight
+        return (latency + cost) * (1.0 + 10.0 * stats.error_rate) + ERROR_PENALTY * stats.error_rate
+
+    def ranked(self) -> List:
+        available = [p for p in self.providers if self.stats[p.name].available]
+        # If every circuit is open, try them all rather than failing outright
+        return sorted(available or self.providers, key=self._score)
+
+    def run(self, prompt: str):
+        errors = []
+        for provider in self.ranked():
+            started = time.monotonic()
+            try:
+                result = provider.run(prompt)
+            except Exception as e:
+                self.stats[provider.name].record(time.monotonic() - started, ok=False)
+                print(f"⚠️ LLM provider {provider.name} failed: {e}")
+                errors.append(e)
+                continue
+            elapsed = time.monotonic() - started
+            self.stats[provider.name].record(elapsed, ok=True)
+            observe_llm_call(provider.name, elapsed, result.get("output", ""))
+            return result
+        raise NoProviderAvailable(f"All LLM providers failed: {errors}")
+
+    async def _call(self, provider, prompt: str):
+        started = time.monotonic()
+        try:
+            result = await provider.arun(prompt)
+        except asyncio.CancelledError:
+            raise  # lost a hedge race; not the provider's fault
+        except Exception:
+            self.stats[provider.name].record(time.monotonic() - started, ok=False)
+            raise
+        elapsed = time.monotonic() - started
+        self.stats[provider.name].record(elapsed, ok=True)
+        observe_llm_call(provider.name, elapsed, result.get("output", ""))
+        return result
+
+    async def arun(self, prompt: str, hedge: bool = LLM_HEDGE_REQUESTS):
+        queue = self.ranked()
+        errors = []
+        pending = set()
+        try:
+            while queue or pending:
+                if queue and (not pending or hedge):
+                    provider = queue.pop(0)
+                    task = asyncio.ensure_future(self._call(provider, prompt))
+                    task.provider = provider
+                    pending.add(task)
+                # Wait for a result; when hedging, only until it's time to launch the next provider
+                timeout = None
+                if hedge and queue:
+                    timeout = self.hedge_delay or self.stats[provider.name].percentile(0.95) or DEFAULT_HEDGE_DELAY
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    print(f"⚠️ LLM provider {task.provider.name} failed: {task.exception()}")
+                    errors.append(task.exception())
+            raise NoProviderAvailable(f"All LLM providers failed: {errors}")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def abatch(self, prompts: List[str]) -> list:
+        """Results for several prompts, sent as one batch to the best provider.
+
+        Prompts the batch fails for are retried one at a time through `arun`,
+        so they still get retries and failover. The result list matches
+        `prompts`, holding NoProviderAvailable for any prompt that failed
+        everywhere.
+        """
+        if not prompts:
+            return []
+        provider = self.ranked()[0]
+        try:
+            if hasattr(provider, "abatch"):
+                results = list(await provider.abatch(prompts))
+            else:
+                results = await asyncio.gather(*(provider.arun(prompt) for prompt in prompts), return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(prompts)
+        stats = self.stats[provider.name]
+        for result in results:
+            stats.record(None, ok=not isinstance(result, Exception))
+
+        failed = [i for i, result in enumerate(results) if isinstance(result, Exception)]
+        if failed:
+            print(f"⚠️ LLM provider {provider.name} failed {len(failed)} of {len(prompts)} batched prompts, retrying singly")
+            retried = await asyncio.gather(*(self.arun(prompts[i]) for i in failed), return_exceptions=True)
+            for i, result in zip(failed, retried):
+                results[i] = result
+        return results
+
+    def snapshot(self) -> dict:
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    def collect(self):
+        """Metrics collector for per-provider routing state"""
+        snapshot = self.snapshot()
+        return [
+            ("mentor_llm_provider_latency_p95_seconds", "gauge", "Rolling p95 latency per LLM provider",
+             [({"provider": name}, s["p95"]) for name, s in snapshot.items()]),
+            ("mentor_llm_provider_error_rate", "gauge", "Weighted error rate per LLM provider",
+             [({"provider": name}, s["error_rate"]) for name, s in snapshot.items()]),
+            ("mentor_llm_provider_circuit_open", "gauge", "1 while a provider's circuit breaker is open",
+             [({"provider": name}, int(s["circuit_open"])) for name, s in snapshot.items()]),
+        ]
+
+
+def create_provider(name: str):
+    if name == "groq":
+        from mentor_agent.agents.groq_agent import GroqMentorAgent
+        return GroqMentorAgent(groq_api_key=os.getenv("GROQ_API_KEY"))
+    if name == "pica":
+        from mentor_agent.agents.pica_agent import PicaMentorAgent
+        return PicaMentorAgent()
+    if name.startswith("fake"):
+        from mentor_agent.agents.fake_agent import FakeMentorAgent
+        return FakeMentorAgent(name=name)
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+def build_router(names: List[str] = None) -> ProviderRouter:
+    """Router over the configured providers; ones that fail to initialize are left out"""
+    names = names or LLM_PROVIDERS
+    providers = []
+    for name in names:
+        try:
+            providers.append(create_provider(name))
+        except Exception as e:
+            if len(names) == 1:
+                raise
+            print(f"⚠️ LLM provider {name} unavailable: {e}")
+    return ProviderRouter(providers)
@@ -0,0 +1,189 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+from mentor_agent.services.retrieval_service import HashingTfidfEmbedder, load_numpy
+from mentor_agent.states.prompt_builder import PROMPT_TEMPLATE, prompt_builder
+from mentor_agent.backends.factory import state_backend
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# With the cache on, replies (outside document questions) no longer draw on the conversation so far
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 24 * 3600))
+# Cosine similarity above which a different wording counts as the same question; 0 disables the tier
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", 0.92))
+
+PROFILE_FIELDS = ("personality", "mentor_type", "goal", "education")
+TEMPLATE_VERSION = hashlib.sha256(PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:12]
+NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_input(text: str) -> str:
+    return NORMALIZE_RE.sub(" ", text.lower()).strip()
+
+
+def profile_fingerprint(profile: dict) -> str:
+    """Hash of the profile fields that shape a reply, plus the prompt template version"""
+    parts = [TEMPLATE_VERSION] + [normalize_input(str(profile.get(field) or "")) for field in PROFILE_FIELDS]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("result", "fingerprint", "vector", "expires_at")
+
+    def __init__(self, result: dict, fingerprint: str, vector: Optional["np.ndarray"], expires_at: float):
+        self.result = result
+        self.fingerprint = fingerprint
+        self.vector = vector
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Opt-in cache of mentor replies for repeated questions.
+
+    Exact tier: key is a hash of the profile fingerprint and the normalized
+    input. Similarity tier: among entries with the same fingerprint, the
+    closest question by hashed term vector is reused if its cosine similarity
+    clears `similarity`. A profile or template change yields a new
+    fingerprint, so old replies are never served for the new profile; the
+    old fingerprint's entries stay, since other users with that profile
+    still rely on them, and age out by TTL and LRU.
+    A reply that may be cached is generated from `shared_prompt`, which holds
+    exactly what the key covers (the profile fields and the input) and none
+    of the user's name, history, summary, tasks or documents, so a reply
+    served to another user never carries someone else's details.
+
+    With a shared `backend`, exact-tier replies are also stored there for
+    other workers.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL,
+                 similarity: float = RESPONSE_CACHE_SIMILARITY, enabled: bool = RESPONSE_CACHE_ENABLED,
+                 backend=None):
+        self.enabled = enabled
+        self.backend = backend if backend is not None and backend.shared else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.embedder = HashingTfidfEmbedder() if similarity > 0 else None
+        self._entries = OrderedDict()  # key -> CacheEntry
+        self._by_fingerprint = {}  # fingerprint -> set of keys
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def shared_prompt(profile: dict, user_input: str) -> str:
+        """Mentor prompt from the PROFILE_FIELDS and the input alone, for replies that are cached"""
+        shared = {field: profile.get(field) for field in PROFILE_FIELDS if profile.get(field)}
+        return prompt_builder.build({"profile": shared}, user_input, anonymous=True)
+
+    @staticmethod
+    def _key(fingerprint: str, normalized: str) -> str:
+        return hashlib.sha256(f"{fingerprint}\x1e{normalized}".encode("utf-8")).hexdigest()
+
+    def _embed(self, normalized: str) -> Optional["np.ndarray"]:
+        if self.embedder is None:
+            return None
+        vector = self.embedder.embed([normalized])[0]
+        norm = load_numpy().linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        keys = self._by_fingerprint.get(entry.fingerprint)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_fingerprint[entry.fingerprint]
+
+    def get(self, profile: dict, user_input: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        fingerprint = profile_fingerprint(profile)
+        normalized = normalize_input(user_input)
+        key = self._key(fingerprint, normalized)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.exact_hits += 1
+                    return dict(entry.result)
+                self._drop(key)
+                self.expirations += 1
+            candidates = list(self._by_fingerprint.get(fingerprint, ()))
+
+        if self.backend is not None:
+            shared = self.backend.get("response_cache", key)
+            if shared is not None:
+                with self._lock:
+                    self.exact_hits += 1
+                return shared
+
+        vector = self._embed(normalized) if candidates else None
+        if vector is not None:
+            with self._lock:
+                best_key, best_score = None, self.similarity
+                for candidate in candidates:
+                    entry = self._entries.get(candidate)
+                    if entry is None or entry.vector is None or entry.expires_at <= now:
+                        continue
+                    score = float(entry.vector @ vector)
+                    if score >= best_score:
+                        best_key, best_score = candidate, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    return dict(self._entries[best_key].result)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, profile: dict, user_input: str, result: dict):
+        if not self.enabled:
+            return
+        fingerprint = profile_fingerprint(profile)
+        normalized = normalize_input(user_input)
+        key = self._key(fingerprint, normalized)
+        if self.backend is not None:
+            self.backend.set("response_cache", key, dict(result), ttl=self.ttl)
+        entry = CacheEntry(dict(result), fingerprint, self._embed(normalized), time.monotonic() + self.ttl)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._by_fingerprint.setdefault(fingerprint, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# Create singleton instance
+response_cache = ResponseCache(backend=state_backend)
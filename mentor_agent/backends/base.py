@@ -0,0 +1,43 @@
+from typing import Any, Callable, List, Optional
+
+
+class StateBackend:
+    """Namespaced key/value state shared by the stores, caches and limiters.
+
+    Values are JSON-serializable objects. `ttl` is in seconds; expired keys
+    read as missing. `update` and `incr` are atomic with respect to every
+    process using the same backend, which is what lets several workers share
+    users, memory and rate limits. `shared` is False only for backends whose
+    state lives inside a single process.
+    """
+
+    kind = "base"
+    shared = False
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set the key only if it is missing; returns whether it was set"""
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Any],
+               ttl: Optional[float] = None) -> Any:
+        """Atomically replace the value with `fn(current)` (None when missing); returns the new value"""
+        raise NotImplementedError
+
+    def incr(self, namespace: str, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add `amount`; `ttl` applies when the counter is created"""
+        raise NotImplementedError
+
+    def count(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def keys(self, namespace: str) -> List[str]:
+        raise NotImplementedError
@@ -0,0 +1,24 @@
+import os
+from mentor_agent.backends.base import StateBackend
+
+# memory (single process) | sqlite[:///path/to/state.db] (all workers on one host) | redis://host:port/db
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+STATE_DB_PATH = "mentor_agent/memory/state.db"
+
+
+def create_backend(spec: str = STATE_BACKEND) -> StateBackend:
+    if spec == "memory":
+        from mentor_agent.backends.memory import InMemoryBackend
+        return InMemoryBackend()
+    if spec == "sqlite" or spec.startswith("sqlite:///"):
+        from mentor_agent.backends.sqlite import SQLiteBackend
+        path = spec[len("sqlite:///"):] if spec.startswith("sqlite:///") else ""
+        return SQLiteBackend(path or STATE_DB_PATH)
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        from mentor_agent.backends.redis import RedisBackend
+        return RedisBackend(spec)
+    raise ValueError(f"Unknown STATE_BACKEND: {spec}")
+
+
+# Create singleton instance
+state_backend = create_backend()
@@ -0,0 +1,78 @@
+import copy
+import time
+import threading
+from typing import Any, Callable, List, Optional
+from mentor_agent.backends.base import StateBackend
+
+
+class InMemoryBackend(StateBackend):
+    """Process-local backend: dicts under one lock. State is not shared between workers."""
+
+    kind = "memory"
+    shared = False
+
+    def __init__(self):
+        self._data = {}  # namespace -> {key: (value, expires_at or None)}
+        self._lock = threading.RLock()
+
+    def _live(self, namespace: str, key: str):
+        entry = self._data.get(namespace, {}).get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._data[namespace][key]
+            return None
+        return entry
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl else None
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(namespace, key)
+            return copy.deepcopy(entry[0]) if entry else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = (copy.deepcopy(value), self._expiry(ttl))
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._live(namespace, key):
+                return False
+            self.set(namespace, key, value, ttl)
+            return True
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Any],
+               ttl: Optional[float] = None) -> Any:
+        with self._lock:
+            entry = self._live(namespace, key)
+            value = fn(copy.deepcopy(entry[0]) if entry else None)
+            expires_at = self._expiry(ttl) if ttl else (entry[1] if entry else None)
+            self._data.setdefault(namespace, {})[key] = (copy.deepcopy(value), expires_at)
+            return value
+
+    def incr(self, namespace: str, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            entry = self._live(namespace, key)
+            value = (entry[0] if entry else 0) + amount
+            expires_at = entry[1] if entry else self._expiry(ttl)
+            self._data.setdefault(namespace, {})[key] = (value, expires_at)
+            return value
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            now = time.time()
+            return sum(1 for _, expires_at in self._data.get(namespace, {}).values()
+                       if expires_at is None or expires_at > now)
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            now = time.time()
+            return [key for key, (_, expires_at) in self._data.get(namespace, {}).items()
+                    if expires_at is None or expires_at > now]
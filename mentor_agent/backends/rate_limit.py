@@ -0,0 +1,137 @@
+import time
+import random
+import asyncio
+import threading
+from collections import OrderedDict
+from mentor_agent.backends.base import StateBackend
+
+
+class FixedWindowLimiter:
+    """`limit` units per `window` seconds, counted in a state backend.
+
+    Every worker sharing the backend draws from the same counter, so the
+    limit holds for the whole deployment. Same `acquire`/`acquire_blocking`
+    interface as the gateway's in-process TokenBucket.
+    """
+
+    def __init__(self, backend: StateBackend, name: str, limit: float, window: float = 60.0):
+        self.backend = backend
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """Take `amount` if the current window has room; otherwise return seconds until the next window"""
+        amount = int(min(amount, self.limit))
+        if amount <= 0:
+            return 0.0
+        now = time.time()
+        window_index = int(now // self.window)
+        key = f"{self.name}:{window_index}"
+        used = self.backend.incr("rate_limits", key, amount, ttl=2 * self.window)
+        if used <= self.limit:
+            return 0.0
+        self.backend.incr("rate_limits", key, -amount)
+        # A little jitter so workers don't all retry at the window boundary
+        return (window_index + 1) * self.window - now + random.uniform(0, 0.05 * self.window)
+
+    async def acquire(self, amount: float = 1):
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, amount)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self, amount: float = 1):
+        while True:
+            wait = self.try_acquire(amount)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class KeyedTokenBuckets:
+    """In-process token buckets, one per key, that refuse rather than wait.
+
+    Each bucket refills `limit` units per `period` seconds up to `limit`.
+    `try_acquire` takes units only when they are all there, and `charge`
+    takes them unconditionally (the bucket may go negative), for usage that
+    is only known afterwards. Idle buckets refill completely, so past
+    `max_keys` the least recently used are simply forgotten.
+    """
+
+    def __init__(self, limit: float, period: float, max_keys: int = 100000):
+        self.limit = limit
+        self.period = period
+        self.rate = limit / period
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated]
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str) -> list:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.limit, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.limit, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def try_acquire(self, key: str, amount: float = 1) -> float:
+        """Take `amount` if the bucket holds it; otherwise return seconds until it will"""
+        with self._lock:
+            bucket = self._bucket(key)
+            if bucket[0] >= amount:
+                bucket[0] -= amount
+                return 0.0
+            return (amount - bucket[0]) / self.rate
+
+    def charge(self, key: str, amount: float):
+        with self._lock:
+            self._bucket(key)[0] -= amount
+
+    def wait_time(self, key: str) -> float:
+        """Seconds until the bucket is positive again (0 when it is)"""
+        with self._lock:
+            tokens = self._bucket(key)[0]
+            return 0.0 if tokens > 0 else (1 - tokens) / self.rate
+
+
+class KeyedWindowLimiter:
+    """KeyedTokenBuckets counterpart counted per fixed window in a state backend.
+
+    Every worker sharing the backend draws from the same per-key counters.
+    A daily window resets at midnight UTC rather than refilling gradually.
+    """
+
+    def __init__(self, backend: StateBackend, name: str, limit: float, period: float):
+        self.backend = backend
+        self.name = name
+        self.limit = limit
+        self.period = period
+
+    def _window(self, key: str):
+        now = time.time()
+        window_index = int(now // self.period)
+        return f"{self.name}:{key}:{window_index}", (window_index + 1) * self.period - now
+
+    def try_acquire(self, key: str, amount: float = 1) -> float:
+        counter, remaining = self._window(key)
+        amount = int(amount)
+        used = self.backend.incr("rate_limits", counter, amount, ttl=2 * self.period)
+        if used <= self.limit:
+            return 0.0
+        self.backend.incr("rate_limits", counter, -amount)
+        return remaining
+
+    def charge(self, key: str, amount: float):
+        counter, _ = self._window(key)
+        self.backend.incr("rate_limits", counter, int(amount), ttl=2 * self.period)
+
+    def wait_time(self, key: str) -> float:
+        counter, remaining = self._window(key)
+        return remaining if (self.backend.get("rate_limits", counter) or 0) >= self.limit else 0.0
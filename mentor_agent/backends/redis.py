@@ -0,0 +1,85 @@
+import json
+import math
+from typing import Any, Callable, List, Optional
+from mentor_agent.backends.base import StateBackend
+
+UPDATE_MAX_ATTEMPTS = 50
+
+
+def _ttl_ms(ttl: Optional[float]) -> Optional[int]:
+    return max(1, math.ceil(ttl * 1000)) if ttl else None
+
+
+class RedisBackend(StateBackend):
+    """Backend on a Redis-compatible server, shared by every worker and node.
+
+    `update` is an optimistic WATCH/MULTI transaction retried on conflict.
+    Pass `client` to use any redis-py compatible client, e.g. a fakeredis
+    instance standing in for a server; otherwise one is created from `url`.
+    """
+
+    kind = "redis"
+    shared = True
+
+    def __init__(self, url: str = None, client=None, prefix: str = "mentor"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("STATE_BACKEND=redis requires the `redis` package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        raw = self.client.get(self._key(namespace, key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        self.client.set(self._key(namespace, key), json.dumps(value), px=_ttl_ms(ttl))
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(self._key(namespace, key), json.dumps(value), px=_ttl_ms(ttl), nx=True))
+
+    def delete(self, namespace: str, key: str):
+        self.client.delete(self._key(namespace, key))
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Any],
+               ttl: Optional[float] = None) -> Any:
+        from redis.exceptions import WatchError
+
+        full_key = self._key(namespace, key)
+        for _ in range(UPDATE_MAX_ATTEMPTS):
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(full_key)
+                    raw = pipe.get(full_key)
+                    value = fn(json.loads(raw) if raw is not None else None)
+                    # Without a new ttl, keep whatever expiry the key already had
+                    keep_ms = None if ttl else pipe.pttl(full_key)
+                    pipe.multi()
+                    pipe.set(full_key, json.dumps(value), px=_ttl_ms(ttl) or (keep_ms if keep_ms and keep_ms > 0 else None))
+                    pipe.execute()
+                    return value
+                except WatchError:
+                    continue
+        raise RuntimeError(f"Too much contention updating {full_key}")
+
+    def incr(self, namespace: str, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        full_key = self._key(namespace, key)
+        value = self.client.incrby(full_key, amount)
+        if ttl and value == amount:
+            # This call created the counter
+            self.client.pexpire(full_key, _ttl_ms(ttl))
+        return value
+
+    def count(self, namespace: str) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self._key(namespace, "*"), count=1000))
+
+    def keys(self, namespace: str) -> List[str]:
+        start = len(self._key(namespace, ""))
+        return [full_key.decode()[start:] if isinstance(full_key, bytes) else full_key[start:]
+                for full_key in self.client.scan_iter(match=self._key(namespace, "*"), count=1000)]
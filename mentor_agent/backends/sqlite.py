@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Callable, List, Optional
+from mentor_agent.backends.base import StateBackend
+
+PURGE_EVERY_WRITES = 1000
+
+
+class SQLiteBackend(StateBackend):
+    """Backend in a SQLite file in WAL mode, shared by every worker on the host.
+
+    Read-modify-write operations run in `BEGIN IMMEDIATE` transactions, so
+    SQLite's file lock makes them atomic across processes. Expired rows are
+    ignored on read and purged every PURGE_EVERY_WRITES writes.
+    """
+
+    kind = "sqlite"
+    shared = True
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._writes = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+            """
+        )
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl else None
+
+    def _read(self, namespace: str, key: str):
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM state WHERE namespace = ? AND key = ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def _write(self, namespace: str, key: str, value: Any, expires_at: Optional[float]):
+        self._conn.execute(
+            "INSERT INTO state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (namespace, key, json.dumps(value), expires_at),
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            self._conn.execute("DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def _transaction(self, body: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body()
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._read(namespace, key)
+        return entry[0] if entry else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._write(namespace, key, value, self._expiry(ttl))
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        def body():
+            if self._read(namespace, key):
+                return False
+            self._write(namespace, key, value, self._expiry(ttl))
+            return True
+        return self._transaction(body)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Any]], Any],
+               ttl: Optional[float] = None) -> Any:
+        def body():
+            entry = self._read(namespace, key)
+            value = fn(entry[0] if entry else None)
+            expires_at = self._expiry(ttl) if ttl else (entry[1] if entry else None)
+            self._write(namespace, key, value, expires_at)
+            return value
+        return self._transaction(body)
+
+    def incr(self, namespace: str, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        def body():
+            entry = self._read(namespace, key)
+            value = (entry[0] if entry else 0) + amount
+            self._write(namespace, key, value, entry[1] if entry else self._expiry(ttl))
+            return value
+        return self._transaction(body)
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM state WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time()),
+            ).fetchone()
+        return count
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM state WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time()),
+            ).fetchall()
+        return [key for (key,) in rows]
@@ -0,0 +1,122 @@
+"""Memory record codecs: encoded size and encode/decode time on realistic user records.
+
+    python -m mentor_agent.benchmarks.codecs [--quick] [--save] [--check]
+
+Records look like long-running users: a profile, tasks, document
+references, a rolling summary and up to HISTORY_MAX_TURNS turns of chat
+with multi-paragraph markdown replies. Every installed codec is measured
+on whole records, on single history entries and through a SQLite store
+load. `legacy json` is what earlier versions stored.
+"""
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="mentor-codecs-")
+os.environ.setdefault("MEMORY_DB_PATH", os.path.join(WORK_DIR, "user_memory.db"))
+os.environ.setdefault("JOB_DB_PATH", os.path.join(WORK_DIR, "jobs.db"))
+
+from mentor_agent.benchmarks.harness import measure, finish
+from mentor_agent.memory.codecs import MemoryCodec, orjson, zstd_available
+from mentor_agent.memory.store import SQLiteMemoryStore
+
+SUITE = "codecs"
+
+WORDS = ("plan focus ship users feedback deploy tests refactor interview resume portfolio habit deadline "
+         "python fastapi docker customers pricing launch review iterate measure weekly goals milestone").split()
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def sample_record(rng: random.Random, turns: int) -> dict:
+    history = []
+    for i in range(turns):
+        reply = "\n\n".join(f"**Step {j + 1}.** {paragraph(rng, 40)}" for j in range(rng.randint(2, 5)))
+        history.append({"input": paragraph(rng, rng.randint(8, 30)), "response": reply,
+                        "analytics": {"sentiment": rng.choice(("positive", "neutral", "negative")),
+                                      "topic": rng.choice(("career", "programming", "productivity"))}})
+    return {
+        "profile": {"user_id": f"user-{rng.randrange(10 ** 6)}", "name": "Bench User", "education": "BSc",
+                    "goal": paragraph(rng, 12), "strengths": ["python", "writing"], "weaknesses": ["focus"],
+                    "mentor_type": "Tech Mentor", "personality": "Concise"},
+        "tasks": [{"task": paragraph(rng, 6), "done": rng.random() < 0.5} for _ in range(10)],
+        "documents": [{"filename": f"notes-{i}.pdf", "doc_id": f"{rng.getrandbits(256):064x}",
+                       "chunks": rng.randint(5, 80), "chars": rng.randint(5000, 90000)} for i in range(3)],
+        "summary": "\n".join(f"- {paragraph(rng, 14)}" for _ in range(30)),
+        "summarized_turns": 30,
+        "history_offset": 0,
+        "history": history,
+        "last_check": "2026-10-16T21:00:00+00:00",
+    }
+
+
+def codecs() -> dict:
+    available = {"json": MemoryCodec("json")}
+    if orjson is not None:
+        available["orjson"] = MemoryCodec("orjson")
+    try:
+        available["msgpack"] = MemoryCodec("msgpack")
+    except ImportError:
+        print("⚠️ msgpack not installed; skipping msgpack codecs")
+    if zstd_available():
+        for name in list(available):
+            available[f"{name}+zstd"] = MemoryCodec(name, compress=True)
+    else:
+        print("⚠️ zstandard not installed; skipping compressed codecs")
+    return available
+
+
+def bench(results: dict, turns: int, iterations: int):
+    rng = random.Random(turns)
+    record = sample_record(rng, turns)
+    entry = record["history"][-1]
+
+    legacy = json.dumps(record).encode()
+    sizes = {"legacy json": len(legacy)}
+    results[f"legacy json encode[{turns} turns]"] = measure(lambda: json.dumps(record), iterations)
+    results[f"legacy json decode[{turns} turns]"] = measure(lambda: json.loads(legacy), iterations)
+
+    for name, codec in codecs().items():
+        encoded = codec.encode(record)
+        assert codec.decode(encoded) == record, name
+        sizes[name] = len(encoded)
+        results[f"{name} encode[{turns} turns]"] = measure(lambda: codec.encode(record), iterations)
+        results[f"{name} decode[{turns} turns]"] = measure(lambda: codec.decode(encoded), iterations)
+        encoded_entry = codec.encode(entry)
+        results[f"{name} decode[1 entry]"] = measure(lambda: codec.decode(encoded_entry), iterations * 10)
+
+        store = SQLiteMemoryStore(os.path.join(WORK_DIR, f"{name}-{turns}.db"), legacy_path=None, codec=codec)
+        store.save("bench", record)
+        results[f"{name} store.load[{turns} turns]"] = measure(lambda: store.load("bench"), iterations)
+
+    print(f"📦 Encoded size of a {turns}-turn record:")
+    for name, size in sizes.items():
+        print(f"  {name:<14} {size:>9,} bytes  {sizes['legacy json'] / size:5.1f}x smaller than legacy json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and record sizes")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 when slower than the baseline")
+    args = parser.parse_args(argv)
+
+    iterations = 50 if args.quick else 200
+    results = {}
+    try:
+        for turns in ((40,) if args.quick else (10, 40, 200)):
+            print(f"⏱️ Running codec benchmarks on {turns}-turn records...")
+            bench(results, turns, iterations)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    return finish(SUITE, results, save=args.save, check=args.check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
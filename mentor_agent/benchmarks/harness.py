@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# A result counts as a regression when it is this much slower than its baseline
+REGRESSION_TOLERANCE = float(os.getenv("BENCH_REGRESSION_TOLERANCE", 0.25))
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> dict:
+    """Throughput and latency percentiles (ms) for a list of per-operation seconds"""
+    count = len(latencies)
+    return {
+        "ops": count,
+        "errors": errors,
+        "ops_per_sec": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(latencies) / count, 4) if count else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 0.50), 4),
+        "p99_ms": round(1000 * percentile(latencies, 0.99), 4),
+    }
+
+
+def measure(fn: Callable[[], object], iterations: int = 1000, warmup: int = 10,
+            min_seconds: Optional[float] = None) -> dict:
+    """Call `fn` repeatedly and summarize per-call latency.
+
+    Runs `warmup` untimed calls first. With `min_seconds`, keeps going past
+    `iterations` until at least that much time has been measured.
+    """
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < iterations or (min_seconds and time.perf_counter() - started < min_seconds):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit or None,
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def baseline_path(suite: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{suite}.json")
+
+
+def load_baseline(suite: str) -> Optional[dict]:
+    try:
+        with open(baseline_path(suite), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(suite: str, results: dict):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(suite), "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"💾 Baseline saved to {baseline_path(suite)}")
+
+
+def compare(results: dict, baseline: Optional[dict], tolerance: float = REGRESSION_TOLERANCE) -> List[str]:
+    """Names of benchmarks whose p50 or throughput got worse than the baseline by more than `tolerance`"""
+    if not baseline:
+        return []
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if not previous:
+            continue
+        slower = previous["p50_ms"] and result["p50_ms"] > previous["p50_ms"] * (1 + tolerance)
+        fewer = previous["ops_per_sec"] and result["ops_per_sec"] < previous["ops_per_sec"] / (1 + tolerance)
+        if slower or fewer:
+            regressions.append(name)
+    return regressions
+
+
+def report(results: dict, baseline: Optional[dict] = None):
+    previous = (baseline or {}).get("results", {})
+    width = max((len(name) for name in results), default=10)
+    print(f"{'benchmark':<{width}}  {'ops/s':>10}  {'p50 ms':>10}  {'p99 ms':>10}  {'vs base p50':>12}")
+    for name, result in results.items():
+        change = ""
+        if previous.get(name, {}).get("p50_ms"):
+            change = f"{100 * (result['p50_ms'] / previous[name]['p50_ms'] - 1):+.1f}%"
+        print(f"{name:<{width}}  {result['ops_per_sec']:>10.1f}  {result['p50_ms']:>10.3f}  "
+              f"{result['p99_ms']:>10.3f}  {change:>12}")
+
+
+def finish(suite: str, results: dict, save: bool, check: bool) -> int:
+    """Print results against the stored baseline, optionally save them; returns an exit code"""
+    baseline = load_baseline(suite)
+    report(results, baseline)
+    regressions = compare(results, baseline)
+    if regressions:
+        print(f"⚠️ Slower than baseline: {', '.join(regressions)}")
+    if save:
+        save_baseline(suite, results)
+    return 1 if check and regressions else 0
@@ -0,0 +1,120 @@
+"""End-to-end load generator driving the FastAPI app in-process.
+
+    python -m mentor_agent.benchmarks.load [--users 20] [--requests 500] [--concurrency 20]
+                                           [--llm-latency 0.05] [--stream] [--save] [--check]
+
+Requests go through httpx's ASGI transport, so routing, validation,
+middleware, the mentor graph and the memory store are all exercised
+without a network hop. The LLM is the deterministic FakeMentorAgent with
+the configured latency; data files live in a temp directory.
+"""
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="mentor-load-")
+os.environ.setdefault("MEMORY_DB_PATH", os.path.join(WORK_DIR, "user_memory.db"))
+os.environ.setdefault("JOB_DB_PATH", os.path.join(WORK_DIR, "jobs.db"))
+os.environ.setdefault("CONVERSATION_DB_PATH", os.path.join(WORK_DIR, "conversations.db"))
+os.environ["LLM_PROVIDERS"] = "fake"
+# Every simulated user comes from one client address; keep the anonymous tier's limits out of the way
+os.environ.setdefault("TIER_LIMITS", '{"free": {"requests_per_minute": 1000000, "llm_tokens_per_day": 1000000000}}')
+
+SUITE = "load"
+API = "/IndieMentor/api/v1"
+
+
+async def setup_users(client, users: int) -> list:
+    bot_ids = []
+    for i in range(users):
+        bot_id = f"load-user-{i}"
+        response = await client.post(f"{API}/setup/", data={
+            "user_id": bot_id, "name": f"User {i}", "education": "BSc", "goal": "Ship a side project"
+        })
+        response.raise_for_status()
+        bot_ids.append(bot_id)
+    return bot_ids
+
+
+async def chat_once(client, bot_id: str, message: str, stream: bool) -> bool:
+    params = {"bot_id": bot_id, "stream": str(stream).lower()}
+    if not stream:
+        response = await client.post(f"{API}/chat/", params=params, data={"text_input": message})
+        return response.status_code == 200
+    async with client.stream("POST", f"{API}/chat/", params=params, data={"text_input": message}) as response:
+        body = b"".join([chunk async for chunk in response.aiter_bytes()])
+        return response.status_code == 200 and b"event: done" in body
+
+
+async def drive(client, bot_ids: list, requests: int, concurrency: int, stream: bool):
+    """Send `requests` chats from `concurrency` workers; returns (latencies, errors, elapsed)"""
+    latencies = []
+    errors = 0
+    next_request = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in next_request:
+            bot_id = bot_ids[i % len(bot_ids)]
+            started = time.perf_counter()
+            try:
+                ok = await chat_once(client, bot_id, f"Message {i}: how should I plan this week?", stream)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(args) -> dict:
+    import httpx
+    from mentor_agent.main import app
+    from mentor_agent.benchmarks.harness import summarize
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://mentor.bench", timeout=60) as client:
+        bot_ids = await setup_users(client, args.users)
+        # Warm up imports, caches and connection setup outside the measurement
+        await drive(client, bot_ids, min(args.concurrency, args.requests), args.concurrency, args.stream)
+        latencies, errors, elapsed = await drive(client, bot_ids, args.requests, args.concurrency, args.stream)
+
+    mode = "stream" if args.stream else "json"
+    name = f"chat[{mode}, c={args.concurrency}, llm={args.llm_latency * 1000:.0f}ms]"
+    return {name: summarize(latencies, elapsed, errors)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake LLM latency in seconds")
+    parser.add_argument("--stream", action="store_true", help="use the server-sent events endpoint")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 when slower than the baseline")
+    args = parser.parse_args(argv)
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+
+    from mentor_agent.benchmarks.harness import finish
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        from mentor_agent.memory.store import memory_cache
+        from mentor_agent.services.conversation_log import conversation_log
+        memory_cache.close()
+        conversation_log.close()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    return finish(SUITE, results, save=args.save, check=args.check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Micro-benchmarks for the memory store, document extraction, prompt assembly and auth.
+
+    python -m mentor_agent.benchmarks.micro [--quick] [--save] [--check]
+
+Everything runs against throwaway SQLite files and document stores in a
+temp directory; the LLM is the zero-latency FakeMentorAgent.
+"""
+import os
+import sys
+import uuid
+import random
+import shutil
+import argparse
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="mentor-bench-")
+# Keep the module-level singletons away from the real data files
+os.environ.setdefault("MEMORY_DB_PATH", os.path.join(WORK_DIR, "user_memory.db"))
+os.environ.setdefault("JOB_DB_PATH", os.path.join(WORK_DIR, "jobs.db"))
+os.environ.setdefault("CONVERSATION_DB_PATH", os.path.join(WORK_DIR, "conversations.db"))
+os.environ.setdefault("LLM_PROVIDERS", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY", "0")
+
+from mentor_agent.benchmarks.harness import measure, finish
+from mentor_agent.memory.store import SQLiteMemoryStore, memory_cache
+from mentor_agent.memory.cache import MemoryCache
+from mentor_agent.services.conversation_log import conversation_log
+from mentor_agent.services.ingestion_service import DocumentStore, iter_document_text, chunk_text
+from mentor_agent.services.password_hasher import PasswordHasher, BCRYPT_ROUNDS
+from mentor_agent.states.prompt_builder import prompt_builder, record_turn
+
+SUITE = "micro"
+
+
+def sample_record(user_id: str, turns: int = 20) -> dict:
+    return {
+        "profile": {"user_id": user_id, "name": "Bench", "education": "BSc", "goal": "Ship a product",
+                    "strengths": ["python"], "weaknesses": ["focus"], "mentor_type": "Tech Mentor",
+                    "personality": "Concise"},
+        "tasks": [],
+        "documents": [],
+        "history": [{"input": f"Question {i} about deployments and testing?",
+                     "response": f"Answer {i}: " + "keep iterating on small, testable steps. " * 8}
+                    for i in range(turns)],
+        "last_check": None,
+    }
+
+
+def bench_memory(results: dict, user_counts, iterations: int):
+    for count in user_counts:
+        store = SQLiteMemoryStore(os.path.join(WORK_DIR, f"store-{count}.db"), legacy_path=None)
+        user_ids = [f"user-{i}" for i in range(count)]
+        for user_id in user_ids:
+            store.save(user_id, sample_record(user_id))
+        rng = random.Random(count)
+
+        results[f"store.load[{count} users]"] = measure(lambda: store.load(rng.choice(user_ids)), iterations)
+
+        def save():
+            user_id = rng.choice(user_ids)
+            record = store.load(user_id)
+            record["history"].append({"input": "new", "response": "turn"})
+            store.save(user_id, record)
+        results[f"store.load+save[{count} users]"] = measure(save, iterations)
+
+        cache = MemoryCache(store, flush_interval=3600)
+        hot = user_ids[: min(100, count)]
+        for user_id in hot:
+            cache.get(user_id)
+        results[f"cache.get hot[{count} users]"] = measure(lambda: cache.get(rng.choice(hot)), iterations * 10)
+        turn = {"input": "How do I prioritise?", "response": "Pick the smallest useful step."}
+        results[f"cache.update record_turn[{count} users]"] = measure(
+            lambda: cache.update(rng.choice(hot), lambda memory: record_turn(memory, turn)), iterations)
+        cache.close()
+
+
+def make_docx(path: str, paragraphs: int):
+    import docx
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(f"Paragraph {i}. " + "Career planning notes with goals and milestones. " * 6)
+    document.save(path)
+
+
+def make_pdf(path: str, pages: int):
+    import fitz
+    with fitz.open() as document:
+        for i in range(pages):
+            page = document.new_page()
+            text = "\n".join(f"Page {i} line {j}: study plan, weekly goals and reviews." for j in range(40))
+            page.insert_text((56, 56), text, fontsize=9)
+        document.save(path)
+
+
+def bench_extraction(results: dict, iterations: int):
+    samples = {"docx[200 paragraphs]": ("docx", make_docx, 200), "pdf[20 pages]": ("pdf", make_pdf, 20)}
+    documents = DocumentStore(os.path.join(WORK_DIR, "documents"))
+    os.makedirs(documents.root, exist_ok=True)
+    for name, (ext, make, size) in samples.items():
+        path = os.path.join(WORK_DIR, f"sample.{ext}")
+        make(path, size)
+        # A fresh doc id each call so the content-addressed cache never short-circuits extraction
+        results[f"extract+chunk {name}"] = measure(
+            lambda: documents.write(uuid.uuid4().hex, f"sample.{ext}", chunk_text(iter_document_text(path, ext))),
+            iterations, warmup=1)
+
+
+def bench_prompt(results: dict, iterations: int):
+    from mentor_agent.models.conversation_state import MentorState
+    from mentor_agent.memory.store import update_user_memory
+    from mentor_agent.states.mentor_flow import analyze_and_respond
+    from mentor_agent.states.output_parser import parse_mentor_output, StreamingReplyParser
+
+    memory = sample_record("prompt-user", turns=40)
+    memory["summary"] = "\n".join(f"- Turn {i}: asked about planning; advised small steps." for i in range(40))
+    passages = [{"filename": "notes.pdf", "chunk": i, "score": 0.5, "text": "Relevant excerpt text. " * 40}
+                for i in range(4)]
+    results["prompt_builder.build"] = measure(
+        lambda: prompt_builder.build(memory, "How should I plan my week?", passages), iterations * 10)
+
+    output = "RESPONSE:\n" + "Some **markdown** guidance.\n" * 20 + "\nSENTIMENT: positive\nTOPIC: planning"
+    results["parse_mentor_output"] = measure(lambda: parse_mentor_output(output), iterations * 10)
+    untagged = "Some **markdown** guidance about planning my week when I feel stuck.\n" * 20
+    results["parse_mentor_output[classifier fallback]"] = measure(
+        lambda: parse_mentor_output(untagged, "I'm stuck planning my week"), iterations * 10)
+
+    # Roughly 4-character tokens, as a model would stream them
+    tokens = [output[i:i + 4] for i in range(0, len(output), 4)]
+
+    def stream():
+        parser = StreamingReplyParser()
+        for token in tokens:
+            parser.feed(token)
+        parser.flush()
+    results[f"StreamingReplyParser[{len(tokens)} tokens]"] = measure(stream, iterations)
+
+    update_user_memory("prompt-user", sample_record("prompt-user"))
+    state = MentorState(user_id="prompt-user", input="How should I plan my week?")
+    results["analyze_and_respond[fake llm, 0ms]"] = measure(lambda: analyze_and_respond(state), iterations)
+
+
+def bench_auth(results: dict, iterations: int):
+    from mentor_agent.services.auth_service import AuthService
+
+    hasher = PasswordHasher()
+    hashed = hasher.hash("correct horse battery staple")
+    results[f"bcrypt.hash[rounds={BCRYPT_ROUNDS}]"] = measure(
+        lambda: hasher.hash("correct horse battery staple"), max(3, iterations // 50), warmup=1)
+    results[f"bcrypt.verify[rounds={BCRYPT_ROUNDS}]"] = measure(
+        lambda: hasher.verify("correct horse battery staple", hashed), max(3, iterations // 50), warmup=1)
+
+    def user(i: int) -> dict:
+        return {"id": f"user-{i}", "email": f"user{i}@example.com", "name": "Bench",
+                "role": "user", "subscription_tier": "free"}
+    counter = iter(range(10 ** 9))
+    results["jwt.create"] = measure(lambda: AuthService.create_jwt_token(user(next(counter))), iterations)
+
+    tokens = iter([AuthService.create_jwt_token(user(i)) for i in range(iterations + 20)])
+    results["jwt.verify cold"] = measure(lambda: AuthService.verify_jwt_token(next(tokens)), iterations)
+    token = AuthService.create_jwt_token(user(-1))
+    AuthService.verify_jwt_token(token)
+    results["jwt.verify cached"] = measure(lambda: AuthService.verify_jwt_token(token), iterations * 10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and user counts")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 when slower than the baseline")
+    parser.add_argument("--only", choices=["memory", "extraction", "prompt", "auth"], action="append")
+    args = parser.parse_args(argv)
+
+    iterations = 100 if args.quick else 500
+    user_counts = (100, 1000) if args.quick else (100, 1000, 10000)
+    groups = {
+        "memory": lambda results: bench_memory(results, user_counts, iterations),
+        "extraction": lambda results: bench_extraction(results, max(5, iterations // 25)),
+        "prompt": lambda results: bench_prompt(results, iterations),
+        "auth": lambda results: bench_auth(results, iterations),
+    }
+    results = {}
+    try:
+        for name in args.only or groups:
+            print(f"⏱️ Running {name} benchmarks...")
+            groups[name](results)
+    finally:
+        memory_cache.close()
+        conversation_log.close()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    return finish(SUITE, results, save=args.save, check=args.check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Cold-start benchmark: API import time and time to the first auth response.
+
+    python -m mentor_agent.benchmarks.startup [--runs 5] [--top 15] [--save] [--check]
+
+Each run is a fresh interpreter that imports mentor_agent.main, enters the
+app's lifespan (which starts background warm-up), requests `/` (the first
+response: the worker is taking traffic) and logs in as the demo user
+through httpx's ASGI transport. The login adds one bcrypt check at
+BCRYPT_ROUNDS, which every login pays. The LLM provider is groq without a
+GROQ_API_KEY, so the run also checks that auth works without one. A final
+`python -X importtime` run lists the slowest imports.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from mentor_agent.benchmarks.harness import summarize, finish
+
+SUITE = "startup"
+
+CHILD = """
+import os, sys, json, time
+started = time.perf_counter()
+from mentor_agent.main import app
+imported = time.perf_counter()
+import asyncio, httpx
+
+async def first_login():
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            (await client.get("/")).raise_for_status()
+            answered = time.time()
+            response = await client.post("/IndieMentor/api/v1/auth/login",
+                                         json={"email": "demo@example.com", "password": "demo123"})
+            response.raise_for_status()
+            logged_in = time.time()
+    return answered, logged_in
+
+spawned_at = float(os.environ["BENCH_SPAWNED_AT"])
+answered, logged_in = asyncio.run(first_login())
+print(json.dumps({"import": imported - started, "first_response": answered - spawned_at,
+                  "first_login": logged_in - spawned_at}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+def child_env(work_dir: str) -> dict:
+    env = dict(os.environ)
+    for name in ("GROQ_API_KEY", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_ANON_KEY", "STATE_BACKEND",
+                 "PYTHONDONTWRITEBYTECODE"):
+        env.pop(name, None)
+    env.update({
+        "MEMORY_DB_PATH": os.path.join(work_dir, "user_memory.db"),
+        "JOB_DB_PATH": os.path.join(work_dir, "jobs.db"),
+        "CONVERSATION_DB_PATH": os.path.join(work_dir, "conversations.db"),
+        "LLM_PROVIDERS": "groq",
+    })
+    return env
+
+
+def run_once(env: dict) -> dict:
+    env = dict(env, BENCH_SPAWNED_AT=repr(time.time()))
+    completed = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, timeout=120)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    """(cumulative seconds, module) for the slowest imports of mentor_agent.main"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import mentor_agent.main"],
+                               env=env, capture_output=True, text=True, timeout=120)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative) / 1e6, module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 when slower than the baseline")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="mentor-startup-")
+    try:
+        env = child_env(work_dir)
+        run_once(env)  # compiles bytecode, so later runs measure a normal cold start
+        runs = [run_once(env) for _ in range(args.runs)]
+        imports = slowest_imports(env, args.top)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("🐢 Slowest imports (cumulative) of mentor_agent.main:")
+    for seconds, module in imports:
+        print(f"  {seconds * 1000:8.1f} ms  {module}")
+    results = {}
+    for name, key in (("import mentor_agent.main", "import"), ("spawn to first response", "first_response"),
+                      ("spawn to first login", "first_login")):
+        samples = [run[key] for run in runs]
+        results[name] = summarize(samples, sum(samples))
+    return finish(SUITE, results, save=args.save, check=args.check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,51 @@
-from fastapi import FastAPI, APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from mentor_agent.routes.setup import setup_router
 from mentor_agent.routes.chat import chat_router
 from mentor_agent.routes.auth import auth_router
+from mentor_agent.routes.upload import upload_router
+from mentor_agent.routes.jobs import jobs_router
+from mentor_agent.memory.store import memory_cache
+from mentor_agent.services.auth_service import supabase_directory, token_cache, supabase_enabled, get_supabase
+from mentor_agent.services.job_queue import job_queue
+from mentor_agent.services.metrics import (
+    metrics, request_seconds, request_profiler, start_request_timings, server_timing, cache_collector, PROFILE_HEADER
+)
+from mentor_agent.agents.response_cache import response_cache
+from mentor_agent.states.mentor_flow import get_mentor_graph, collect_llm_metrics
+from mentor_agent.services.turn_coordinator import chat_turns
+from mentor_agent.services.conversation_log import conversation_log
+from mentor_agent.services.ingestion_service import load_parsers
+from mentor_agent.services.retrieval_service import retrieval_service
+from mentor_agent.services.warmup import warmup
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import os
+import time
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
 
-app = FastAPI(title="Mentor Agent Backend")
+async def start_background_sync():
+    supabase_directory.start()
+    job_queue.start()
+    warmup.start()
+
+def flush_memory():
+    supabase_directory.stop()
+    job_queue.stop()
+    memory_cache.close()
+    conversation_log.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_background_sync()
+    try:
+        yield
+    finally:
+        flush_memory()
+
+app = FastAPI(title="Mentor Agent Backend", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -25,9 +61,66 @@ api_router = APIRouter(prefix="/IndieMentor/api/v1")
 api_router.include_router(setup_router, prefix="/setup", tags=["Setup"])
 api_router.include_router(chat_router, prefix="/chat", tags=["Chat"])
 api_router.include_router(auth_router, prefix="/auth", tags=["Authentication"])
+api_router.include_router(upload_router, prefix="/upload", tags=["Upload"])
+api_router.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
 
 app.include_router(api_router)
 
+metrics.register_collector(cache_collector("memory", memory_cache.stats))
+metrics.register_collector(cache_collector("response", response_cache.stats))
+metrics.register_collector(cache_collector("jwt", token_cache.stats))
+metrics.register_collector(collect_llm_metrics)
+metrics.register_collector(chat_turns.collect)
+metrics.register_collector(conversation_log.collect)
+
+# Heavy components load on first use; warm them in the background once the server is up
+warmup.register("mentor_graph", get_mentor_graph)
+warmup.register("document_parsers", load_parsers)
+warmup.register("retrieval", retrieval_service.warm)
+if supabase_enabled:
+    warmup.register("supabase", get_supabase)
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Record request latency and per-stage timings; profile the request when asked to"""
+    timings = start_request_timings()
+    profile = None
+    if request_profiler.wanted(request.headers.get(PROFILE_HEADER)):
+        profile = request_profiler.start()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        route = request.scope.get("route")
+        request_seconds.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "name", "unmatched"),
+            status=status_code
+        )
+        if profile is not None:
+            profile_path = request_profiler.stop(profile, request.url.path)
+    if timings:
+        response.headers["Server-Timing"] = server_timing(timings)
+    if profile is not None:
+        response.headers["X-Profile-File"] = os.path.basename(profile_path)
+    return response
+
 @app.get("/")
 def root():
-    return JSONResponse(status_code=200, content={"message": "Welcome to the Mentor Agent API!"})
\ No newline at end of file
+    return JSONResponse(status_code=200, content={"message": "Welcome to the Mentor Agent API!"})
+
+@app.get("/ready", include_in_schema=False)
+def readiness():
+    """200 once background warm-up has finished, 503 while it is still running"""
+    ready = warmup.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "components": warmup.status()}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
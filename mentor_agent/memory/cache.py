@@ -0,0 +1,227 @@
+import copy
+import threading
+from collections import OrderedDict, defaultdict
+from mentor_agent.memory.codecs import json_dumps
+
+
+class MemoryCache:
+    """Bounded LRU cache of user memory records with write-behind flushing.
+
+    Reads are served from the cache when possible. Writes update the cached
+    copy immediately and are queued; a background thread flushes the queue
+    every `flush_interval` seconds, so several updates to the same user in
+    that window turn into a single store write.
+    """
+
+    def __init__(self, store, max_bytes: int = 64 * 1024 * 1024, flush_interval: float = 1.0):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (record, size)
+        self._size = 0
+        self._dirty = {}  # user_id -> full record waiting to be saved
+        self._pending_history = defaultdict(list)  # user_id -> entries waiting to be appended
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writes = 0
+        self.flushes = 0
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="memory-flusher", daemon=True)
+        self._flusher.start()
+
+    @staticmethod
+    def _estimate_size(record: dict) -> int:
+        return len(json_dumps(record))
+
+    def _remember(self, user_id: str, record: dict):
+        if user_id in self._entries:
+            self._size -= self._entries.pop(user_id)[1]
+        size = self._estimate_size(record)
+        self._entries[user_id] = (record, size)
+        self._size += size
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self.evictions += 1
+
+    def get(self, user_id: str) -> dict:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+            if user_id in self._dirty:
+                # Evicted before its write landed; the queued copy is the newest one
+                record = self._dirty[user_id]
+                self._remember(user_id, record)
+                return copy.deepcopy(record)
+
+        # Holding the flush lock keeps a concurrent flush from landing between
+        # the load and the merge of still-queued history entries below
+        with self._flush_lock:
+            record = self.store.load(user_id)
+            with self._lock:
+                entry = self._entries.get(user_id)
+                if entry is not None:
+                    # A write raced with the load and is newer
+                    return copy.deepcopy(entry[0])
+                queued = self._pending_history.get(user_id)
+                if queued:
+                    record["history"] = record.get("history", []) + queued
+                self._remember(user_id, record)
+                return copy.deepcopy(record)
+
+    def put(self, user_id: str, user_data: dict):
+        record = copy.deepcopy(user_data)
+        with self._lock:
+            self._put_owned(user_id, record)
+
+    def _put_owned(self, user_id: str, record: dict):
+        self._remember(user_id, record)
+        self._dirty[user_id] = record
+        self._pending_history.pop(user_id, None)
+        self.writes += 1
+
+    def update(self, user_id: str, fn) -> dict:
+        """Read-modify-write a record under the cache lock; `fn` mutates it in place"""
+        while True:
+            self.get(user_id)
+            with self._lock:
+                entry = self._entries.get(user_id)
+                if entry is None:
+                    continue  # evicted between the load and the lock; load again
+                record = copy.deepcopy(entry[0])
+                fn(record)
+                self._put_owned(user_id, record)
+                return copy.deepcopy(record)
+
+    def append_history(self, user_id: str, entry: dict):
+        entry = copy.deepcopy(entry)
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached is not None:
+                record = cached[0]
+                record.setdefault("history", []).append(entry)
+                self._remember(user_id, record)
+            dirty = self._dirty.get(user_id)
+            if dirty is not None:
+                # The queued full save will carry the entry in its history
+                if cached is None or dirty is not cached[0]:
+                    dirty.setdefault("history", []).append(entry)
+            else:
+                self._pending_history[user_id].append(entry)
+            self.writes += 1
+
+    def flush(self, user_id: str = None):
+        """Write queued updates to the store (all users, or just one)"""
+        with self._flush_lock:
+            with self._lock:
+                if user_id is None:
+                    dirty, self._dirty = self._dirty, {}
+                    pending, self._pending_history = self._pending_history, defaultdict(list)
+                else:
+                    dirty = {user_id: self._dirty.pop(user_id)} if user_id in self._dirty else {}
+                    entries = self._pending_history.pop(user_id, None)
+                    pending = {user_id: entries} if entries else {}
+                dirty = {uid: copy.deepcopy(record) for uid, record in dirty.items()}
+            queued = bool(dirty or pending)
+
+            try:
+                # Each write leaves the batch only once it landed, so a failure requeues the rest
+                for uid in list(dirty):
+                    self.store.save(uid, dirty[uid])
+                    del dirty[uid]
+                for uid in list(pending):
+                    self.store.append_history(uid, pending[uid])
+                    del pending[uid]
+            except Exception:
+                self._requeue(dirty, pending)
+                raise
+            if queued:
+                self.flushes += 1
+
+    def _requeue(self, dirty: dict, pending: dict):
+        """Put back writes that failed to flush, unless newer ones replaced them"""
+        with self._lock:
+            for uid, record in dirty.items():
+                self._dirty.setdefault(uid, record)
+            for uid, entries in pending.items():
+                if uid in self._dirty:
+                    self._dirty[uid].setdefault("history", []).extend(entries)
+                else:
+                    self._pending_history[uid][:0] = entries
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Memory flush failed: {e}")
+
+    def close(self):
+        """Stop the background flusher and write everything still queued"""
+        self._stop.set()
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "flushes": self.flushes,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "queued": len(self._dirty) + len(self._pending_history),
+            }
+
+
+class WriteThroughMemory:
+    """MemoryCache stand-in for stores shared between workers.
+
+    Every call goes straight to the store and `update` relies on the store's
+    own atomic read-modify-write, so all workers see each other's writes.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.reads = 0
+        self.writes = 0
+
+    def get(self, user_id: str) -> dict:
+        self.reads += 1
+        return self.store.load(user_id)
+
+    def put(self, user_id: str, user_data: dict):
+        self.writes += 1
+        self.store.save(user_id, user_data)
+
+    def update(self, user_id: str, fn) -> dict:
+        self.writes += 1
+        return self.store.update(user_id, fn)
+
+    def append_history(self, user_id: str, entry: dict):
+        self.writes += 1
+        self.store.append_history(user_id, [entry])
+
+    def flush(self, user_id: str = None):
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"hits": 0, "misses": self.reads, "writes": self.writes, "entries": 0}
+
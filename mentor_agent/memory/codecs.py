@@ -0,0 +1,217 @@
+"""Storage codecs for memory records.
+
+    python -m mentor_agent.memory.codecs [--vacuum]   # re-encode stored rows with MEMORY_CODEC
+
+Encoded values start with a small header naming the format version, the
+serializer and whether the body is zstd-compressed, so rows written with
+different codecs can be read side by side. Values without the header are
+the plain JSON text earlier versions stored (format version 0).
+"""
+import os
+import sys
+import json
+import argparse
+import threading
+from typing import Union
+
+# json | orjson | msgpack, optionally with +zstd (e.g. "orjson+zstd"); auto = orjson, or json without it.
+# zstd makes rows about 5x smaller but decoding roughly twice as slow (see benchmarks/codecs.py)
+MEMORY_CODEC = os.getenv("MEMORY_CODEC", "auto").lower()
+# Smaller bodies are stored uncompressed: zstd's frame overhead outweighs what it saves
+MEMORY_COMPRESS_MIN_BYTES = int(os.getenv("MEMORY_COMPRESS_MIN_BYTES", 512))
+MEMORY_ZSTD_LEVEL = int(os.getenv("MEMORY_ZSTD_LEVEL", 3))
+
+FORMAT_VERSION = 1
+# 0xC1 never starts JSON text and is the one byte msgpack leaves unused
+MAGIC = b"\xc1m"
+HEADER_SIZE = len(MAGIC) + 3  # magic, format version, serializer id, flags
+FLAG_ZSTD = 1
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(value) -> bytes:
+    """Compact JSON bytes, through orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def json_loads(data: Union[bytes, str]):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class JSONSerializer:
+    name = "json"
+    id = 1
+
+    def dumps(self, value) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Same wire format as JSONSerializer (rows decode with either), several times faster"""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("MEMORY_CODEC=orjson needs the orjson package")
+
+    def dumps(self, value) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    name = "msgpack"
+    id = 2
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("MEMORY_CODEC=msgpack needs the msgpack package")
+        self._msgpack = msgpack
+
+    def dumps(self, value) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes):
+        return self._msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+SERIALIZERS = {"json": JSONSerializer, "orjson": OrjsonSerializer, "msgpack": MsgpackSerializer}
+
+
+class MemoryCodec:
+    """Encodes memory records as header + serialized body, zstd-compressed above `compress_min_bytes`.
+
+    `decode` reads anything an earlier or differently configured codec
+    wrote: legacy JSON text, either serializer, compressed or not.
+    """
+
+    def __init__(self, serializer: str = "json", compress: bool = False,
+                 compress_min_bytes: int = MEMORY_COMPRESS_MIN_BYTES, level: int = MEMORY_ZSTD_LEVEL):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown memory serializer: {serializer}")
+        self.serializer = SERIALIZERS[serializer]()
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+        if compress:
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("MEMORY_CODEC=...+zstd needs the zstandard package")
+            self._zstd = zstandard
+        else:
+            self._zstd = None
+        self._decoders = {}  # serializer id -> serializer used to read it
+        self._local = threading.local()  # zstd contexts aren't safe to share between threads
+        self.name = self.serializer.name + ("+zstd" if compress else "")
+
+    def _header(self, flags: int) -> bytes:
+        return MAGIC + bytes((FORMAT_VERSION, self.serializer.id, flags))
+
+    def _compressor(self):
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = self._zstd.ZstdCompressor(level=self.level)
+        return compressor
+
+    def _decompressor(self):
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            import zstandard
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        return decompressor
+
+    def _decoder(self, serializer_id: int):
+        decoder = self._decoders.get(serializer_id)
+        if decoder is None:
+            if serializer_id == JSONSerializer.id:
+                decoder = OrjsonSerializer() if orjson is not None else JSONSerializer()
+            elif serializer_id == MsgpackSerializer.id:
+                decoder = MsgpackSerializer()
+            else:
+                raise ValueError(f"Unknown memory serializer id: {serializer_id}")
+            self._decoders[serializer_id] = decoder
+        return decoder
+
+    def encode(self, value) -> bytes:
+        body = self.serializer.dumps(value)
+        if self.compress and len(body) >= self.compress_min_bytes:
+            return self._header(FLAG_ZSTD) + self._compressor().compress(body)
+        return self._header(0) + body
+
+    def decode(self, data: Union[bytes, str]):
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            return json_loads(data)  # format version 0: plain JSON text
+        version, serializer_id, flags = data[len(MAGIC):HEADER_SIZE]
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Memory record format version {version} is newer than this code ({FORMAT_VERSION})")
+        body = data[HEADER_SIZE:]
+        if flags & FLAG_ZSTD:
+            body = self._decompressor().decompress(body)
+        return self._decoder(serializer_id).loads(body)
+
+    def is_current(self, data: Union[bytes, str]) -> bool:
+        """Whether `data` is exactly what `encode` would write for its value now"""
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            return False
+        version, serializer_id, flags = data[len(MAGIC):HEADER_SIZE]
+        if version != FORMAT_VERSION or serializer_id != self.serializer.id:
+            return False
+        if flags & FLAG_ZSTD:
+            return self.compress
+        return not self.compress or len(data) - HEADER_SIZE < self.compress_min_bytes
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_codec(spec: str = MEMORY_CODEC) -> MemoryCodec:
+    if spec == "auto":
+        return MemoryCodec("orjson" if orjson is not None else "json")
+    serializer, _, compression = spec.partition("+")
+    if compression not in ("", "zstd"):
+        raise ValueError(f"Unknown MEMORY_CODEC compression: {compression}")
+    return MemoryCodec(serializer, compress=compression == "zstd")
+
+
+# Create singleton instance
+memory_codec = build_codec()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-encode stored memory records with MEMORY_CODEC")
+    parser.add_argument("--vacuum", action="store_true", help="compact the database file afterwards")
+    args = parser.parse_args(argv)
+
+    from mentor_agent.memory.store import memory_store, memory_cache
+    if not hasattr(memory_store, "reencode"):
+        print("⚠️ Only the SQLite memory store keeps encoded rows; nothing to migrate")
+        return 0
+    print(f"🔁 Re-encoding memory rows as {memory_codec.name}...")
+    counts = memory_store.reencode(vacuum=args.vacuum)
+    print(f"✅ Re-encoded {counts['records']} records and {counts['history']} history entries")
+    memory_cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,281 @@
 import os
+import asyncio
 import json
+import sqlite3
+import threading
+import atexit
+from mentor_agent.memory.cache import MemoryCache, WriteThroughMemory
+from mentor_agent.memory.codecs import MemoryCodec, memory_codec
+from mentor_agent.services.metrics import store_io_bytes
+from mentor_agent.backends.base import StateBackend
+from mentor_agent.backends.factory import state_backend
 
 MEMORY_PATH = "mentor_agent/memory/user_memory.json"
-os.makedirs(os.path.dirname(MEMORY_PATH), exist_ok=True)
+MEMORY_DB_PATH = os.getenv("MEMORY_DB_PATH", "mentor_agent/memory/user_memory.db")
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+MEMORY_FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "1.0"))
+os.makedirs(os.path.dirname(MEMORY_DB_PATH), exist_ok=True)
+
+
+class SQLiteMemoryStore:
+    """Per-user memory records backed by SQLite.
+
+    Each user is a single row in `user_records`; history entries live in
+    `user_history` and are appended instead of rewriting the whole record,
+    so the cost of a read or write does not depend on how many users exist.
+    Both are stored through `codec`; rows written by another codec (or the
+    JSON text of earlier versions) still read back.
+    """
+
+    def __init__(self, db_path: str = MEMORY_DB_PATH, legacy_path: str = MEMORY_PATH,
+                 codec: MemoryCodec = memory_codec):
+        self.db_path = db_path
+        self.codec = codec
+        self._lock = threading.RLock()
+        # Other workers may hold the write lock briefly; wait for it rather than failing
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS user_records (
+                user_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS user_history (
+                user_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                entry TEXT NOT NULL,
+                PRIMARY KEY (user_id, seq)
+            );
+            """
+        )
+        self._migrate_legacy_json(legacy_path)
+
+    def _migrate_legacy_json(self, legacy_path: str):
+        """Import the old whole-file JSON store once, if the DB is still empty"""
+        if not legacy_path or not os.path.exists(legacy_path):
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM user_records LIMIT 1").fetchone():
+                return
+            with open(legacy_path, "r") as f:
+                try:
+                    legacy = json.load(f)
+                except json.JSONDecodeError:
+                    return
+            for user_id, user_data in legacy.items():
+                self.save(user_id, user_data)
+
+    def load(self, user_id: str) -> dict:
+        with self._lock:
+            return self._load(user_id)
+
+    def _load(self, user_id: str) -> dict:
+        row = self._conn.execute(
+            "SELECT data FROM user_records WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            return {}
+        history = self._conn.execute(
+            "SELECT entry FROM user_history WHERE user_id = ? ORDER BY seq", (user_id,)
+        ).fetchall()
+        store_io_bytes.observe(len(row[0]) + sum(len(entry) for (entry,) in history), op="read")
+        record = self.codec.decode(row[0])
+        record["history"] = [self.codec.decode(entry) for (entry,) in history]
+        return record
+
+    def save(self, user_id: str, user_data: dict):
+        """Write the record and sync history.
+
+        History rows carry absolute sequence numbers; rows before the record's
+        `history_offset` have been compacted away and are deleted. If the given
+        history extends what is stored, only the new tail is appended;
+        otherwise (e.g. a fresh setup) history is replaced.
+        """
+        self._transaction(lambda: self._save(user_id, user_data))
+
+    def update(self, user_id: str, fn) -> dict:
+        """Read-modify-write one record in a single transaction, atomic across processes"""
+        def body():
+            record = self._load(user_id)
+            fn(record)
+            self._save(user_id, record)
+            return record
+        return self._transaction(body)
+
+    def _transaction(self, body):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body()
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _save(self, user_id: str, user_data: dict):
+        record = self.codec.encode({k: v for k, v in user_data.items() if k != "history"})
+        history = user_data.get("history", [])
+        offset = user_data.get("history_offset", 0)
+        self._conn.execute(
+            "INSERT INTO user_records (user_id, data) VALUES (?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data",
+            (user_id, record),
+        )
+        self._conn.execute("DELETE FROM user_history WHERE user_id = ? AND seq < ?", (user_id, offset))
+        (stored,) = self._conn.execute(
+            "SELECT COUNT(*) FROM user_history WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if len(history) < stored:
+            self._conn.execute("DELETE FROM user_history WHERE user_id = ?", (user_id,))
+            stored = 0
+        written = self._insert_history(user_id, offset + stored, history[stored:])
+        store_io_bytes.observe(len(record) + written, op="write")
+
+    def append_history(self, user_id: str, entries: list):
+        """Append history entries without touching the rest of the record"""
+        if entries:
+            self._transaction(lambda: self._append_history(user_id, entries))
+
+    def _append_history(self, user_id: str, entries: list):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO user_records (user_id, data) VALUES (?, ?)", (user_id, self.codec.encode({}))
+        )
+        (next_seq,) = self._conn.execute(
+            "SELECT MAX(seq) + 1 FROM user_history WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if next_seq is None:
+            # No rows (e.g. right after a setup): numbering continues from the record's offset
+            (data,) = self._conn.execute("SELECT data FROM user_records WHERE user_id = ?", (user_id,)).fetchone()
+            next_seq = self.codec.decode(data).get("history_offset", 0)
+        store_io_bytes.observe(self._insert_history(user_id, next_seq, entries), op="write")
+
+    def user_ids(self) -> list:
+        with self._lock:
+            return [user_id for (user_id,) in self._conn.execute("SELECT user_id FROM user_records ORDER BY user_id")]
+
+    def reencode(self, batch_size: int = 500, vacuum: bool = False) -> dict:
+        """Rewrite rows stored in another format with the current codec; returns the counts per table.
+
+        Runs in short transactions of `batch_size` rows, so the store stays
+        usable meanwhile. Rows are read back unchanged either way; this only
+        brings the space and decode savings to data written before.
+        """
+        def batch(table: str, column: str, after: int):
+            rows = self._conn.execute(
+                f"SELECT rowid, {column} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?", (after, batch_size)
+            ).fetchall()
+            stale = [(self.codec.encode(self.codec.decode(value)), rowid)
+                     for rowid, value in rows if not self.codec.is_current(value)]
+            self._conn.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", stale)
+            return (rows[-1][0] if rows else None), len(stale)
+
+        counts = {}
+        for name, table, column in (("records", "user_records", "data"), ("history", "user_history", "entry")):
+            counts[name] = 0
+            last_rowid = 0
+            while last_rowid is not None:
+                last_rowid, changed = self._transaction(lambda: batch(table, column, last_rowid))
+                counts[name] += changed
+        if vacuum:
+            with self._lock:
+                self._conn.execute("VACUUM")
+                # In WAL mode the file only shrinks once the vacuumed pages are checkpointed
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return counts
+
+    def _insert_history(self, user_id: str, start_seq: int, entries: list) -> int:
+        """Insert history rows; returns the number of bytes written"""
+        rows = [(user_id, start_seq + i, self.codec.encode(entry)) for i, entry in enumerate(entries)]
+        self._conn.executemany("INSERT INTO user_history (user_id, seq, entry) VALUES (?, ?, ?)", rows)
+        return sum(len(row[2]) for row in rows)
+
+
+class BackendMemoryStore:
+    """Memory records kept whole (history included) in a state backend.
+
+    Used with a networked backend such as Redis, where the SQLite file
+    can't be shared between nodes. History is bounded by compaction in
+    `record_turn`, so rewriting the record stays cheap.
+    """
+
+    def __init__(self, backend: StateBackend):
+        self.backend = backend
+
+    def load(self, user_id: str) -> dict:
+        return self.backend.get("memory", user_id) or {}
+
+    def save(self, user_id: str, user_data: dict):
+        self.backend.set("memory", user_id, user_data)
+
+    def update(self, user_id: str, fn) -> dict:
+        def apply(record):
+            record = record or {}
+            fn(record)
+            return record
+        return self.backend.update("memory", user_id, apply)
+
+    def append_history(self, user_id: str, entries: list):
+        if entries:
+            self.update(user_id, lambda record: record.setdefault("history", []).extend(entries))
+
+    def user_ids(self) -> list:
+        return sorted(self.backend.keys("memory"))
+
+
+memory_store = BackendMemoryStore(state_backend) if state_backend.kind == "redis" else SQLiteMemoryStore()
+if state_backend.shared:
+    # Other workers write the same records, so a process-local write-behind cache would go stale
+    memory_cache = WriteThroughMemory(memory_store)
+else:
+    memory_cache = MemoryCache(memory_store, max_bytes=MEMORY_CACHE_MAX_BYTES, flush_interval=MEMORY_FLUSH_INTERVAL)
+atexit.register(memory_cache.close)
+
 
 def get_user_memory(user_id: str):
-    if os.path.exists(MEMORY_PATH):
-        with open(MEMORY_PATH, "r") as f:
-            memory = json.load(f)
-        return memory.get(user_id, {})
-    return {}
+    return memory_cache.get(user_id)
+
 
 def update_user_memory(user_id: str, user_data: dict):
-    memory = {}
-    if os.path.exists(MEMORY_PATH):
-        with open(MEMORY_PATH, "r") as f:
-            memory = json.load(f)
-    memory[user_id] = user_data
-    with open(MEMORY_PATH, "w") as f:
-        json.dump(memory, f, indent=2)
+    memory_cache.put(user_id, user_data)
+
+
+def append_user_history(user_id: str, entry: dict):
+    memory_cache.append_history(user_id, entry)
+
+
+def modify_user_memory(user_id: str, fn):
+    """Apply `fn` to the user's record as one atomic read-modify-write"""
+    return memory_cache.update(user_id, fn)
+
+
+def flush_user_memory():
+    memory_cache.flush()
+
+
+def list_user_ids() -> list:
+    """Every user with a memory record, including writes still queued in the cache"""
+    memory_cache.flush()
+    return memory_store.user_ids()
+
+
+def memory_cache_stats() -> dict:
+    return memory_cache.stats()
+
+
+async def aget_user_memory(user_id: str):
+    return await asyncio.to_thread(get_user_memory, user_id)
+
+
+async def aupdate_user_memory(user_id: str, user_data: dict):
+    await asyncio.to_thread(update_user_memory, user_id, user_data)
+
+
+async def aappend_user_history(user_id: str, entry: dict):
+    await asyncio.to_thread(append_user_history, user_id, entry)
+
+
+async def amodify_user_memory(user_id: str, fn):
+    return await asyncio.to_thread(modify_user_memory, user_id, fn)
@@ -1,6 +1,11 @@
 # mentor_agent/models/conversation_state.py
 from pydantic import BaseModel
+from typing import Optional
 
 class MentorState(BaseModel):
     user_id: str
     input: str
+    reply: Optional[str] = None
+    analytics: dict = {}
+    tokens: int = 0  # estimated LLM tokens the turn used (0 when answered from the response cache)
+    stream: bool = False  # tokens are relayed to the client as they arrive
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, status
 from mentor_agent.models.auth import RegisterResponse, UserRegister, UserLogin, LoginResponse, UserResponse
-from mentor_agent.services.auth_service import auth_service, users_db
+from mentor_agent.services.auth_service import auth_service, user_repository, security
+from fastapi.security import HTTPAuthorizationCredentials
+from mentor_agent.services.user_repository import UserAlreadyExists
+from mentor_agent.services.password_hasher import PasswordHasherOverloaded
 import uuid
 from datetime import datetime, timezone
 
 auth_router = APIRouter()
 
+def hashing_overloaded(e: PasswordHasherOverloaded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
 @auth_router.post("/register", response_model=RegisterResponse)
 async def register(user_data: UserRegister):
     """Register a new user"""
@@ -24,7 +34,10 @@ async def register(user_data: UserRegister):
         )
 
     # Hash password
-    hashed_password = auth_service.hash_password(user_data.password)
+    try:
+        hashed_password = await auth_service.ahash_password(user_data.password)
+    except PasswordHasherOverloaded as e:
+        raise hashing_overloaded(e)
 
     # Create user object
     new_user = {
@@ -41,14 +54,27 @@ async def register(user_data: UserRegister):
     }
 
     # Save to Supabase
-    supabase_success, auth_user_id = await auth_service.save_user_to_supabase(new_user)
+    try:
+        supabase_success, auth_user_id = await auth_service.save_user_to_supabase(new_user)
+    except UserAlreadyExists:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User already exists in Supabase"
+        )
 
     if supabase_success and auth_user_id:
         new_user["id"] = auth_user_id
         print(f"🔄 Updated user ID to Supabase Auth ID: {auth_user_id}")
 
-    # Add to in-memory storage
-    users_db.append(new_user)
+    # Add to the user repository (the plain password was only needed for Supabase)
+    new_user.pop("plain_password", None)
+    try:
+        user_repository.add(new_user)
+    except UserAlreadyExists:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User already exists in memory"
+        )
 
     print(f"✅ User registered successfully: {user_data.email}")
 
@@ -72,7 +98,7 @@ async def register(user_data: UserRegister):
     )
 
 @auth_router.post("/login", response_model=LoginResponse)
-async def login(login_data: UserLogin):
+async def login(login_data: UserLogin, background_tasks: BackgroundTasks):
     """Login user and return JWT token"""
     user = auth_service.find_user_by_email(login_data.email)
     if not user:
@@ -81,12 +107,19 @@ async def login(login_data: UserLogin):
             detail="Invalid credentials"
         )
 
-    if not auth_service.verify_password(login_data.password, user["password"]):
+    try:
+        password_ok = await auth_service.averify_password(login_data.password, user["password"])
+    except PasswordHasherOverloaded as e:
+        raise hashing_overloaded(e)
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid credentials"
         )
 
+    # Upgrade hashes made with an old cost factor, after the response is sent
+    background_tasks.add_task(auth_service.rehash_password_if_needed, user["id"], login_data.password, user["password"])
+
     token = auth_service.create_jwt_token(user)
 
     user_response = UserResponse(
@@ -119,3 +152,9 @@ async def get_current_user_info(current_user: dict = Depends(auth_service.get_cu
             "created_at": current_user["created_at"]
         }
     }
+
+@auth_router.post("/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Revoke the current JWT token"""
+    auth_service.revoke_jwt_token(credentials.credentials)
+    return {"message": "Logged out"}
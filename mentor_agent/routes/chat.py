@@ -1,54 +1,146 @@
-from fastapi import APIRouter, Form, Request, Query, UploadFile, File
-from mentor_agent.states.mentor_flow import mentor_graph
-from mentor_agent.memory.store import get_user_memory, update_user_memory
-import os
-import fitz
-import docx
+from fastapi import APIRouter, Depends, Form, Request, Query, UploadFile, File, HTTPException, status
+from fastapi.responses import StreamingResponse
+from mentor_agent.states.mentor_flow import aget_mentor_graph
+from mentor_agent.states.output_parser import StreamingReplyParser
+from mentor_agent.memory.store import aget_user_memory
+from mentor_agent.services.ingestion_service import UnsupportedDocumentError
+from mentor_agent.services.document_jobs import submit_upload
+from mentor_agent.services.turn_coordinator import chat_turns, UserBusy
+from mentor_agent.services.conversation_log import conversation_log
+from mentor_agent.services.quotas import Caller, quotas, chat_quota, request_quota, check_upload_size
+from mentor_agent.services.auth_service import auth_service
+from typing import Optional
+import asyncio
+import json
 
 chat_router = APIRouter()
-UPLOAD_FOLDER = "mentor_agent/uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-def extract_text_from_pdf(file_path):
-    text = ""
-    with fitz.open(file_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-def extract_text_from_docx(file_path):
-    doc = docx.Document(file_path)
-    return "\n".join([para.text for para in doc.paragraphs])
+def user_busy(e: UserBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+async def stream_chat(graph, payload: dict, caller: Caller):
+    """Relay LLM tokens from the mentor graph as server-sent events.
+
+    Only reply text is relayed: the RESPONSE header and SENTIMENT/TOPIC
+    trailer are held back by StreamingReplyParser. When a provider fails
+    mid-stream and a retry or another provider takes over, its tokens come
+    from a new model run: a `reset` event tells the client to discard the
+    text shown so far, and the new run gets a fresh parser. The graph node
+    still runs to completion (history append included), and its final state
+    is sent as a closing `done` event with the parsed analytics.
+    Streamed turns are ordered with the user's other turns but not deduplicated,
+    since a second caller couldn't be replayed the tokens already sent.
+    The turn's LLM tokens are charged to the caller's daily quota at the end.
+    """
+    result = {}
+    parser = None
+    run_id = None
+    abandoned = set()  # runs of failed attempts; late tokens from them are dropped
+    try:
+        async with chat_turns.turn(payload["user_id"]):
+            async for event in graph.astream_events({**payload, "stream": True}, version="v2"):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    if event["run_id"] != run_id:
+                        if event["run_id"] in abandoned:
+                            continue
+                        if run_id is not None:
+                            abandoned.add(run_id)
+                            if parser.started:
+                                yield sse_event("reset", {})
+                        parser = StreamingReplyParser()
+                        run_id = event["run_id"]
+                    text = parser.feed(event["data"]["chunk"].content)
+                    if text:
+                        yield sse_event("token", text)
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    result = event["data"].get("output") or {}
+            text = parser.flush() if parser is not None else ""
+            if text:
+                yield sse_event("token", text)
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+        return
+    quotas.charge_llm_tokens(caller, result.get("tokens", 0))
+    yield sse_event("done", {
+        "response": result.get("reply", "No reply generated"),
+        "analytics": result.get("analytics", {})
+    })
 
 @chat_router.post("/", summary="Chat with a mentor bot", description="Send a message and optionally upload a document for context.")
 async def chat(request: Request,
                bot_id: str = Query(...),
                text_input: str = Form(..., description="Message you want to send to your mentor bot"),
-               file: UploadFile = File(None)
+               file: UploadFile = File(None),
+               stream: bool = Query(False, description="Stream the reply as server-sent events"),
+               caller: Caller = Depends(chat_quota)
             ):
     # body = await request.json()
     user_input = text_input
-    document_text = ""
 
+    document_job = None
     if file:
-        ext = file.filename.split(".")[-1].lower()
-        path = os.path.join(UPLOAD_FOLDER, file.filename)
-        with open(path, "wb") as f:
-            f.write(file.file.read())
-        if ext == "pdf":
-            document_text = extract_text_from_pdf(path)
-        elif ext in ["doc", "docx"]:
-            document_text = extract_text_from_docx(path)
-
-        memory = get_user_memory(bot_id)
-        memory.setdefault("documents", []).append({"filename": file.filename, "content": document_text})
-        update_user_memory(bot_id, memory)
-
-    memory = get_user_memory(bot_id)
+        # The document is ingested in the background and becomes retrievable once its job succeeds
+        try:
+            document_job = await asyncio.to_thread(
+                submit_upload, bot_id, file, lambda upload: check_upload_size(caller, upload))
+        except UnsupportedDocumentError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    memory = await aget_user_memory(bot_id)
     profile = memory.get("profile", {})
 
-    result = mentor_graph.invoke({"input": user_input, "user_id": bot_id, "profile": profile})
-    return {
+    try:
+        graph = await aget_mentor_graph()
+    except Exception as e:
+        # e.g. GROQ_API_KEY missing; the rest of the API keeps working
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Mentor model unavailable: {e}")
+
+    payload = {"input": user_input, "user_id": bot_id, "profile": profile}
+    if stream:
+        if chat_turns.is_full(bot_id):
+            raise user_busy(UserBusy())
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        if document_job:
+            headers["X-Document-Job"] = document_job["job_id"]
+        return StreamingResponse(
+            stream_chat(graph, payload, caller),
+            media_type="text/event-stream",
+            headers=headers
+        )
+
+    # One turn at a time per user, so each turn's prompt sees the previous turn's history
+    try:
+        result, deduplicated = await chat_turns.run(bot_id, user_input, lambda: graph.ainvoke(payload))
+    except UserBusy as e:
+        raise user_busy(e)
+    if not deduplicated:
+        quotas.charge_llm_tokens(caller, result.get("tokens", 0))
+    response = {
         "response": result.get("reply", "No reply generated"),
         "analytics": result.get("analytics", {})
     }
+    if document_job:
+        response["document_job"] = document_job
+    return response
+
+def owned_bot(bot_id: str = Query(...), current_user: dict = Depends(auth_service.get_current_user)) -> str:
+    """The bot id, once the signed-in user is confirmed as its owner (bots are keyed by their owner's user id)"""
+    if bot_id != current_user["id"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not your mentor bot")
+    return bot_id
+
+@chat_router.get("/history", summary="Conversation history", description="Past turns of your mentor bot, newest first. Pass `next_cursor` back as `cursor` for older turns.")
+async def chat_history(bot_id: str = Depends(owned_bot),
+                       cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+                       limit: int = Query(20, ge=1, le=100),
+                       caller: Caller = Depends(request_quota)
+                    ):
+    return await asyncio.to_thread(conversation_log.page, bot_id, cursor, limit)
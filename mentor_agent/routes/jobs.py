@@ -0,0 +1,12 @@
+from fastapi import APIRouter, HTTPException, status
+from mentor_agent.services.job_queue import job_queue
+import asyncio
+
+jobs_router = APIRouter()
+
+@jobs_router.get("/{job_id}", summary="Get background job status")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
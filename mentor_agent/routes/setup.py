@@ -1,25 +1,14 @@
 from typing import List, Optional
-from fastapi import APIRouter, Body, Form, UploadFile, File
+from fastapi import APIRouter, Body, Depends, Form, UploadFile, File, HTTPException, status
 from mentor_agent.models.user_setup import UserSetup
-from mentor_agent.memory.store import get_user_memory, update_user_memory
-import os
-import fitz  # PyMuPDF
-import docx
+from mentor_agent.memory.store import aget_user_memory, aupdate_user_memory
+from mentor_agent.services.ingestion_service import UnsupportedDocumentError
+from mentor_agent.services.retrieval_service import retrieval_service
+from mentor_agent.services.document_jobs import submit_upload
+from mentor_agent.services.quotas import Caller, request_quota, check_upload_size
+import asyncio
 
 setup_router = APIRouter()
-UPLOAD_FOLDER = "mentor_agent/uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-def extract_text_from_pdf(file_path):
-    text = ""
-    with fitz.open(file_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
-
-def extract_text_from_docx(file_path):
-    doc = docx.Document(file_path)
-    return "\n".join([para.text for para in doc.paragraphs])
 
 @setup_router.post(
     "/",
@@ -35,7 +24,8 @@ async def setup_user(
     weaknesses: Optional[List[str]] = Form(default=[]),
     mentor_type: Optional[str] = Form(default="Tech Mentor"),
     personality: Optional[str] = Form(default="Concise"),
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    caller: Caller = Depends(request_quota)
 ):
 
     user_data = UserSetup(
@@ -50,28 +40,29 @@ async def setup_user(
     )
 
 
-    document_text = ""
-    filename = None
+    previous = await aget_user_memory(user_data.user_id)
 
-    if file:
-        ext = file.filename.split(".")[-1].lower()
-        path = os.path.join(UPLOAD_FOLDER, file.filename)
-        with open(path, "wb") as f:
-            f.write(file.file.read())
-        if ext == "pdf":
-            document_text = extract_text_from_pdf(path)
-        elif ext in ["doc", "docx"]:
-            document_text = extract_text_from_docx(path)
-        filename = file.filename
+    # A fresh setup starts from an empty document index
+    await asyncio.to_thread(retrieval_service.reset, user_data.user_id)
 
     memory = {
         "profile": user_data.dict(),
         "tasks": [],
         "history": [],
-        "documents": [{"filename": filename, "content": document_text}] if file else [],
-        "last_check": None
+        "documents": [],
+        "last_check": None,
+        # Turn numbers keep counting across setups, so logged turns never reuse an earlier turn's key
+        "history_offset": previous.get("history_offset", 0) + len(previous.get("history", [])),
     }
 
-    update_user_memory(user_data.user_id, memory)
-    return {"message": "Mentor bot created.", "user_id": user_data.user_id}
+    await aupdate_user_memory(user_data.user_id, memory)
 
+    response = {"message": "Mentor bot created.", "user_id": user_data.user_id}
+    if file:
+        # Extraction and indexing run in the background; the document is added to memory when done
+        try:
+            response["document_job"] = await asyncio.to_thread(
+                submit_upload, user_data.user_id, file, lambda upload: check_upload_size(caller, upload))
+        except UnsupportedDocumentError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return response
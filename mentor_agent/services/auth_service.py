@@ -2,12 +2,18 @@ from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, List
 import jwt
-import bcrypt
 import uuid
 from datetime import datetime, timedelta, timezone
 import os
-from supabase import create_client, Client
+import asyncio
+import threading
 from dotenv import load_dotenv
+from mentor_agent.services.user_repository import UserRepository, UserAlreadyExists
+from mentor_agent.backends.factory import state_backend
+from mentor_agent.services.supabase_directory import SupabaseUserDirectory
+from mentor_agent.services.password_hasher import password_hasher
+from mentor_agent.services.token_cache import VerifiedTokenCache, token_digest
+from mentor_agent.services.metrics import timed
 
 # Load environment variables
 load_dotenv('.env.local')
@@ -24,6 +30,24 @@ JWT_SECRET = os.getenv("JWT_SECRET", "your_super_secret_jwt_key_for_development_
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
 
+def parse_jwt_keys(value: Optional[str]) -> dict:
+    """JWT_SECRETS="kid1:secret1,kid2:secret2" -> {"kid1": "secret1", "kid2": "secret2"}"""
+    keys = {}
+    for item in (value or "").split(","):
+        if ":" in item:
+            kid, secret = item.split(":", 1)
+            keys[kid.strip()] = secret.strip()
+    return keys
+
+# Key rotation: every key in JWT_SECRETS is accepted, new tokens are signed with JWT_ACTIVE_KID
+JWT_KEYS = parse_jwt_keys(os.getenv("JWT_SECRETS")) or {"default": JWT_SECRET}
+# Tokens issued before key rotation have no kid; they were signed with JWT_SECRET
+JWT_LEGACY_KID = "default"
+JWT_KEYS.setdefault(JWT_LEGACY_KID, JWT_SECRET)
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID", next(iter(JWT_KEYS)))
+if JWT_ACTIVE_KID not in JWT_KEYS:
+    raise ValueError(f"JWT_ACTIVE_KID {JWT_ACTIVE_KID!r} is not one of the configured JWT_SECRETS")
+
 # Supabase Configuration - Prioritize SERVICE_ROLE_KEY
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -34,28 +58,55 @@ SUPABASE_KEY = SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY
 
 print(f"🔑 Using key type: {'SERVICE_ROLE' if SUPABASE_SERVICE_ROLE_KEY else 'ANON' if SUPABASE_ANON_KEY else 'NONE'}")
 
-# Initialize Supabase client
-supabase: Optional[Client] = None
-supabase_enabled = False
+# Supabase client, created on first use: importing supabase alone takes a good part of a second
+supabase = None
+supabase_enabled = bool(SUPABASE_URL and SUPABASE_KEY and SUPABASE_URL != "your_supabase_url")
+_supabase_lock = threading.Lock()
 
-if SUPABASE_URL and SUPABASE_KEY and SUPABASE_URL != "your_supabase_url":
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-        supabase_enabled = True
-        key_type = "service role" if os.getenv("SUPABASE_SERVICE_ROLE_KEY") else "anon"
-        print(f"✅ Supabase client initialized successfully with {key_type} key")
-    except Exception as e:
-        print(f"⚠️ Supabase initialization failed: {e}")
-        supabase_enabled = False
-else:
+if not supabase_enabled:
     print("⚠️ Supabase credentials not configured")
     print("💡 App will run without Supabase integration")
 
+def get_supabase():
+    """The Supabase client, or None when it isn't configured or failed to initialize"""
+    global supabase, supabase_enabled
+    if supabase is None and supabase_enabled:
+        with _supabase_lock:
+            if supabase is None and supabase_enabled:
+                try:
+                    from supabase import create_client
+                    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+                    key_type = "service role" if SUPABASE_SERVICE_ROLE_KEY else "anon"
+                    print(f"✅ Supabase client initialized successfully with {key_type} key")
+                except Exception as e:
+                    print(f"⚠️ Supabase initialization failed: {e}")
+                    supabase_enabled = False
+    return supabase
+
+def supabase_admin():
+    client = get_supabase()
+    return client.auth.admin if client is not None else None
+
+# Mirror of Supabase Auth emails; only usable with the service role key (auth.admin)
+supabase_directory = SupabaseUserDirectory(
+    connect=supabase_admin if supabase_enabled and SUPABASE_SERVICE_ROLE_KEY else None,
+)
+
+def is_duplicate_user_error(error: Exception) -> bool:
+    if getattr(error, "code", None) in ("email_exists", "user_already_exists"):
+        return True
+    error_str = str(error).lower()
+    return "already been registered" in error_str or "already exists" in error_str or "duplicate" in error_str
+
 # Security
 security = HTTPBearer()
+token_cache = VerifiedTokenCache(backend=state_backend)
+
+# User storage, indexed by id and email (shared between workers when STATE_BACKEND is)
+user_repository = UserRepository(state_backend)
 
-# In-memory user storage (for demo/testing)
-users_db = [
+# Demo users (for demo/testing)
+demo_users = [
     {
         "id": "550e8400-e29b-41d4-a716-446655440001",
         "email": "demo@example.com",
@@ -80,6 +131,12 @@ users_db = [
     }
 ]
 
+for demo_user in demo_users:
+    try:
+        user_repository.add(demo_user)
+    except UserAlreadyExists:
+        pass  # seeded by an earlier run or another worker
+
 class AuthService:
     @property
     def supabase_enabled(self):
@@ -88,13 +145,32 @@ class AuthService:
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash a password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        return password_hasher.hash(password)
 
     @staticmethod
     def verify_password(password: str, hashed: str) -> bool:
         """Verify a password against its hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        return password_hasher.verify(password, hashed)
+
+    @staticmethod
+    async def ahash_password(password: str) -> str:
+        """Hash a password on the bcrypt worker pool"""
+        return await password_hasher.ahash(password)
+
+    @staticmethod
+    async def averify_password(password: str, hashed: str) -> bool:
+        """Verify a password on the bcrypt worker pool"""
+        return await password_hasher.averify(password, hashed)
+
+    @staticmethod
+    async def rehash_password_if_needed(user_id: str, password: str, hashed: str):
+        """Re-hash with the configured cost factor after a successful login"""
+        if not password_hasher.needs_rehash(hashed):
+            return
+        try:
+            user_repository.update(user_id, password=await password_hasher.ahash(password))
+        except Exception as e:
+            print(f"⚠️ Password rehash skipped: {e}")
 
     @staticmethod
     def create_jwt_token(user_data: dict) -> str:
@@ -109,34 +185,54 @@ class AuthService:
             "exp": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
         }
 
-        token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-        print(f"🔑 JWT Token: {token}")
-        return token
+        return jwt.encode(payload, JWT_KEYS[JWT_ACTIVE_KID], algorithm=JWT_ALGORITHM, headers={"kid": JWT_ACTIVE_KID})
 
     @staticmethod
     def verify_jwt_token(token: str) -> dict:
         """Verify and decode JWT token"""
-        try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        digest = token_digest(token)
+        if token_cache.is_revoked(digest):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+
+        payload = token_cache.get(digest)
+        if payload is not None:
             return payload
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid", JWT_LEGACY_KID)
+            secret = JWT_KEYS.get(kid)
+            if secret is None:
+                raise jwt.InvalidTokenError(f"Unknown key id: {kid}")
+            payload = jwt.decode(token, secret, algorithms=[JWT_ALGORITHM])
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
 
+        token_cache.put(digest, payload)
+        return payload
+
     @staticmethod
-    def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-        """Get current user from JWT token"""
-        token = credentials.credentials
+    def revoke_jwt_token(token: str):
+        """Reject this token from now on, even though its signature is still valid"""
         payload = AuthService.verify_jwt_token(token)
+        token_cache.revoke(token_digest(token), float(payload.get("exp", 0)))
 
-        user = next((u for u in users_db if u["id"] == payload["user_id"]), None)
+    @staticmethod
+    def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Get current user from JWT token"""
+        with timed("auth"):
+            payload = AuthService.verify_jwt_token(credentials.credentials)
+            user = user_repository.get_by_id(payload["user_id"])
 
         if not user:
             raise HTTPException(
@@ -148,13 +244,13 @@ class AuthService:
 
     @staticmethod
     def find_user_by_email(email: str) -> Optional[dict]:
-        """Find user by email in memory storage"""
-        return next((u for u in users_db if u["email"] == email), None)
+        """Find user by email in the user repository"""
+        return user_repository.get_by_email(email)
 
     @staticmethod
     async def check_user_exists_in_supabase(email: str) -> bool:
         """Check if user exists in Supabase Auth"""
-        if not supabase_enabled or not supabase:
+        if await asyncio.to_thread(get_supabase) is None:
             print("🔍 Supabase not enabled, skipping user existence check")
             return False
 
@@ -164,23 +260,16 @@ class AuthService:
             return False
 
         try:
-            print(f"🔍 Checking if user {email} exists in Supabase...")
-            result = supabase.auth.admin.list_users()
-            if result and hasattr(result, 'users') and result.users:
-                for user in result.users:
-                    if user.email == email:
-                        print(f"✅ User {email} found in Supabase")
-                        return True
-            print(f"❌ User {email} not found in Supabase")
-            return False
+            return await asyncio.to_thread(supabase_directory.exists, email)
         except Exception as e:
             print(f"⚠️ Error checking Supabase user existence: {e}")
             return False
 
     @staticmethod
     async def save_user_to_supabase(user_data: dict) -> tuple[bool, Optional[str]]:
-        """Save user data to Supabase Auth and profiles table"""
-        if not supabase_enabled or not supabase:
+        """Save user data to Supabase Auth and profiles table; raises UserAlreadyExists if Auth has the email"""
+        supabase = await asyncio.to_thread(get_supabase)
+        if supabase is None:
             print("⚠️ Supabase not configured, skipping user save")
             return False, None
 
@@ -206,6 +295,7 @@ class AuthService:
 
             if auth_result.user:
                 auth_user_id = auth_result.user.id
+                supabase_directory.remember(user_data["email"], auth_user_id)
                 print(f"✅ User created in Supabase Auth: {user_data['email']} (ID: {auth_user_id})")
 
                 # Try to save to profiles table (this might fail with RLS)
@@ -237,14 +327,13 @@ class AuthService:
                 return False, None
 
         except Exception as e:
-            print(f"❌ Supabase error: {str(e)}")
-
-            # Check if it's a duplicate user error
-            error_str = str(e).lower()
-            if "already been registered" in error_str or "already exists" in error_str or "duplicate" in error_str:
+            # The mirror can lag behind Auth, so the email may be taken after all
+            if is_duplicate_user_error(e):
                 print(f"⚠️ User {user_data['email']} already exists in Supabase")
-                return False, None
+                supabase_directory.mark_stale(user_data["email"])
+                raise UserAlreadyExists(user_data["email"]) from e
 
+            print(f"❌ Supabase error: {str(e)}")
             return False, None
 
 # Create singleton instance
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from mentor_agent.agents.batch_scheduler import MicroBatcher
+from mentor_agent.memory.store import aget_user_memory, amodify_user_memory, list_user_ids, flush_user_memory
+from mentor_agent.states.mentor_flow import get_mentor_llm, format_result
+from mentor_agent.states.prompt_builder import prompt_builder
+
+# Users checked in with more recently than this are skipped; a little under a day suits a nightly run
+CHECKIN_INTERVAL = float(os.getenv("CHECKIN_INTERVAL_HOURS", 20)) * 3600
+CHECKIN_USER_CONCURRENCY = int(os.getenv("CHECKIN_USER_CONCURRENCY", 64))
+CHECKINS_KEPT = 10
+
+
+def is_due(memory: dict, now: datetime, interval: float = CHECKIN_INTERVAL, force: bool = False) -> bool:
+    """Set-up users whose last check-in is older than `interval` (or who never had one)"""
+    if not memory.get("profile"):
+        return False
+    last_check = memory.get("last_check")
+    return force or not last_check or datetime.fromisoformat(last_check) <= now - timedelta(seconds=interval)
+
+
+def record_checkin(memory: dict, checkin: dict) -> dict:
+    """Keep the newest check-ins and stamp `last_check`"""
+    checkins = memory.setdefault("checkins", [])
+    checkins.append(checkin)
+    del checkins[:-CHECKINS_KEPT]
+    memory["last_check"] = checkin["created_at"]
+    return memory
+
+
+async def generate_checkins(user_ids: Optional[List[str]] = None, force: bool = False,
+                            batcher: MicroBatcher = None) -> dict:
+    """Write a check-in message into the memory of every user that is due for one.
+
+    Each user's prompt goes through a MicroBatcher, so the LLM sees a few
+    large batches instead of one call per user. Defaults to every user with
+    a memory record. Returns counts of generated, skipped and failed users.
+    """
+    user_ids = list_user_ids() if user_ids is None else user_ids
+    batcher = batcher or MicroBatcher(get_mentor_llm().abatch)
+    users = asyncio.Semaphore(CHECKIN_USER_CONCURRENCY)
+    counts = {"generated": 0, "skipped": 0, "failed": 0}
+
+    async def check_in(user_id: str):
+        async with users:
+            now = datetime.now(timezone.utc)
+            memory = await aget_user_memory(user_id)
+            if not is_due(memory, now, force=force):
+                counts["skipped"] += 1
+                return
+            try:
+                result = format_result(await batcher.submit(prompt_builder.build_checkin(memory)))
+            except Exception as e:
+                print(f"⚠️ Check-in for {user_id} failed: {e}")
+                counts["failed"] += 1
+                return
+            checkin = {"message": result["reply"], "topic": result["analytics"]["topic"], "created_at": now.isoformat()}
+            await amodify_user_memory(user_id, lambda memory: record_checkin(memory, checkin))
+            counts["generated"] += 1
+
+    await asyncio.gather(*(check_in(user_id) for user_id in user_ids))
+    await batcher.drain()
+    return {**counts, **batcher.stats()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate mentor check-ins for users that are due (run nightly)")
+    parser.add_argument("--user", action="append", dest="users", help="only this user (repeatable)")
+    parser.add_argument("--force", action="store_true", help="ignore last_check and check in with everyone")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    summary = asyncio.run(generate_checkins(args.users, force=args.force))
+    flush_user_memory()
+    print(f"✅ Check-ins: {summary['generated']} generated, {summary['skipped']} skipped, {summary['failed']} failed "
+          f"in {time.perf_counter() - started:.1f}s ({summary['batches']} batches, "
+          f"mean size {summary['mean_batch_size']:.1f})")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "mentor_agent/memory/conversations.db")
+# auto = Supabase when the service role key is configured, otherwise the local SQLite file
+CONVERSATION_SINK = os.getenv("CONVERSATION_SINK", "auto").lower()
+CONVERSATION_BATCH_SIZE = int(os.getenv("CONVERSATION_BATCH_SIZE", 100))
+CONVERSATION_FLUSH_INTERVAL = float(os.getenv("CONVERSATION_FLUSH_INTERVAL", "2.0"))
+# Rows kept while the sink is unreachable; the oldest are dropped past this
+CONVERSATION_MAX_BUFFER = int(os.getenv("CONVERSATION_MAX_BUFFER", 10000))
+CONVERSATION_MAX_RETRIES = int(os.getenv("CONVERSATION_MAX_RETRIES", 3))
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 10.0
+
+TURN_COLUMNS = ("bot_id", "seq", "idempotency_key", "input", "response", "analytics", "created_at")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def idempotency_key(bot_id: str, seq: int) -> str:
+    return f"{bot_id}:{seq}"
+
+
+class SQLiteConversationSink:
+    """Local stand-in for the Supabase `conversation_turns` table (same columns and keys)"""
+
+    def __init__(self, db_path: str = CONVERSATION_DB_PATH):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS conversation_turns (
+                idempotency_key TEXT PRIMARY KEY,
+                bot_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                input TEXT NOT NULL,
+                response TEXT NOT NULL,
+                analytics TEXT NOT NULL DEFAULT '{}',
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS conversation_turns_bot_seq ON conversation_turns (bot_id, seq)")
+
+    def insert(self, rows: list) -> int:
+        """Insert a batch in one transaction; rows whose key already exists are skipped. Returns rows added."""
+        values = [(row["idempotency_key"], row["bot_id"], row["seq"], row["input"], row["response"],
+                   json.dumps(row["analytics"]), row["created_at"]) for row in rows]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO conversation_turns "
+                    "(idempotency_key, bot_id, seq, input, response, analytics, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    values
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    def page(self, bot_id: str, before: Optional[int], limit: int) -> list:
+        """Up to `limit` turns with seq below `before` (all when None), newest first"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(TURN_COLUMNS)} FROM conversation_turns "
+                "WHERE bot_id = ? AND (? IS NULL OR seq < ?) ORDER BY seq DESC LIMIT ?",
+                (bot_id, before, before, limit)
+            )
+            rows = [dict(zip(TURN_COLUMNS, values)) for values in cursor.fetchall()]
+        for row in rows:
+            row["analytics"] = json.loads(row["analytics"])
+        return rows
+
+
+class SupabaseConversationSink:
+    """Batched upserts into Supabase's `conversation_turns`; duplicates of a retried batch are ignored"""
+
+    def __init__(self, connect: Callable):
+        self.connect = connect
+
+    def _table(self):
+        client = self.connect()
+        if client is None:
+            raise RuntimeError("Supabase client unavailable")
+        return client.table("conversation_turns")
+
+    def insert(self, rows: list) -> int:
+        result = self._table().upsert(rows, on_conflict="idempotency_key", ignore_duplicates=True).execute()
+        return len(result.data or [])
+
+    def page(self, bot_id: str, before: Optional[int], limit: int) -> list:
+        query = self._table().select(",".join(TURN_COLUMNS)).eq("bot_id", bot_id)
+        if before is not None:
+            query = query.lt("seq", before)
+        return query.order("seq", desc=True).limit(limit).execute().data or []
+
+
+def build_sink(kind: str = CONVERSATION_SINK):
+    if kind in ("auto", "supabase"):
+        from mentor_agent.services.auth_service import get_supabase, supabase_enabled, SUPABASE_SERVICE_ROLE_KEY
+        if supabase_enabled and SUPABASE_SERVICE_ROLE_KEY:
+            return SupabaseConversationSink(connect=get_supabase)
+        if kind == "supabase":
+            print("⚠️ CONVERSATION_SINK=supabase needs the Supabase service role key; logging conversations locally")
+    return SQLiteConversationSink(CONVERSATION_DB_PATH)
+
+
+class ConversationWriter:
+    """Buffers chat turns and writes them to the sink in batches.
+
+    `record` only appends to an in-memory buffer, so a chat turn never waits
+    on the database. A background thread writes the buffer as multi-row
+    inserts once `batch_size` rows are waiting or every `flush_interval`
+    seconds. Each row carries an idempotency key (`bot_id:seq`), so a batch
+    retried after a failure that actually landed adds no duplicates. A batch
+    that runs out of retries goes back to the front of the buffer; past
+    `max_buffer` rows the oldest are dropped.
+    """
+
+    def __init__(self, sink, batch_size: int = CONVERSATION_BATCH_SIZE,
+                 flush_interval: float = CONVERSATION_FLUSH_INTERVAL,
+                 max_buffer: int = CONVERSATION_MAX_BUFFER, max_retries: int = CONVERSATION_MAX_RETRIES):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = []  # rows waiting to be written, oldest first
+        self._in_flight = []  # the batch being written right now
+
+        self.recorded = 0
+        self.written = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="conversation-flusher", daemon=True)
+        self._flusher.start()
+
+    def record(self, bot_id: str, seq: int, turn: dict, analytics: dict = None):
+        row = {
+            "bot_id": bot_id,
+            "seq": seq,
+            "idempotency_key": idempotency_key(bot_id, seq),
+            "input": turn.get("input", ""),
+            "response": turn.get("response", ""),
+            "analytics": analytics or {},
+            "created_at": _now(),
+        }
+        with self._lock:
+            self._buffer.append(row)
+            self.recorded += 1
+            self._trim()
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _trim(self):
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            print(f"⚠️ Conversation log buffer full, dropped {overflow} oldest turns")
+
+    def flush(self):
+        """Write everything buffered, a batch at a time; raises when a batch runs out of retries"""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._buffer[:self.batch_size]
+                    del self._buffer[:len(batch)]
+                    self._in_flight = batch
+                if not batch:
+                    return
+                try:
+                    self._write(batch)
+                except Exception:
+                    with self._lock:
+                        self._buffer[:0] = batch
+                        self._trim()
+                    raise
+                finally:
+                    with self._lock:
+                        self._in_flight = []
+
+    def _write(self, batch: list):
+        attempt = 0
+        while True:
+            try:
+                added = self.sink.insert(batch)
+                break
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                if attempt >= self.max_retries:
+                    raise
+                # Full jitter keeps workers that failed together from retrying in lockstep
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                print(f"⚠️ Conversation log write failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+        with self._lock:
+            self.batches += 1
+            self.written += added
+            self.duplicates += len(batch) - added
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Conversation log flush failed: {e}")
+
+    def close(self):
+        """Stop the background flusher and write everything still buffered"""
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+    def page(self, bot_id: str, cursor: Optional[int] = None, limit: int = 20) -> dict:
+        """A page of a bot's turns, newest first, including turns not written yet.
+
+        Pass the returned `next_cursor` back as `cursor` for the next (older)
+        page; it is None on the last page.
+        """
+        with self._lock:
+            pending = [row for row in self._in_flight + self._buffer
+                       if row["bot_id"] == bot_id and (cursor is None or row["seq"] < cursor)]
+        # One extra row tells whether an older page exists
+        turns = {row["seq"]: row for row in self.sink.page(bot_id, cursor, limit + 1)}
+        for row in pending:
+            turns.setdefault(row["seq"], row)
+        ordered = sorted(turns.values(), key=lambda row: row["seq"], reverse=True)
+        page = [{key: row[key] for key in ("seq", "input", "response", "analytics", "created_at")}
+                for row in ordered[:limit]]
+        return {"turns": page, "next_cursor": page[-1]["seq"] if len(ordered) > limit else None}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "written": self.written,
+                "duplicates": self.duplicates,
+                "batches": self.batches,
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "buffered": len(self._buffer) + len(self._in_flight),
+            }
+
+    def collect(self):
+        """Metrics collector for buffered, written and dropped turns"""
+        stats = self.stats()
+        return [
+            ("mentor_conversation_buffered_turns", "gauge", "Chat turns waiting to be written",
+             [({}, stats["buffered"])]),
+            ("mentor_conversation_written_total", "counter", "Chat turns written to the conversation log",
+             [({}, stats["written"])]),
+            ("mentor_conversation_batches_total", "counter", "Batched conversation log writes",
+             [({}, stats["batches"])]),
+            ("mentor_conversation_write_failures_total", "counter", "Failed conversation log write attempts",
+             [({}, stats["failures"])]),
+            ("mentor_conversation_dropped_total", "counter", "Chat turns dropped because the buffer was full",
+             [({}, stats["dropped"])]),
+        ]
+
+
+# Create singleton instance
+conversation_log = ConversationWriter(build_sink())
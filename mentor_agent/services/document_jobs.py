@@ -0,0 +1,48 @@
+from typing import Callable
+from fastapi import UploadFile
+from mentor_agent.memory.store import modify_user_memory
+from mentor_agent.services.ingestion_service import ingestion_service
+from mentor_agent.services.retrieval_service import retrieval_service
+from mentor_agent.services.job_queue import job_queue
+
+INGEST_DOCUMENT = "ingest_document"
+
+
+def add_document(memory: dict, document: dict) -> dict:
+    documents = memory.setdefault("documents", [])
+    if all(doc.get("doc_id") != document["doc_id"] for doc in documents):
+        documents.append(document)
+    return memory
+
+
+def ingest_document(context, payload: dict) -> dict:
+    """Job handler: extract, index and record a saved upload"""
+    user_id = payload["user_id"]
+    context.progress(0.1, "extracting")
+    document = ingestion_service.ingest_file(payload["path"], payload["filename"], payload["sha"])
+    context.progress(0.5, "indexing")
+    retrieval_service.index_document(user_id, document)
+    context.progress(0.9, "saving")
+    modify_user_memory(user_id, lambda memory: add_document(memory, document))
+    return document
+
+
+job_queue.register(INGEST_DOCUMENT, ingest_document)
+
+
+def submit_upload(user_id: str, upload: UploadFile, before_save: Callable[[UploadFile], None] = None) -> dict:
+    """Stream an upload to disk and queue its ingestion; returns the job reference.
+
+    Raises UnsupportedDocumentError before anything is written for unknown formats.
+    `before_save` runs once the format is accepted (e.g. the upload quota check).
+    """
+    ingestion_service.check_supported(upload)
+    if before_save is not None:
+        before_save(upload)
+    sha, path = ingestion_service.save_upload(upload, user_id)
+    job_id = job_queue.submit(
+        INGEST_DOCUMENT,
+        {"user_id": user_id, "path": path, "filename": upload.filename, "sha": sha},
+        user_id=user_id,
+    )
+    return {"job_id": job_id, "filename": upload.filename, "doc_id": sha}
@@ -0,0 +1,213 @@
+import os
+import json
+import uuid
+import shutil
+import hashlib
+from typing import Iterable, Iterator, Optional
+from fastapi import UploadFile
+
+UPLOAD_FOLDER = "mentor_agent/uploads"
+DOCUMENT_STORE_PATH = "mentor_agent/memory/documents"
+CHUNK_MAX_CHARS = int(os.getenv("INGEST_CHUNK_MAX_CHARS", 2000))
+COPY_BUFFER_SIZE = 1024 * 1024
+SUPPORTED_EXTENSIONS = {"pdf", "doc", "docx"}
+
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+os.makedirs(DOCUMENT_STORE_PATH, exist_ok=True)
+
+
+class UnsupportedDocumentError(ValueError):
+    pass
+
+
+def file_extension(filename: str) -> str:
+    return filename.split(".")[-1].lower() if filename and "." in filename else ""
+
+
+def load_parsers():
+    """Import the PDF and DOCX parsers; they're only needed once a document arrives"""
+    import fitz  # PyMuPDF
+    import docx
+    return fitz, docx
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[str]:
+    fitz, _ = load_parsers()
+    with fitz.open(file_path) as doc:
+        for page in doc:
+            yield page.get_text()
+
+
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    _, docx = load_parsers()
+    doc = docx.Document(file_path)
+    for para in doc.paragraphs:
+        yield para.text + "\n"
+
+
+def iter_document_text(file_path: str, ext: str) -> Iterator[str]:
+    if ext == "pdf":
+        return iter_pdf_pages(file_path)
+    if ext in ["doc", "docx"]:
+        return iter_docx_paragraphs(file_path)
+    raise UnsupportedDocumentError(f"Unsupported file format: {ext or 'unknown'}")
+
+
+def chunk_text(pieces: Iterable[str], max_chars: int = CHUNK_MAX_CHARS) -> Iterator[str]:
+    """Regroup streamed text into chunks of at most `max_chars`.
+
+    Chunks break on paragraph or whitespace boundaries where possible and only
+    the current chunk is ever held in memory.
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        while piece:
+            if size + len(piece) <= max_chars:
+                buffer.append(piece)
+                size += len(piece)
+                break
+            if buffer:
+                chunk = "".join(buffer).strip()
+                buffer, size = [], 0
+                if chunk:
+                    yield chunk
+                continue
+            # A single piece longer than a chunk: split it on the last boundary that fits
+            cut = piece.rfind("\n", 0, max_chars)
+            if cut <= 0:
+                cut = piece.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            chunk = piece[:cut].strip()
+            if chunk:
+                yield chunk
+            piece = piece[cut:].lstrip()
+    chunk = "".join(buffer).strip()
+    if chunk:
+        yield chunk
+
+
+class DocumentStore:
+    """Content-addressed store of extracted document bodies.
+
+    Each document lives in `<root>/<sha256>/` as `chunks.jsonl` plus a
+    `meta.json` with byte offsets, so single chunks can be read without
+    loading the whole body. User memory only keeps references to these.
+    """
+
+    def __init__(self, root: str = DOCUMENT_STORE_PATH):
+        self.root = root
+
+    def _dir(self, doc_id: str) -> str:
+        return os.path.join(self.root, doc_id)
+
+    def get_meta(self, doc_id: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self._dir(doc_id), "meta.json"), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write(self, doc_id: str, filename: str, chunks: Iterable[str]) -> dict:
+        tmp_dir = os.path.join(self.root, f".{doc_id}.{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        offsets = []
+        seen = set()
+        chars = 0
+        try:
+            with open(os.path.join(tmp_dir, "chunks.jsonl"), "wb") as f:
+                for chunk in chunks:
+                    digest = hashlib.sha1(chunk.encode("utf-8")).digest()
+                    if digest in seen:  # repeated headers, footers, boilerplate pages
+                        continue
+                    seen.add(digest)
+                    offsets.append(f.tell())
+                    f.write(json.dumps(chunk).encode("utf-8") + b"\n")
+                    chars += len(chunk)
+            meta = {"doc_id": doc_id, "filename": filename, "chunks": len(offsets), "chars": chars, "offsets": offsets}
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            try:
+                os.rename(tmp_dir, self._dir(doc_id))
+            except OSError:
+                # Someone else ingested the same content first; keep theirs
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            return meta
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def iter_chunks(self, doc_id: str) -> Iterator[str]:
+        path = os.path.join(self._dir(doc_id), "chunks.jsonl")
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def read_chunk(self, doc_id: str, index: int) -> Optional[str]:
+        meta = self.get_meta(doc_id)
+        if not meta or not 0 <= index < len(meta["offsets"]):
+            return None
+        with open(os.path.join(self._dir(doc_id), "chunks.jsonl"), "rb") as f:
+            f.seek(meta["offsets"][index])
+            return json.loads(f.readline())
+
+
+class IngestionService:
+    def __init__(self, upload_folder: str = UPLOAD_FOLDER, document_store: DocumentStore = None):
+        self.upload_folder = upload_folder
+        self.documents = document_store or DocumentStore()
+
+    def user_folder(self, user_id: Optional[str]) -> str:
+        """Per-user upload directory, named by a hash so ids can't escape the upload folder"""
+        if user_id is None:
+            return self.upload_folder
+        folder = os.path.join(self.upload_folder, hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:16])
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def check_supported(self, upload: UploadFile):
+        if file_extension(upload.filename) not in SUPPORTED_EXTENSIONS:
+            raise UnsupportedDocumentError(f"Unsupported file format: {upload.filename}")
+
+    def save_upload(self, upload: UploadFile, user_id: str = None) -> tuple[str, str]:
+        """Stream an upload to a per-user, content-addressed path; returns (sha256, path)"""
+        ext = file_extension(upload.filename)
+        folder = self.user_folder(user_id)
+        digest = hashlib.sha256()
+        tmp_path = os.path.join(folder, f".upload-{uuid.uuid4().hex}")
+        with open(tmp_path, "wb") as f:
+            while True:
+                block = upload.file.read(COPY_BUFFER_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                f.write(block)
+        sha = digest.hexdigest()
+        path = os.path.join(folder, f"{sha}.{ext}" if ext else sha)
+        os.replace(tmp_path, path)
+        return sha, path
+
+    def ingest_file(self, path: str, filename: str, sha: str) -> dict:
+        """Extract and chunk a saved file, reusing earlier work for identical content"""
+        meta = self.documents.get_meta(sha)
+        if meta is None:
+            pieces = iter_document_text(path, file_extension(filename))
+            meta = self.documents.write(sha, filename, chunk_text(pieces))
+        return {"filename": filename, "doc_id": sha, "chunks": meta["chunks"], "chars": meta["chars"]}
+
+    def ingest_upload(self, upload: UploadFile, user_id: str = None) -> dict:
+        """Save and ingest an upload; returns the document reference kept in user memory"""
+        self.check_supported(upload)
+        sha, path = self.save_upload(upload, user_id)
+        return self.ingest_file(path, upload.filename, sha)
+
+    def snippet(self, doc_id: str, max_chars: int = 300) -> str:
+        first = self.documents.read_chunk(doc_id, 0)
+        return (first or "")[:max_chars]
+
+
+# Create singleton instance
+ingestion_service = IngestionService()
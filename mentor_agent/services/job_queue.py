@@ -0,0 +1,166 @@
+import os
+import json
+import uuid
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "mentor_agent/memory/jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# A running job not updated for this long is assumed to belong to a process that died
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", 600))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobContext:
+    """Handed to job handlers so they can report progress"""
+
+    def __init__(self, job_queue: "JobQueue", job_id: str):
+        self.job_queue = job_queue
+        self.job_id = job_id
+
+    def progress(self, value: float, message: str = None):
+        self.job_queue._update(self.job_id, progress=max(0.0, min(1.0, value)), message=message)
+
+
+class JobQueue:
+    """In-process job queue with SQLite-backed state and a worker thread pool.
+
+    Job state survives restarts: jobs still queued, or running but stale,
+    are picked up again by `start()`. Several worker processes can share
+    the database; a job runs only in the process that claims it from
+    `queued` to `running`. Handlers are plain
+    functions registered per job kind and called as `handler(context, payload)`;
+    their return value is stored as the job result.
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH, workers: int = JOB_WORKERS):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.workers = workers
+        self._handlers = {}
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                user_id TEXT,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+
+    def register(self, kind: str, handler: Callable):
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: dict, user_id: str = None) -> str:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        job_id = str(uuid.uuid4())
+        now = _now()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, user_id, status, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, user_id, QUEUED, json.dumps(payload), now, now),
+            )
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, user_id, status, progress, message, result, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "kind", "user_id", "status", "progress", "message", "result", "error", "created_at", "updated_at")
+        job = dict(zip(keys, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _update(self, job_id: str, **fields):
+        fields = {k: v for k, v in fields.items() if v is not None}
+        fields["updated_at"] = _now()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _claim(self, job_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, _now(), job_id, QUEUED),
+            )
+        return cursor.rowcount == 1
+
+    def _run(self, job_id: str):
+        if not self._claim(job_id):
+            return  # already taken by another worker process
+        with self._lock:
+            kind, payload = self._conn.execute("SELECT kind, payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        try:
+            result = self._handlers[kind](JobContext(self, job_id), json.loads(payload))
+        except Exception as e:
+            print(f"⚠️ Job {job_id} ({kind}) failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e))
+            return
+        self._update(job_id, status=SUCCEEDED, progress=1.0, message="done", result=json.dumps(result))
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    def start(self):
+        """Start the workers and re-enqueue jobs interrupted by a previous shutdown"""
+        if self._threads:
+            return
+        stale_before = (datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_AFTER)).isoformat()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ? WHERE status = ? AND updated_at < ?", (QUEUED, RUNNING, stale_before)
+            )
+            unfinished = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        for (job_id,) in unfinished:
+            self._queue.put(job_id)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+
+# Create singleton instance
+job_queue = JobQueue()
@@ -0,0 +1,260 @@
+import os
+import time
+import bisect
+import random
+import cProfile
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "mentor_agent/memory/profiles")
+# Profiling is opt-in: the header is ignored unless this is set
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_HEADER = "x-profile"
+# Fraction of requests profiled without the header (0 = only on request)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+THROUGHPUT_BUCKETS = (5, 10, 25, 50, 100, 200, 400, 800, 1600)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.type = "counter"
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, dict, float]]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Fixed-bucket histogram; `observe` is a bisect and three additions under a lock"""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+                 labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.type = "histogram"
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = labelnames
+        self._series = {}  # label values -> [bucket counts..., +Inf count], sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> Iterable[Tuple[str, dict, float]]:
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        for key, (counts, total) in series.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": repr(float(bound))}, cumulative
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text format.
+
+    Counters and histograms are updated in place; collectors are callables
+    polled at scrape time that return `(name, type, help, [(labels, value)])`
+    tuples, for state other components already track (cache stats, queues).
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+                  labelnames: Tuple[str, ...] = ()) -> Histogram:
+        metric = Histogram(name, help, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        families = {}
+        for collector in self._collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+                continue
+            # Several collectors may report samples for the same family
+            for name, kind, help, samples in collected:
+                families.setdefault(name, (kind, help, []))[2].extend(samples)
+        for name, (kind, help, samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Create singleton instance
+metrics = MetricsRegistry()
+
+request_seconds = metrics.histogram(
+    "mentor_request_seconds", "HTTP request latency by route name", labelnames=("method", "route", "status"))
+stage_seconds = metrics.histogram(
+    "mentor_stage_seconds", "Time spent per request stage", labelnames=("stage",))
+llm_tokens_per_second = metrics.histogram(
+    "mentor_llm_tokens_per_second", "Estimated LLM output tokens per second", THROUGHPUT_BUCKETS,
+    labelnames=("provider",))
+store_io_bytes = metrics.histogram(
+    "mentor_store_io_bytes", "Bytes read from or written to the memory store", BYTES_BUCKETS,
+    labelnames=("op",))
+analytics_source = metrics.counter(
+    "mentor_reply_analytics_total", "Replies by where their sentiment/topic came from (model trailer or local classifier)",
+    labelnames=("source",))
+quota_rejections = metrics.counter(
+    "mentor_quota_rejections_total", "Requests refused by per-tier rate limits and quotas", labelnames=("tier", "limit"))
+
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> dict:
+    """Collect stage timings for the current request (and tasks/threads spawned from it)"""
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_seconds.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def observe_llm_call(provider: str, seconds: float, output: str):
+    if seconds > 0 and output:
+        # Same chars/4 estimate the prompt builder budgets with
+        llm_tokens_per_second.observe((len(output) // 4 + 1) / seconds, provider=provider)
+
+
+def server_timing(timings: dict) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+def cache_collector(name: str, stats: Callable[[], dict]) -> Callable[[], Iterable]:
+    """Collector exposing a cache's `stats()` hit/miss counts and hit ratio"""
+    def collect():
+        snapshot = stats()
+        hits = snapshot.get("hits", snapshot.get("exact_hits", 0) + snapshot.get("similar_hits", 0))
+        misses = snapshot.get("misses", 0)
+        labels = {"cache": name}
+        return [
+            ("mentor_cache_hits_total", "counter", "Cache hits", [(labels, hits)]),
+            ("mentor_cache_misses_total", "counter", "Cache misses", [(labels, misses)]),
+            ("mentor_cache_hit_ratio", "gauge", "Cache hit ratio since start",
+             [(labels, hits / (hits + misses) if hits + misses else 0.0)]),
+            ("mentor_cache_entries", "gauge", "Entries held by the cache", [(labels, snapshot.get("entries", 0))]),
+        ]
+    return collect
+
+
+class RequestProfiler:
+    """cProfile around single requests, writing `.prof` files to PROFILE_DIR.
+
+    Only one request is profiled at a time (the interpreter allows a single
+    active profiler); concurrent requests asking for a profile are served
+    unprofiled. Because the profiler hooks the event loop thread, work
+    offloaded to worker threads shows up as time spent awaiting it.
+    """
+
+    def __init__(self, enabled: bool = PROFILING_ENABLED, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 profile_dir: str = PROFILE_DIR):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.profile_dir = profile_dir
+        self._busy = threading.Lock()
+
+    def wanted(self, header_value: Optional[str]) -> bool:
+        if not self.enabled:
+            return False
+        if header_value is not None:
+            return header_value.lower() in ("1", "true", "yes")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is already active
+            self._busy.release()
+            return None
+        return profile
+
+    def stop(self, profile: cProfile.Profile, label: str) -> str:
+        try:
+            profile.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_") or "root"
+            path = os.path.join(self.profile_dir, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{safe_label}.prof")
+            profile.dump_stats(path)
+            return path
+        finally:
+            self._busy.release()
+
+
+# Create singleton instance
+request_profiler = RequestProfiler()
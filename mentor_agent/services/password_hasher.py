@@ -0,0 +1,77 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from mentor_agent.services.metrics import timed
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+# Hash jobs allowed to wait for a worker before new ones are turned away
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 32))
+
+
+class PasswordHasherOverloaded(RuntimeError):
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Password hashing is overloaded")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """bcrypt on a bounded worker pool, off the event loop.
+
+    bcrypt releases the GIL, so a thread pool runs hashes in parallel. When
+    more than `workers + max_queue` jobs are in flight, new ones fail fast
+    with PasswordHasherOverloaded instead of queueing without bound.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = PASSWORD_HASH_WORKERS,
+                 max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.rounds = rounds
+        self.capacity = workers + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    @staticmethod
+    def verify(password: str, hashed: str) -> bool:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if the hash was made with a different cost factor than the configured one"""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._inflight >= self.capacity:
+                self.rejected += 1
+                raise PasswordHasherOverloaded()
+            self._inflight += 1
+        try:
+            with timed("password_hash"):
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    async def ahash(self, password: str) -> str:
+        return await self._submit(self.hash, password)
+
+    async def averify(self, password: str, hashed: str) -> bool:
+        return await self._submit(self.verify, password, hashed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"inflight": self._inflight, "capacity": self.capacity, "rejected": self.rejected}
+
+
+# Create singleton instance
+password_hasher = PasswordHasher()
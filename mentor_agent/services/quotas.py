@@ -0,0 +1,175 @@
+import os
+import json
+import math
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, UploadFile, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from mentor_agent.backends.factory import state_backend
+from mentor_agent.backends.rate_limit import KeyedTokenBuckets, KeyedWindowLimiter
+from mentor_agent.services.auth_service import AuthService
+from mentor_agent.services.metrics import quota_rejections
+
+RATE_LIMITS_ENABLED = os.getenv("RATE_LIMITS_ENABLED", "true").lower() == "true"
+# Tier applied to requests without a bearer token; they are limited per client address
+ANONYMOUS_TIER = os.getenv("ANONYMOUS_TIER", "free")
+
+DEFAULT_TIER_LIMITS = {
+    "free": {"requests_per_minute": 20, "llm_tokens_per_day": 100_000, "upload_bytes_per_day": 20 * 1024 * 1024},
+    "enterprise": {"requests_per_minute": 600, "llm_tokens_per_day": 10_000_000,
+                   "upload_bytes_per_day": 2 * 1024 * 1024 * 1024},
+}
+# Length of each limit's period in seconds
+LIMIT_PERIODS = {"requests_per_minute": 60, "llm_tokens_per_day": 86400, "upload_bytes_per_day": 86400}
+
+
+def parse_tier_limits(value: Optional[str]) -> dict:
+    """TIER_LIMITS='{"free": {"requests_per_minute": 30}}' -> the defaults with those limits replaced"""
+    tiers = {tier: dict(limits) for tier, limits in DEFAULT_TIER_LIMITS.items()}
+    for tier, limits in json.loads(value or "{}").items():
+        unknown = set(limits) - set(LIMIT_PERIODS)
+        if unknown:
+            raise ValueError(f"Unknown limits for tier {tier!r} in TIER_LIMITS: {sorted(unknown)}")
+        tiers.setdefault(tier, dict(DEFAULT_TIER_LIMITS["free"])).update(limits)
+    return tiers
+
+
+TIER_LIMITS = parse_tier_limits(os.getenv("TIER_LIMITS"))
+if ANONYMOUS_TIER not in TIER_LIMITS:
+    raise ValueError(f"ANONYMOUS_TIER {ANONYMOUS_TIER!r} is not a configured tier")
+
+
+class QuotaExceeded(RuntimeError):
+    def __init__(self, limit: str, retry_after: Optional[float]):
+        super().__init__(f"{limit.replace('_', ' ').capitalize()} quota exceeded")
+        self.limit = limit
+        # None when waiting can't help (a single upload larger than the daily allowance)
+        self.retry_after = retry_after
+
+
+def quota_exceeded(e: QuotaExceeded) -> HTTPException:
+    if e.retry_after is None:
+        return HTTPException(status_code=413, detail=str(e))
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
+@dataclass(frozen=True)
+class Caller:
+    subject: str  # user id, or "ip:<address>" without a token
+    tier: str
+
+
+class QuotaManager:
+    """Per-tier limits on request rate, daily LLM tokens and daily upload bytes.
+
+    With an in-process state backend every (tier, limit) pair is a set of
+    per-caller token buckets; with a shared backend it is a per-caller fixed
+    window counted in the backend, so the limits hold across workers. Each
+    check is a constant number of dict or backend operations.
+    LLM tokens are only known after the reply, so a chat is let through while
+    the caller has any budget left and charged afterwards.
+    """
+
+    def __init__(self, backend=state_backend, tiers: dict = TIER_LIMITS, enabled: bool = RATE_LIMITS_ENABLED):
+        self.tiers = tiers
+        self.enabled = enabled
+        self._limiters = {}  # (tier, limit) -> limiter
+        for tier, limits in tiers.items():
+            for limit, amount in limits.items():
+                period = LIMIT_PERIODS[limit]
+                if backend.shared:
+                    self._limiters[tier, limit] = KeyedWindowLimiter(backend, f"quota:{tier}:{limit}", amount, period)
+                else:
+                    self._limiters[tier, limit] = KeyedTokenBuckets(amount, period)
+
+    def _limiter(self, caller: Caller, limit: str):
+        # Tiers without configured limits get the anonymous tier's
+        return self._limiters.get((caller.tier, limit)) or self._limiters[ANONYMOUS_TIER, limit]
+
+    def _reject(self, caller: Caller, limit: str, retry_after: Optional[float]):
+        quota_rejections.inc(tier=caller.tier, limit=limit)
+        raise QuotaExceeded(limit, retry_after)
+
+    def check_request(self, caller: Caller):
+        if not self.enabled:
+            return
+        wait = self._limiter(caller, "requests_per_minute").try_acquire(caller.subject)
+        if wait:
+            self._reject(caller, "requests_per_minute", wait)
+
+    def check_llm_tokens(self, caller: Caller):
+        if not self.enabled:
+            return
+        wait = self._limiter(caller, "llm_tokens_per_day").wait_time(caller.subject)
+        if wait:
+            self._reject(caller, "llm_tokens_per_day", wait)
+
+    def charge_llm_tokens(self, caller: Caller, tokens: int):
+        if self.enabled and tokens > 0:
+            self._limiter(caller, "llm_tokens_per_day").charge(caller.subject, tokens)
+
+    def check_upload(self, caller: Caller, size: int):
+        if not self.enabled or size <= 0:
+            return
+        limiter = self._limiter(caller, "upload_bytes_per_day")
+        if size > limiter.limit:
+            self._reject(caller, "upload_bytes_per_day", None)
+        wait = limiter.try_acquire(caller.subject, size)
+        if wait:
+            self._reject(caller, "upload_bytes_per_day", wait)
+
+
+# Create singleton instance
+quotas = QuotaManager()
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+
+def current_caller(request: Request,
+                   credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)) -> Caller:
+    """The caller's id and tier from the bearer token (anonymous tier per client address without one)"""
+    if credentials is None:
+        host = request.client.host if request.client else "unknown"
+        return Caller(subject=f"ip:{host}", tier=ANONYMOUS_TIER)
+    payload = AuthService.verify_jwt_token(credentials.credentials)
+    return Caller(subject=payload["user_id"], tier=payload.get("subscription_tier") or ANONYMOUS_TIER)
+
+
+def chat_quota(caller: Caller = Depends(current_caller)) -> Caller:
+    """Dependency for LLM-backed routes: request rate plus a non-empty daily token budget"""
+    try:
+        quotas.check_request(caller)
+        quotas.check_llm_tokens(caller)
+    except QuotaExceeded as e:
+        raise quota_exceeded(e)
+    return caller
+
+
+def request_quota(caller: Caller = Depends(current_caller)) -> Caller:
+    """Dependency for other routes (uploads check their bytes with `check_upload_size`): request rate only"""
+    try:
+        quotas.check_request(caller)
+    except QuotaExceeded as e:
+        raise quota_exceeded(e)
+    return caller
+
+
+def upload_size(upload: UploadFile) -> int:
+    if upload.size is not None:
+        return upload.size
+    # Spooled to memory or a temp file by the time the route runs, so seeking is cheap
+    upload.file.seek(0, os.SEEK_END)
+    size = upload.file.tell()
+    upload.file.seek(0)
+    return size
+
+
+def check_upload_size(caller: Caller, upload: UploadFile):
+    try:
+        quotas.check_upload(caller, upload_size(upload))
+    except QuotaExceeded as e:
+        raise quota_exceeded(e)
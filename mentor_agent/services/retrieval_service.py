@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional
+from mentor_agent.services.ingestion_service import ingestion_service
+
+if TYPE_CHECKING:
+    import numpy as np
+
+INDEX_PATH = "mentor_agent/memory/index"
+RETRIEVAL_DIM = int(os.getenv("RETRIEVAL_DIM", 1024))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 4))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")  # e.g. "all-MiniLM-L6-v2"; needs sentence-transformers
+LOADED_INDEXES = int(os.getenv("RETRIEVAL_LOADED_INDEXES", 64))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or so that the this to was what "
+    "when where which who why will with you your".split()
+)
+
+
+def load_numpy():
+    """Import numpy; it's only needed once a document is indexed or searched"""
+    import numpy
+    return numpy
+
+
+class HashingTfidfEmbedder:
+    """Dependency-free fallback: hashed term frequencies, weighted by IDF at query time"""
+    kind = "hashing-tfidf"
+    uses_idf = True
+
+    def __init__(self, dim: int = RETRIEVAL_DIM):
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        np = load_numpy()
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_RE.findall(text.lower()):
+                if token in STOPWORDS:
+                    continue
+                # crc32 is stable across processes, unlike hash()
+                vectors[row, zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+        # Sublinear tf keeps long chunks from dominating
+        np.log1p(vectors, out=vectors)
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    kind = "sentence-transformer"
+    uses_idf = False
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.kind = f"sentence-transformer:{model_name}"
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        np = load_numpy()
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def create_embedder():
+    if EMBEDDING_MODEL:
+        try:
+            return SentenceTransformerEmbedder(EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"⚠️ Embedding model unavailable ({e}), falling back to hashed TF-IDF")
+    return HashingTfidfEmbedder()
+
+
+class UserIndex:
+    """Chunk vectors for one user, searched by brute-force cosine similarity"""
+
+    def __init__(self, kind: str, dim: int):
+        np = load_numpy()
+        self.kind = kind
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.df = np.zeros(dim, dtype=np.float32)
+        self.refs = []  # [doc_id, filename, chunk_no] per row
+
+    @property
+    def doc_ids(self) -> set:
+        return {ref[0] for ref in self.refs}
+
+    def add(self, vectors: "np.ndarray", refs: list):
+        np = load_numpy()
+        # Swap in new objects (refs first) so a concurrent search never sees
+        # more vectors than refs
+        self.refs = self.refs + refs
+        self.df = self.df + (vectors > 0).sum(axis=0)
+        self.vectors = np.vstack([self.vectors, vectors])
+
+    def search(self, query: "np.ndarray", k: int, uses_idf: bool) -> list:
+        np = load_numpy()
+        vectors, df = self.vectors, self.df
+        if not len(vectors):
+            return []
+        if uses_idf:
+            idf = np.log((1 + len(vectors)) / (1 + df)) + 1.0
+            docs = vectors * idf
+            query = query * idf
+        else:
+            docs = vectors
+        norms = np.linalg.norm(docs, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = (docs @ query) / np.maximum(norms, 1e-9)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.refs[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def save(self, path: str):
+        np = load_numpy()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp_path, vectors=self.vectors, df=self.df,
+                 meta=np.array(json.dumps({"kind": self.kind, "refs": self.refs})))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["UserIndex"]:
+        if not os.path.exists(path):
+            return None
+        np = load_numpy()
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            index = cls(meta["kind"], data["vectors"].shape[1])
+            index.vectors = data["vectors"]
+            index.df = data["df"]
+            index.refs = meta["refs"]
+        return index
+
+
+class RetrievalService:
+    """Per-user document indexes, loaded on demand and kept for the `LOADED_INDEXES` most recent users.
+
+    numpy and the embedder (possibly a sentence-transformers model) are only
+    loaded on first use, or by `warm` in the background after startup.
+    """
+
+    def __init__(self, index_path: str = INDEX_PATH, embedder=None):
+        self.index_path = index_path
+        self._embedder = embedder
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self._user_locks = {}
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            with self._lock:
+                if self._embedder is None:
+                    self._embedder = create_embedder()
+        return self._embedder
+
+    def warm(self):
+        """Import numpy and build the embedder ahead of the first upload or search"""
+        load_numpy()
+        return self.embedder
+
+    def _path(self, user_id: str) -> str:
+        return os.path.join(self.index_path, hashlib.sha1(user_id.encode("utf-8")).hexdigest() + ".npz")
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def _version(self, user_id: str) -> Optional[int]:
+        try:
+            return os.stat(self._path(user_id)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _get_index(self, user_id: str) -> UserIndex:
+        # Another worker process may have rewritten the file since it was loaded here
+        version = self._version(user_id)
+        with self._lock:
+            entry = self._indexes.get(user_id)
+            if entry is not None and entry[1] == version:
+                self._indexes.move_to_end(user_id)
+                return entry[0]
+        index = UserIndex.load(self._path(user_id))
+        if index is None or index.kind != self.embedder.kind:
+            # Missing, or built with a different embedder: start over
+            index = UserIndex(self.embedder.kind, self.embedder.dim)
+        with self._lock:
+            entry = self._indexes.get(user_id)
+            if entry is None or entry[1] != version:
+                entry = self._indexes[user_id] = (index, version)
+            while len(self._indexes) > LOADED_INDEXES:
+                self._indexes.popitem(last=False)
+        return entry[0]
+
+    def index_document(self, user_id: str, document: dict, batch_size: int = 64):
+        """Embed the chunks of an ingested document into the user's index"""
+        doc_id = document.get("doc_id")
+        if not doc_id:
+            return
+        with self._user_lock(user_id):
+            index = self._get_index(user_id)
+            if doc_id in index.doc_ids:
+                return
+            batch = []
+            chunk_no = 0
+            for chunk in ingestion_service.documents.iter_chunks(doc_id):
+                batch.append(chunk)
+                if len(batch) == batch_size:
+                    index.add(self.embedder.embed(batch), self._refs(document, chunk_no, len(batch)))
+                    chunk_no += len(batch)
+                    batch = []
+            if batch:
+                index.add(self.embedder.embed(batch), self._refs(document, chunk_no, len(batch)))
+            index.save(self._path(user_id))
+            with self._lock:
+                self._indexes[user_id] = (index, self._version(user_id))
+
+    @staticmethod
+    def _refs(document: dict, start: int, count: int) -> list:
+        return [[document["doc_id"], document.get("filename"), start + i] for i in range(count)]
+
+    def reset(self, user_id: str):
+        with self._user_lock(user_id):
+            with self._lock:
+                self._indexes.pop(user_id, None)
+            try:
+                os.remove(self._path(user_id))
+            except FileNotFoundError:
+                pass
+
+    def search(self, user_id: str, query: str, k: int = RETRIEVAL_TOP_K) -> List[dict]:
+        """Top-k passages from the user's documents for `query`"""
+        index = self._get_index(user_id)
+        if not index.refs or not query.strip():
+            return []
+        query_vector = self.embedder.embed([query])[0]
+        passages = []
+        for (doc_id, filename, chunk_no), score in index.search(query_vector, k, self.embedder.uses_idf):
+            text = ingestion_service.documents.read_chunk(doc_id, chunk_no)
+            if text:
+                passages.append({"filename": filename, "doc_id": doc_id, "chunk": chunk_no, "score": score, "text": text})
+        return passages
+
+
+# Create singleton instance
+retrieval_service = RetrievalService()
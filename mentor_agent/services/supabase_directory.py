@@ -0,0 +1,159 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+from mentor_agent.services.user_repository import normalize_email
+
+SUPABASE_SYNC_INTERVAL = float(os.getenv("SUPABASE_SYNC_INTERVAL", 300))
+SUPABASE_SYNC_PAGE_SIZE = int(os.getenv("SUPABASE_SYNC_PAGE_SIZE", 1000))
+# How old the mirror may be before a miss is treated as ambiguous and checked remotely
+SUPABASE_MIRROR_MAX_AGE = float(os.getenv("SUPABASE_MIRROR_MAX_AGE", 900))
+SUPABASE_NEGATIVE_TTL = float(os.getenv("SUPABASE_NEGATIVE_TTL", 60))
+SUPABASE_NEGATIVE_MAX_ENTRIES = int(os.getenv("SUPABASE_NEGATIVE_MAX_ENTRIES", 10000))
+
+
+class SupabaseUserDirectory:
+    """Local mirror of Supabase Auth emails -> auth user ids.
+
+    A paginated background sync keeps the mirror fresh. `exists` answers
+    from the mirror; only when the mirror is missing or too old to trust a
+    miss does it page through Auth again (concurrent misses share one
+    resync), and confirmed misses are cached for SUPABASE_NEGATIVE_TTL
+    seconds (at most SUPABASE_NEGATIVE_MAX_ENTRIES of them, oldest dropped
+    first). The Auth admin API has no lookup by email, so there is no
+    cheaper remote check that still asks Auth itself.
+
+    `admin` is anything with Supabase's `list_users(page=, per_page=)`, so a
+    local fake can stand in for the real admin API. Pass `connect` instead
+    to create it on first use (the first sync runs in the background).
+    """
+
+    def __init__(self, admin=None, connect: Optional[Callable[[], object]] = None,
+                 page_size: int = SUPABASE_SYNC_PAGE_SIZE, max_age: float = SUPABASE_MIRROR_MAX_AGE,
+                 negative_ttl: float = SUPABASE_NEGATIVE_TTL,
+                 negative_max_entries: int = SUPABASE_NEGATIVE_MAX_ENTRIES):
+        self.admin = admin
+        self.connect = connect
+        self.page_size = page_size
+        self.max_age = max_age
+        self.negative_ttl = negative_ttl
+        self.negative_max_entries = negative_max_entries
+        self._emails = {}
+        self._negative = OrderedDict()  # email -> expiry, oldest first
+        self._remembered = {}  # entries added since the current sync started
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.synced_at = None
+        self.resyncs = 0
+        self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.admin is not None or self.connect is not None
+
+    def sync(self) -> int:
+        """Page through every Auth user and swap in a fresh mirror; returns the user count"""
+        if not self.enabled:
+            return 0
+        with self._sync_lock:
+            return self._sync()
+
+    def _sync(self) -> int:
+        if self.admin is None:
+            self.admin = self.connect()
+            if self.admin is None:
+                self.connect = None
+                return 0
+        started = time.monotonic()
+        with self._lock:
+            self._remembered = {}
+        emails = {}
+        page = 1
+        while True:
+            result = self.admin.list_users(page=page, per_page=self.page_size)
+            users = getattr(result, "users", result) or []
+            for user in users:
+                if getattr(user, "email", None):
+                    emails[normalize_email(user.email)] = user.id
+            if len(users) < self.page_size:
+                break
+            page += 1
+        with self._lock:
+            # Keep users registered while the sync was paging
+            emails.update(self._remembered)
+            self._emails = emails
+            self.synced_at = started
+        return len(emails)
+
+    def remember(self, email: str, auth_id: str):
+        email = normalize_email(email)
+        with self._lock:
+            self._emails[email] = auth_id
+            self._remembered[email] = auth_id
+            self._negative.pop(email, None)
+
+    def mark_stale(self, email: str):
+        """Auth has an account the mirror missed; re-check Auth on the next miss"""
+        with self._lock:
+            self._negative.pop(normalize_email(email), None)
+            self.synced_at = None
+
+    def _resync(self, requested_at: float):
+        with self._sync_lock:
+            # A sync that started after the miss already answers it
+            if self.synced_at is not None and self.synced_at >= requested_at:
+                return
+            self.resyncs += 1
+            self._sync()
+
+    def lookup(self, email: str) -> Optional[str]:
+        """Auth id for the email, paging through Supabase Auth only when the mirror can't decide"""
+        email = normalize_email(email)
+        now = time.monotonic()
+        with self._lock:
+            if email in self._emails:
+                return self._emails[email]
+            if self._negative.get(email, 0) > now:
+                return None
+            fresh = self.synced_at is not None and now - self.synced_at < self.max_age
+        if fresh or not self.enabled:
+            return None
+
+        self._resync(now)
+        with self._lock:
+            auth_id = self._emails.get(email)
+            if auth_id is None:
+                self._remember_miss(email, now)
+        return auth_id
+
+    def _remember_miss(self, email: str, now: float):
+        # Every entry has the same TTL, so the oldest entries are the first to expire
+        self._negative.pop(email, None)
+        while self._negative and (next(iter(self._negative.values())) <= now
+                                  or len(self._negative) >= self.negative_max_entries):
+            self._negative.popitem(last=False)
+        self._negative[email] = now + self.negative_ttl
+
+    def exists(self, email: str) -> bool:
+        return self.enabled and self.lookup(email) is not None
+
+    async def _sync_loop(self, interval: float):
+        while True:
+            try:
+                count = await asyncio.to_thread(self.sync)
+                print(f"🔄 Supabase user mirror synced ({count} users)")
+            except Exception as e:
+                print(f"⚠️ Supabase user mirror sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = SUPABASE_SYNC_INTERVAL):
+        """Start the background sync on the running event loop"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sync_loop(interval))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
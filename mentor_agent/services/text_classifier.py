@@ -0,0 +1,89 @@
+import re
+from typing import Dict
+
+WORD_RE = re.compile(r"[a-z][a-z']+")
+
+POSITIVE_WORDS = frozenset("""
+    achieve achieved amazing awesome best better breakthrough calm celebrate confident cool delighted
+    done easy enjoy enjoyed excited excellent fantastic finally fine fun glad good grateful great happy
+    hopeful improve improved improving inspired interesting like love loved motivated nice perfect
+    productive progress proud ready relieved shipped solved succeed success successful thank thanks
+    thrilled win won wonderful works
+""".split())
+
+NEGATIVE_WORDS = frozenset("""
+    afraid angry annoyed anxious awful bad blocked bored broke broken burned burnout confused crash
+    crashed depressed difficult disappointed doubt exhausted fail failed failing failure fear frustrated
+    frustrating hard hate hopeless hurt impossible lonely lost miserable nervous overwhelmed pain
+    problem procrastinate procrastinating quit rejected sad scared slow stress stressed stuck struggle
+    struggling terrible tired unhappy upset worried worse worst wrong
+""".split())
+
+NEGATIONS = frozenset("not no never don't doesn't didn't isn't wasn't can't cannot won't hardly".split())
+
+TOPIC_KEYWORDS = {
+    "career": """career job jobs interview interviews resume cv hire hiring hired promotion salary
+        manager offer offers recruiter linkedin role roles position internship""",
+    "programming": """code coding program programming python javascript typescript java rust golang
+        bug bugs debug api apis backend frontend database sql deploy deployment docker kubernetes git
+        github function functions algorithm algorithms framework react fastapi django refactor test tests""",
+    "learning": """learn learning study studying course courses class exam exams degree university
+        college school tutorial book books read reading practice certificate certification lecture""",
+    "productivity": """focus habit habits routine schedule deadline deadlines plan planning goal goals
+        time procrastinate procrastinating priorities priority motivation discipline todo tasks task""",
+    "startup": """startup startups founder cofounder product launch launched customers customer users
+        market marketing revenue pricing investor investors funding pitch mvp saas growth business""",
+    "wellbeing": """stress stressed burnout tired sleep health anxiety anxious mental exercise rest
+        overwhelmed balance wellbeing lonely exhausted break energy""",
+    "finance": """money budget budgeting savings save invest investing debt loan loans income
+        expenses tax taxes finance financial""",
+}
+
+
+class LexiconClassifier:
+    """Cheap local sentiment and topic guesses from word lists.
+
+    Used when the model's reply has no SENTIMENT/TOPIC trailer, so that
+    analytics don't need a second LLM call. Sentiment counts positive and
+    negative words, flipping a word that follows a negation. The topic is
+    the one with the most keyword hits, or "general" when nothing matches.
+    """
+
+    def __init__(self, positive=POSITIVE_WORDS, negative=NEGATIVE_WORDS, topics: Dict[str, str] = None):
+        self.positive = positive
+        self.negative = negative
+        self.topics = {}  # keyword -> topic
+        for topic, keywords in (topics or TOPIC_KEYWORDS).items():
+            for keyword in keywords.split():
+                self.topics.setdefault(keyword, topic)
+
+    @staticmethod
+    def _words(text: str) -> list:
+        return WORD_RE.findall((text or "").lower().replace("’", "'"))
+
+    def sentiment(self, text: str) -> str:
+        score = 0
+        negated = 0  # words left in the current negation's reach
+        for word in self._words(text):
+            if word in NEGATIONS:
+                negated = 3
+                continue
+            polarity = 1 if word in self.positive else -1 if word in self.negative else 0
+            score += -polarity if negated else polarity
+            negated = max(0, negated - 1)
+        return "positive" if score > 0 else "negative" if score < 0 else "neutral"
+
+    def topic(self, text: str) -> str:
+        hits = {}
+        for word in self._words(text):
+            topic = self.topics.get(word) or (self.topics.get(word[:-1]) if word.endswith("s") else None)
+            if topic:
+                hits[topic] = hits.get(topic, 0) + 1
+        return max(hits, key=hits.get) if hits else "general"
+
+    def classify(self, text: str) -> dict:
+        return {"sentiment": self.sentiment(text), "topic": self.topic(text)}
+
+
+# Create singleton instance
+text_classifier = LexiconClassifier()
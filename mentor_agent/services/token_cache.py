@@ -0,0 +1,84 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Digests of already-verified JWTs -> their claims, plus a revocation set.
+
+    An entry lives for at most TOKEN_CACHE_TTL seconds and never past the
+    token's own `exp`, so a cache hit can skip signature verification
+    without ever accepting an expired token. Revoked digests are kept until
+    their token would have expired anyway. With a shared `backend`,
+    revocations are also written there so every worker honours them.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES, ttl: float = TOKEN_CACHE_TTL, backend=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend if backend is not None and backend.shared else None
+        self._entries = OrderedDict()  # digest -> (claims, expires_at)
+        self._revoked = {}  # digest -> token exp (unix time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, digest: str, claims: dict):
+        expires_at = min(time.time() + self.ttl, float(claims.get("exp", 0)))
+        with self._lock:
+            if digest in self._revoked:
+                return
+            self._entries[digest] = (claims, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke(self, digest: str, exp: float):
+        now = time.time()
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._revoked[digest] = exp
+            # Forget revocations whose tokens have expired on their own
+            if len(self._revoked) > self.max_entries:
+                self._revoked = {d: e for d, e in self._revoked.items() if e > now}
+        if self.backend is not None and exp > now:
+            self.backend.set("revoked_tokens", digest, exp, ttl=exp - now)
+
+    def is_revoked(self, digest: str) -> bool:
+        if digest in self._revoked:
+            return True
+        return self.backend is not None and self.backend.get("revoked_tokens", digest) is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
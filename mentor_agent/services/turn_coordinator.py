@@ -0,0 +1,127 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+from mentor_agent.agents.response_cache import normalize_input
+
+# Turns one user may have running or waiting before new ones are refused
+CHAT_MAX_PENDING_PER_USER = int(os.getenv("CHAT_MAX_PENDING_PER_USER", 4))
+CHAT_BUSY_RETRY_AFTER = int(os.getenv("CHAT_BUSY_RETRY_AFTER", 2))
+
+
+class UserBusy(RuntimeError):
+    def __init__(self, retry_after: int = CHAT_BUSY_RETRY_AFTER):
+        super().__init__("Too many chat turns in progress for this user")
+        self.retry_after = retry_after
+
+
+class _UserSlot:
+    __slots__ = ("lock", "pending", "inflight")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+        self.inflight = {}  # normalized input -> task running that turn
+
+
+class TurnCoordinator:
+    """Runs each user's chat turns one at a time, in arrival order.
+
+    Every user gets their own lock, so users never wait on each other. A
+    turn whose normalized input matches one already queued or running for
+    the same user (double submits, several tabs) awaits that turn's result
+    instead of calling the LLM again. At most `max_pending` distinct turns
+    per user may be queued; beyond that UserBusy is raised so the caller can
+    answer 429. Slots are dropped when a user has nothing pending.
+
+    This orders turns within one worker process. Across workers, the
+    memory store's atomic updates still keep every turn's history.
+    """
+
+    def __init__(self, max_pending: int = CHAT_MAX_PENDING_PER_USER):
+        self.max_pending = max_pending
+        self._slots = {}
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def _reserve(self, user_id: str) -> _UserSlot:
+        slot = self._slots.get(user_id)
+        if slot is None:
+            slot = self._slots[user_id] = _UserSlot()
+        if slot.pending >= self.max_pending:
+            self.rejected += 1
+            raise UserBusy()
+        slot.pending += 1
+        return slot
+
+    def _release(self, user_id: str, slot: _UserSlot):
+        slot.pending -= 1
+        if slot.pending == 0 and self._slots.get(user_id) is slot:
+            del self._slots[user_id]
+
+    def is_full(self, user_id: str) -> bool:
+        slot = self._slots.get(user_id)
+        return slot is not None and slot.pending >= self.max_pending
+
+    @asynccontextmanager
+    async def turn(self, user_id: str):
+        """Hold the user's turn for the duration of the block (no deduplication)"""
+        slot = self._reserve(user_id)
+        try:
+            async with slot.lock:
+                yield
+        finally:
+            self._release(user_id, slot)
+
+    async def run(self, user_id: str, user_input: str, fn: Callable[[], Awaitable]):
+        """Run `fn` as the user's next turn, sharing the result of an identical in-flight turn.
+
+        Returns `(result, deduplicated)`; `deduplicated` is True when the
+        result came from another caller's identical turn, which alone paid
+        for it. The turn runs as its own task, so it completes (and its
+        history is kept) even if the caller that started it disconnects.
+        """
+        key = normalize_input(user_input)
+        slot = self._slots.get(user_id)
+        task = slot.inflight.get(key) if slot is not None else None
+        deduplicated = task is not None
+        if deduplicated:
+            self.deduplicated += 1
+        else:
+            slot = self._reserve(user_id)
+            task = asyncio.ensure_future(self._execute(user_id, slot, key, fn))
+            # Mark a failure as seen even if every caller has gone away
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            slot.inflight[key] = task
+        return await asyncio.shield(task), deduplicated
+
+    async def _execute(self, user_id: str, slot: _UserSlot, key: str, fn: Callable[[], Awaitable]):
+        try:
+            async with slot.lock:
+                return await fn()
+        finally:
+            slot.inflight.pop(key, None)
+            self._release(user_id, slot)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._slots),
+            "pending": sum(slot.pending for slot in self._slots.values()),
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+        }
+
+    def collect(self):
+        """Metrics collector for queue depth, deduplicated and rejected turns"""
+        stats = self.stats()
+        return [
+            ("mentor_chat_pending_turns", "gauge", "Chat turns running or queued", [({}, stats["pending"])]),
+            ("mentor_chat_deduplicated_total", "counter", "Turns answered by an identical in-flight turn",
+             [({}, stats["deduplicated"])]),
+            ("mentor_chat_rejected_total", "counter", "Turns refused because the user's queue was full",
+             [({}, stats["rejected"])]),
+        ]
+
+
+# Create singleton instance
+chat_turns = TurnCoordinator()
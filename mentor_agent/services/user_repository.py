@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Optional
+from mentor_agent.backends.base import StateBackend
+from mentor_agent.backends.memory import InMemoryBackend
+
+
+class UserAlreadyExists(ValueError):
+    pass
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def _encode(user: dict) -> dict:
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in user.items()}
+
+
+def _decode(data: dict) -> dict:
+    user = dict(data)
+    if isinstance(user.get("created_at"), str):
+        user["created_at"] = datetime.fromisoformat(user["created_at"])
+    return user
+
+
+class UserRepository:
+    """Users stored in a state backend, keyed by id with an email -> id index.
+
+    Both lookups are single key reads. Uniqueness of ids and normalized
+    emails is enforced with the backend's atomic set-if-missing, so it holds
+    across workers when the backend is shared.
+    """
+
+    def __init__(self, backend: StateBackend = None):
+        self.backend = backend or InMemoryBackend()
+
+    def get_by_id(self, user_id: str) -> Optional[dict]:
+        data = self.backend.get("users", user_id)
+        return _decode(data) if data else None
+
+    def get_by_email(self, email: str) -> Optional[dict]:
+        user_id = self.backend.get("user_emails", normalize_email(email))
+        return self.get_by_id(user_id) if user_id else None
+
+    def add(self, user: dict) -> dict:
+        email = normalize_email(user["email"])
+        if not self.backend.add("user_emails", email, user["id"]):
+            raise UserAlreadyExists(f"User {user['email']} already exists")
+        if not self.backend.add("users", user["id"], _encode(user)):
+            self.backend.delete("user_emails", email)
+            raise UserAlreadyExists(f"User {user['email']} already exists")
+        return user
+
+    def update(self, user_id: str, **fields) -> Optional[dict]:
+        user = self.get_by_id(user_id)
+        if user is None:
+            return None
+        old_email = normalize_email(user["email"])
+        new_email = normalize_email(fields.get("email", user["email"]))
+        if new_email != old_email and not self.backend.add("user_emails", new_email, user_id):
+            raise UserAlreadyExists(f"User {fields['email']} already exists")
+
+        def apply(data):
+            return _encode({**_decode(data), **fields}) if data else None
+        data = self.backend.update("users", user_id, apply)
+        if new_email != old_email:
+            self.backend.delete("user_emails", old_email)
+        return _decode(data) if data else None
+
+    def __len__(self) -> int:
+        return self.backend.count("users")
@@ -0,0 +1,65 @@
+import os
+import time
+import threading
+from typing import Callable
+
+# Build the mentor graph, document parsers and Supabase client in the background at startup
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+WARMUP_NICENESS = 19
+
+
+class Warmup:
+    """Initializes heavy components in a background thread after startup.
+
+    Components are imported and built lazily on first use, so the API can
+    answer auth traffic as soon as the process is up. `start` front-loads
+    that work so the first chat or upload doesn't pay for it. A component
+    that fails (e.g. GROQ_API_KEY missing) is reported and left to fail on
+    use; it does not hold back readiness for everything else.
+    """
+
+    def __init__(self, enabled: bool = WARMUP_ON_STARTUP):
+        self.enabled = enabled
+        self._components = {}  # name -> (fn, status dict)
+        self._thread = None
+
+    def register(self, name: str, fn: Callable[[], object]):
+        self._components[name] = (fn, {"status": "pending"})
+
+    def _run(self):
+        try:
+            # Linux applies niceness per thread: request threads keep priority on the CPU while this runs
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WARMUP_NICENESS)
+        except (AttributeError, OSError):
+            pass
+        for name, (fn, state) in self._components.items():
+            state["status"] = "running"
+            started = time.perf_counter()
+            try:
+                fn()
+                state["status"] = "ready"
+            except Exception as e:
+                state["status"] = "failed"
+                state["error"] = str(e)
+                print(f"⚠️ Warm-up of {name} failed: {e}")
+            state["seconds"] = round(time.perf_counter() - started, 3)
+        summary = ", ".join(f"{name} {state['status']}" for name, (_, state) in self._components.items())
+        print(f"🔥 Warm-up finished: {summary}")
+
+    def start(self):
+        if self.enabled and self._thread is None and self._components:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def ready(self) -> bool:
+        """True once every component has been tried (or immediately, when warm-up is off)"""
+        if not self.enabled:
+            return True
+        return all(state["status"] in ("ready", "failed") for _, state in self._components.values())
+
+    def status(self) -> dict:
+        return {name: dict(state) for name, (_, state) in self._components.items()}
+
+
+# Create singleton instance
+warmup = Warmup()
@@ -1,72 +1,114 @@
-from langgraph.graph import StateGraph
-from langchain_core.runnables import RunnableLambda
-from mentor_agent.agents.groq_agent import GroqMentorAgent
-from mentor_agent.memory.store import get_user_memory, update_user_memory
+from mentor_agent.agents.provider_router import build_router, ProviderRouter, LLM_HEDGE_REQUESTS
+from mentor_agent.agents.response_cache import response_cache
+from mentor_agent.memory.store import get_user_memory, modify_user_memory, aget_user_memory, amodify_user_memory
 from mentor_agent.models.conversation_state import MentorState
-import os
-
-groq_agent = GroqMentorAgent(groq_api_key=os.getenv("GROQ_API_KEY"))
+from mentor_agent.services.retrieval_service import retrieval_service
+from mentor_agent.states.prompt_builder import prompt_builder, record_turn, estimate_tokens
+from mentor_agent.states.output_parser import parse_mentor_output
+from mentor_agent.services.metrics import timed
+from mentor_agent.services.conversation_log import conversation_log
+import asyncio
+import threading
+
+_mentor_llm = None
+_mentor_graph = None
+_build_lock = threading.Lock()
+
+def get_mentor_llm() -> ProviderRouter:
+    """Provider router, built on first use so workers that never chat don't load the LLM clients"""
+    global _mentor_llm
+    if _mentor_llm is None:
+        with _build_lock:
+            if _mentor_llm is None:
+                _mentor_llm = build_router()
+    return _mentor_llm
+
+def collect_llm_metrics():
+    """Metrics collector for the provider router; empty until the router is built"""
+    return _mentor_llm.collect() if _mentor_llm is not None else []
+
+def format_result(result: dict, user_input: str = "") -> dict:
+    return parse_mentor_output(result.get("output", ""), user_input)
+
+def history_seq(memory: dict) -> int:
+    """Position of the newest turn in the whole conversation, compacted turns included"""
+    return memory.get("history_offset", 0) + len(memory.get("history", [])) - 1
 
 def analyze_and_respond(state: MentorState):
-    user_id = state.user_id
-    user_input = state.input
-
-    memory = get_user_memory(user_id)
+    with timed("memory_load"):
+        memory = get_user_memory(state.user_id)
     profile = memory.get("profile", {})
-    tasks = memory.get("tasks", [])
-    history = memory.get("history", [])
-    docs = memory.get("documents", [])
-
-    prompt = f"""
-You are an AI mentor with a {profile.get("personality", "Concise")} personality.
-
-### User Profile
-Name: {profile.get('name')}
-Goal: {profile.get('goal')}
-Education: {profile.get('education')}
-
-### Recent Messages
-{', '.join(x['input'] for x in history[-3:])}
-
-### Tasks
-{', '.join(t['task'] for t in tasks[-3:])}
-
-### Docs
-{', '.join(d['filename'] for d in docs)}
-
-Respond in **markdown format**. Include:
-- Response to user's message: "{user_input}"
-- Embedded follow-up relevant to their goals or past work
-- Add a summary sentiment + topic
-
-Format output as:
-RESPONSE:
-<markdown>
-
-SENTIMENT: <positive/neutral/negative>
-TOPIC: <detected topic>
-"""
-
-    result = groq_agent.run(prompt)
-    reply = result.get("output", "No reply generated")
-
-    memory.setdefault("history", []).append({
-        "input": user_input,
-        "response": reply
-    })
-    update_user_memory(user_id, memory)
-
-    return {
-        "reply": reply,
-        "analytics": {
-            "sentiment": result.get("sentiment", "neutral"),
-            "topic": result.get("topic", "general")
-        }
-    }
-
-# ✅ Register with schema
-builder = StateGraph(state_schema=MentorState)
-builder.add_node("respond", RunnableLambda(analyze_and_respond))
-builder.set_entry_point("respond")
-
-mentor_graph = builder.compile()
+    with timed("retrieval"):
+        passages = retrieval_service.search(state.user_id, state.input)
+    # Replies grounded in the user's own documents are never shared through the cache
+    cacheable = response_cache.enabled and not passages
+    result = response_cache.get(profile, state.input) if cacheable else None
+    tokens = 0
+    if result is None:
+        with timed("prompt_build"):
+            prompt = (response_cache.shared_prompt(profile, state.input) if cacheable
+                      else prompt_builder.build(memory, state.input, passages))
+        with timed("llm_call"):
+            output = get_mentor_llm().run(prompt)
+        with timed("parse"):
+            result = format_result(output, state.input)
+        tokens = estimate_tokens(prompt) + estimate_tokens(output.get("output", ""))
+        if cacheable:
+            response_cache.put(profile, state.input, result)
+
+    turn = {"input": state.input, "response": result["reply"]}
+    with timed("memory_save"):
+        memory = modify_user_memory(state.user_id, lambda memory: record_turn(memory, turn))
+    conversation_log.record(state.user_id, history_seq(memory), turn, result["analytics"])
+    return {**result, "tokens": tokens}
+
+async def aanalyze_and_respond(state: MentorState):
+    with timed("memory_load"):
+        memory = await aget_user_memory(state.user_id)
+    profile = memory.get("profile", {})
+    with timed("retrieval"):
+        passages = await asyncio.to_thread(retrieval_service.search, state.user_id, state.input)
+    cacheable = response_cache.enabled and not passages
+    result = response_cache.get(profile, state.input) if cacheable else None
+    tokens = 0
+    if result is None:
+        with timed("prompt_build"):
+            prompt = (response_cache.shared_prompt(profile, state.input) if cacheable
+                      else prompt_builder.build(memory, state.input, passages))
+        with timed("llm_call"):
+            # A hedged second provider would interleave its tokens with the first one's in the stream
+            output = await get_mentor_llm().arun(prompt, hedge=LLM_HEDGE_REQUESTS and not state.stream)
+        with timed("parse"):
+            result = format_result(output, state.input)
+        tokens = estimate_tokens(prompt) + estimate_tokens(output.get("output", ""))
+        if cacheable:
+            response_cache.put(profile, state.input, result)
+
+    turn = {"input": state.input, "response": result["reply"]}
+    with timed("memory_save"):
+        memory = await amodify_user_memory(state.user_id, lambda memory: record_turn(memory, turn))
+    conversation_log.record(state.user_id, history_seq(memory), turn, result["analytics"])
+    return {**result, "tokens": tokens}
+
+def get_mentor_graph():
+    """Compiled mentor graph, built on first use (importing langgraph alone takes most of a second)"""
+    global _mentor_graph
+    if _mentor_graph is None:
+        get_mentor_llm()
+        with _build_lock:
+            if _mentor_graph is None:
+                from langgraph.graph import StateGraph
+                from langchain_core.runnables import RunnableLambda
+
+                # ✅ Register with schema
+                builder = StateGraph(state_schema=MentorState)
+                builder.add_node("respond", RunnableLambda(analyze_and_respond, afunc=aanalyze_and_respond))
+                builder.set_entry_point("respond")
+                _mentor_graph = builder.compile()
+    return _mentor_graph
+
+async def aget_mentor_graph():
+    """get_mentor_graph without blocking the event loop while the graph is first built"""
+    if _mentor_graph is not None:
+        return _mentor_graph
+    return await asyncio.to_thread(get_mentor_graph)
@@ -0,0 +1,172 @@
+import re
+from typing import Optional
+from mentor_agent.services.text_classifier import text_classifier
+from mentor_agent.services.metrics import analytics_source
+
+RESPONSE_HEADER_RE = re.compile(r"^\s*\**RESPONSE:?\**:?[ \t]*\n?", re.IGNORECASE)
+TRAILER_LINE_RE = re.compile(r"^\W*(SENTIMENT|TOPIC)\W*:\W*(.*?)\W*$", re.IGNORECASE)
+TRAILER_KEYS = ("SENTIMENT", "TOPIC")
+SENTIMENTS = ("positive", "negative", "neutral")
+# Trailer values are labels; a longer value means the line is part of the reply
+TRAILER_VALUE_MAX_CHARS = 60
+LEADING_NON_WORD_RE = re.compile(r"^\W*")
+WORD_RE = re.compile(r"\w")
+# Text held back at the start of a stream while it might still be the RESPONSE header
+HEADER_HOLD_CHARS = 24
+
+
+def normalize_sentiment(value: str) -> Optional[str]:
+    """'Positive 😊' -> 'positive'; None when the value names no known sentiment"""
+    value = value.lower()
+    return next((sentiment for sentiment in SENTIMENTS if sentiment in value), None)
+
+
+def trailer_field(line: str) -> Optional[tuple]:
+    """(key, value) when a complete line reads as a SENTIMENT/TOPIC trailer line, else None"""
+    match = TRAILER_LINE_RE.match(line)
+    if not match:
+        return None
+    key, value = match.group(1).lower(), match.group(2).strip()
+    if len(value) > TRAILER_VALUE_MAX_CHARS:
+        return None
+    if key == "sentiment" and value and normalize_sentiment(value) is None:
+        return None
+    return key, value
+
+
+def split_trailer(text: str) -> tuple:
+    """Split off the SENTIMENT/TOPIC block that ends the text: (text before it, {key: value}).
+
+    Only trailer lines separated by blank or punctuation-only lines count,
+    so a `Topic:` line inside the reply stays part of the reply.
+    """
+    fields = {}
+    start = end = len(text)
+    while end > 0:
+        line_start = text.rfind("\n", 0, end) + 1
+        line = text[line_start:end]
+        if WORD_RE.search(line):
+            field = trailer_field(line)
+            if field is None:
+                break
+            key, value = field
+            if value:
+                fields.setdefault(key, value)  # the last line wins for a repeated key
+            start = line_start
+        end = line_start - 1
+    return text[:start], fields
+
+
+def parse_mentor_output(text: str, user_input: str = "") -> dict:
+    """Split the model output into the markdown reply and the SENTIMENT/TOPIC trailer.
+
+    Fields the trailer is missing (or has an unusable sentiment for) are
+    filled in by the local classifier: sentiment from the user's message
+    when given, topic from the message and the reply together.
+    """
+    reply, fields = split_trailer(text)
+    reply = RESPONSE_HEADER_RE.sub("", reply, count=1).strip()
+
+    analytics = {
+        "sentiment": normalize_sentiment(fields.get("sentiment", "")),
+        "topic": fields.get("topic") or None,
+    }
+    if analytics["sentiment"] is None:
+        analytics["sentiment"] = text_classifier.sentiment(user_input or reply)
+    if analytics["topic"] is None:
+        analytics["topic"] = text_classifier.topic(f"{user_input}\n{reply}")
+    analytics_source.inc(source="model" if "sentiment" in fields and "topic" in fields else "classifier")
+    return {"reply": reply or "No reply generated", "analytics": analytics}
+
+
+def may_be_trailer(partial: str) -> bool:
+    """Whether a line still being streamed could turn out to be a trailer line"""
+    word = LEADING_NON_WORD_RE.sub("", partial)
+    upper = word.upper()
+    for key in TRAILER_KEYS:
+        if key.startswith(upper):
+            return True
+        if upper.startswith(key) and not WORD_RE.search(word[len(key):].partition(":")[0]):
+            return True
+    return False
+
+
+class StreamingReplyParser:
+    """Incremental counterpart of parse_mentor_output for streamed tokens.
+
+    `feed(token)` returns the part of the reply that is safe to show now.
+    The RESPONSE header is stripped. Lines that might belong to the trailer
+    are held back: they are released as soon as more reply text follows
+    them, and dropped if the stream ends first. `flush()` returns whatever
+    reply text was still held when the stream ended. The final reply and
+    analytics still come from parse_mentor_output over the whole text.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._header_done = False
+        self._in_line = False  # the current line is known to be reply text
+        self._held_lines = []  # complete lines that may be the trailer
+        self._started = False
+        self._held_space = ""
+
+    def feed(self, token: str) -> str:
+        if not token:
+            return ""
+        self._pending += token
+        if not self._header_done:
+            if "\n" not in self._pending and len(self._pending.strip()) < HEADER_HOLD_CHARS:
+                return ""
+            self._pending = RESPONSE_HEADER_RE.sub("", self._pending, count=1)
+            self._header_done = True
+        return self._emit(self._advance(complete=False))
+
+    def flush(self) -> str:
+        if not self._header_done:
+            self._pending = RESPONSE_HEADER_RE.sub("", self._pending, count=1)
+            self._header_done = True
+        text = self._emit(self._advance(complete=True))
+        self._held_lines = []  # the stream ended on them, so they were the trailer
+        return text
+
+    def _advance(self, complete: bool) -> str:
+        out = []
+        while self._pending:
+            if self._in_line:
+                newline = self._pending.find("\n")
+                if newline < 0:
+                    out.append(self._pending)
+                    self._pending = ""
+                    break
+                out.append(self._pending[:newline + 1])
+                self._pending = self._pending[newline + 1:]
+                self._in_line = False
+                continue
+            line, newline, rest = self._pending.partition("\n")
+            if newline or complete:
+                if trailer_field(line) is not None or (self._held_lines and not WORD_RE.search(line)):
+                    self._held_lines.append(line + newline)
+                    self._pending = rest
+                    continue
+            elif may_be_trailer(line):
+                break
+            # Reply text: whatever was held wasn't the trailer after all
+            out.extend(self._held_lines)
+            self._held_lines = []
+            self._in_line = True
+        return "".join(out)
+
+    @property
+    def started(self) -> bool:
+        """Whether any reply text has been returned yet"""
+        return self._started
+
+    def _emit(self, text: str) -> str:
+        """Drop leading whitespace and hold trailing whitespace, which may only precede the trailer"""
+        text = self._held_space + text
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        stripped = text.rstrip()
+        self._held_space = text[len(stripped):]
+        return stripped
@@ -0,0 +1,213 @@
+import os
+import re
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 3000))
+RECENT_TURNS = int(os.getenv("PROMPT_RECENT_TURNS", 3))
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", 2000))
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", 50))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", 20))
+TURN_MAX_CHARS = 600
+INPUT_MAX_CHARS = 4000
+PASSAGE_MAX_CHARS = 800
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+MARKDOWN_RE = re.compile(r"[*_`#>]+")
+
+PROMPT_TEMPLATE = """
+You are an AI mentor with a {personality} personality.
+
+### User Profile
+Name: {name}
+Goal: {goal}
+Education: {education}
+
+### Conversation Summary
+{summary}
+
+### Recent Messages
+{recent}
+
+### Tasks
+{tasks}
+
+### Docs
+{docs}
+
+### Relevant Excerpts
+{excerpts}
+
+Respond in **markdown format**. Include:
+- Response to user's message: "{user_input}"
+- Embedded follow-up relevant to their goals or past work
+- Add a summary sentiment + topic
+
+Format output as:
+RESPONSE:
+<markdown>
+
+SENTIMENT: <positive/neutral/negative>
+TOPIC: <detected topic>
+"""
+
+CHECKIN_TEMPLATE = """
+You are an AI mentor with a {personality} personality, writing a short proactive check-in.
+
+### User Profile
+Name: {name}
+Goal: {goal}
+Education: {education}
+
+### Conversation Summary
+{summary}
+
+### Recent Messages
+{recent}
+
+### Tasks
+{tasks}
+
+Respond in **markdown format**. In a few sentences:
+- Ask how they are progressing towards their goal or open tasks
+- Suggest one concrete next step
+
+Format output as:
+RESPONSE:
+<markdown>
+
+SENTIMENT: <positive/neutral/negative>
+TOPIC: <detected topic>
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def clip(text: str, max_chars: int) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def first_sentence(text: str, max_chars: int) -> str:
+    text = MARKDOWN_RE.sub("", text or "").strip()
+    return clip(SENTENCE_END_RE.split(text, maxsplit=1)[0], max_chars)
+
+
+def condense_turn(turn: dict) -> str:
+    """One summary line for a turn that has left the recent window"""
+    line = f"- User: {first_sentence(turn.get('input', ''), 120)}"
+    if turn.get("response"):
+        line += f" | Mentor: {first_sentence(turn['response'], 160)}"
+    return line
+
+
+class PromptBuilder:
+    """Assembles the mentor prompt within a fixed token budget.
+
+    Profile and instructions are always included. The remaining budget goes,
+    in order, to the most recent turns, the rolling summary of older turns,
+    and finally the retrieved document excerpts (best score first).
+    """
+
+    def __init__(self, token_budget: int = PROMPT_TOKEN_BUDGET, recent_turns: int = RECENT_TURNS):
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+
+    def build(self, memory: dict, user_input: str, passages: list = (), anonymous: bool = False) -> str:
+        """`anonymous` leaves out the user's name, for replies that may be shared through the response cache"""
+        profile = memory.get("profile", {})
+        tasks = memory.get("tasks", [])
+        docs = memory.get("documents", [])
+        fields = {
+            "personality": profile.get("personality", "Concise"),
+            "name": "(not shared)" if anonymous else profile.get("name"),
+            "goal": profile.get("goal"),
+            "education": profile.get("education"),
+            "tasks": ", ".join(t["task"] for t in tasks[-3:]),
+            "docs": ", ".join(d["filename"] for d in docs),
+            "user_input": clip(user_input, INPUT_MAX_CHARS),
+            "summary": "",
+            "recent": "",
+            "excerpts": "",
+        }
+        remaining = self.token_budget - estimate_tokens(PROMPT_TEMPLATE.format(**fields))
+
+        recent = []
+        for turn in reversed(memory.get("history", [])[-self.recent_turns:]):
+            line = f"User: {clip(turn.get('input', ''), TURN_MAX_CHARS)}"
+            if turn.get("response"):
+                line += f"\nMentor: {clip(turn['response'], TURN_MAX_CHARS)}"
+            cost = estimate_tokens(line)
+            if cost > remaining:
+                break
+            recent.insert(0, line)
+            remaining -= cost
+        fields["recent"] = "\n\n".join(recent)
+
+        summary = memory.get("summary", "")
+        if summary and remaining > 0:
+            # Keep the newest part of the summary if it doesn't fit
+            fields["summary"] = summary[-remaining * 4:]
+            remaining -= estimate_tokens(fields["summary"])
+
+        excerpts = []
+        for passage in passages:
+            line = f"[{passage['filename']}] {clip(passage['text'], PASSAGE_MAX_CHARS)}"
+            cost = estimate_tokens(line)
+            if cost > remaining:
+                break
+            excerpts.append(line)
+            remaining -= cost
+        fields["excerpts"] = "\n\n".join(excerpts)
+
+        return PROMPT_TEMPLATE.format(**fields)
+
+    def build_checkin(self, memory: dict) -> str:
+        """Prompt for a proactive check-in: profile, tasks, summary and the last turn"""
+        profile = memory.get("profile", {})
+        history = memory.get("history", [])[-1:]
+        return CHECKIN_TEMPLATE.format(
+            personality=profile.get("personality", "Concise"),
+            name=profile.get("name"),
+            goal=profile.get("goal"),
+            education=profile.get("education"),
+            tasks=", ".join(t["task"] for t in memory.get("tasks", [])[-3:]),
+            summary=clip(memory.get("summary", ""), SUMMARY_MAX_CHARS),
+            recent="\n\n".join(condense_turn(turn) for turn in history),
+        )
+
+
+def record_turn(memory: dict, turn: dict, recent_turns: int = RECENT_TURNS) -> dict:
+    """Append a turn, fold turns leaving the recent window into the summary, and compact.
+
+    The summary is extended incrementally with one line per turn that drops
+    out of the window and trimmed from the front past SUMMARY_MAX_CHARS.
+    Once stored history exceeds HISTORY_MAX_TURNS, only the newest
+    HISTORY_KEEP_TURNS are kept; `history_offset` counts the dropped turns.
+    """
+    history = memory.setdefault("history", [])
+    history.append(turn)
+    offset = memory.get("history_offset", 0)
+    summarized = max(memory.get("summarized_turns", 0), offset)
+
+    window_start = offset + len(history) - recent_turns
+    if summarized < window_start:
+        lines = [condense_turn(t) for t in history[summarized - offset:window_start - offset]]
+        summary = "\n".join(filter(None, [memory.get("summary", "")] + lines))
+        if len(summary) > SUMMARY_MAX_CHARS:
+            summary = summary[-SUMMARY_MAX_CHARS:]
+            summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+        memory["summary"] = summary
+        memory["summarized_turns"] = window_start
+
+    if len(history) > HISTORY_MAX_TURNS:
+        keep = max(HISTORY_KEEP_TURNS, recent_turns)
+        drop = len(history) - keep
+        memory["history"] = history[drop:]
+        memory["history_offset"] = offset + drop
+    return memory
+
+
+# Create singleton instance
+prompt_builder = PromptBuilder()
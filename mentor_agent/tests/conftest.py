@@ -0,0 +1,107 @@
+import os
+import json
+import asyncio
+import tempfile
+import httpx
+import pytest
+
+# Configure the app before any mentor_agent module reads its settings: local
+# SQLite files in a scratch directory and the offline fake LLM provider.
+DATA_DIR = tempfile.mkdtemp(prefix="mentor-tests-")
+os.environ.update(
+    MEMORY_DB_PATH=os.path.join(DATA_DIR, "user_memory.db"),
+    JOB_DB_PATH=os.path.join(DATA_DIR, "jobs.db"),
+    CONVERSATION_DB_PATH=os.path.join(DATA_DIR, "conversations.db"),
+    CONVERSATION_SINK="sqlite",
+    LLM_PROVIDERS="fake",
+    FAKE_LLM_LATENCY="0",
+    RATE_LIMITS_ENABLED="false",
+)
+
+API = "/IndieMentor/api/v1"
+
+
+@pytest.fixture
+def api():
+    """Run `fn(client)` against the app in-process (httpx ASGI transport) and return its result"""
+    from mentor_agent.main import app
+
+    def run(fn):
+        async def main():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await fn(client)
+        return asyncio.run(main())
+    return run
+
+
+@pytest.fixture
+def auth_headers():
+    """auth_headers(user_id) -> Authorization header of a user with that id, added on first use"""
+    from mentor_agent.services.auth_service import AuthService, user_repository
+
+    def make(user_id: str) -> dict:
+        user = user_repository.get_by_id(user_id) or user_repository.add({
+            "id": user_id, "email": f"{user_id}@example.com", "password": "", "name": user_id,
+            "role": "user", "subscription_tier": "free",
+        })
+        return {"Authorization": f"Bearer {AuthService.create_jwt_token(user)}"}
+    return make
+
+
+class FakeClock:
+    """Stands in for the `time` module of the code under test; only moves when advanced"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """fake_clock(*modules) -> FakeClock that those modules read the time from for the rest of the test"""
+    def install(*modules) -> FakeClock:
+        clock = FakeClock()
+        for module in modules:
+            monkeypatch.setattr(module, "time", clock)
+        return clock
+    return install
+
+
+@pytest.fixture
+def memory_store(tmp_path):
+    """A SQLite memory store in a file of its own"""
+    from mentor_agent.memory.store import SQLiteMemoryStore
+    return SQLiteMemoryStore(db_path=str(tmp_path / "user_memory.db"), legacy_path=None)
+
+
+@pytest.fixture
+def tier_limits(monkeypatch):
+    """tier_limits(**limits) -> enforce these limits on every tier for the rest of the test"""
+    from mentor_agent.services import quotas
+    from mentor_agent.backends.memory import InMemoryBackend
+    from mentor_agent.routes import chat
+
+    def apply(**limits) -> quotas.QuotaManager:
+        tiers = {tier: {**defaults, **limits} for tier, defaults in quotas.DEFAULT_TIER_LIMITS.items()}
+        manager = quotas.QuotaManager(backend=InMemoryBackend(), tiers=tiers, enabled=True)
+        monkeypatch.setattr(quotas, "quotas", manager)
+        monkeypatch.setattr(chat, "quotas", manager)
+        return manager
+    return apply
+
+
+def sse_events(body: str) -> list:
+    """[(event, data)] from a server-sent events body"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta, timezone
+import jwt
+from mentor_agent.services import auth_service
+from mentor_agent.services.auth_service import AuthService, JWT_ALGORITHM, JWT_SECRET
+
+
+def test_token_without_kid_verifies_after_key_rotation(monkeypatch):
+    # Signed the way tokens were before key ids existed
+    legacy_token = jwt.encode(
+        {"user_id": "legacy-user", "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        JWT_SECRET, algorithm=JWT_ALGORITHM
+    )
+    assert "kid" not in jwt.get_unverified_header(legacy_token)
+
+    monkeypatch.setattr(auth_service, "JWT_KEYS", {**auth_service.JWT_KEYS, "2026-10": "rotated-secret-for-tests-0123456789abcdef"})
+    monkeypatch.setattr(auth_service, "JWT_ACTIVE_KID", "2026-10")
+
+    assert AuthService.verify_jwt_token(legacy_token)["user_id"] == "legacy-user"
+    new_token = AuthService.create_jwt_token({"id": "new-user", "email": "new@example.com",
+                                              "name": "New", "role": "user", "subscription_tier": "free"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "2026-10"
+    assert AuthService.verify_jwt_token(new_token)["user_id"] == "new-user"
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from mentor_agent.agents.batch_scheduler import MicroBatcher
+from mentor_agent.agents.fake_agent import FakeMentorAgent
+from mentor_agent.memory.store import get_user_memory, update_user_memory
+from mentor_agent.services.checkins import generate_checkins
+
+
+class Dispatch:
+    """Batch call that answers each prompt in upper case after `delay`, recording batches and overlap"""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.batches = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, prompts: list) -> list:
+        self.batches.append(list(prompts))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return [ValueError(prompt) if prompt.startswith("bad") else prompt.upper() for prompt in prompts]
+
+
+def submit_all(batcher: MicroBatcher, prompts: list) -> list:
+    async def main():
+        return await asyncio.gather(*(batcher.submit(prompt) for prompt in prompts), return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_full_batches_go_out_at_once_and_the_rest_after_the_wait():
+    dispatch = Dispatch()
+    batcher = MicroBatcher(dispatch, max_batch_size=4, max_wait=0.05, max_in_flight=4)
+
+    assert submit_all(batcher, [f"p{i}" for i in range(10)]) == [f"P{i}" for i in range(10)]
+    assert [len(batch) for batch in dispatch.batches] == [4, 4, 2]
+    assert batcher.stats() == {"batches": 3, "items": 10, "mean_batch_size": 10 / 3, "queued": 0}
+
+
+def test_a_lone_prompt_is_sent_after_max_wait():
+    dispatch = Dispatch(delay=0)
+    batcher = MicroBatcher(dispatch, max_batch_size=16, max_wait=0.05)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await batcher.submit("hi")
+        return result, loop.time() - started
+
+    result, waited = asyncio.run(main())
+    assert result == "HI"
+    assert 0.04 <= waited < 0.5
+
+
+def test_batches_in_flight_are_capped():
+    dispatch = Dispatch(delay=0.02)
+    batcher = MicroBatcher(dispatch, max_batch_size=2, max_wait=0.01, max_in_flight=1)
+
+    submit_all(batcher, [f"p{i}" for i in range(6)])
+    assert len(dispatch.batches) == 3
+    assert dispatch.max_running == 1
+
+
+def test_each_caller_gets_its_own_failure():
+    batcher = MicroBatcher(Dispatch(), max_batch_size=3, max_wait=0.01)
+
+    results = submit_all(batcher, ["ok", "bad", "fine"])
+    assert results[0] == "OK" and results[2] == "FINE"
+    assert isinstance(results[1], ValueError)
+
+
+async def provider_down(prompts: list) -> list:
+    raise RuntimeError("provider down")
+
+
+async def one_result(prompts: list) -> list:
+    return ["only one"]
+
+
+@pytest.mark.parametrize("dispatch, error", [
+    (provider_down, "provider down"),
+    (one_result, "Batch returned 1 results for 2 prompts"),
+])
+def test_a_failed_or_malformed_batch_fails_every_caller(dispatch, error):
+    batcher = MicroBatcher(dispatch, max_batch_size=2, max_wait=0.01)
+
+    results = submit_all(batcher, ["a", "b"])
+    assert [str(result) for result in results] == [error, error]
+
+
+def test_callers_that_gave_up_are_left_out_of_the_batch():
+    dispatch = Dispatch()
+    batcher = MicroBatcher(dispatch, max_batch_size=16, max_wait=0.05)
+
+    async def main():
+        gone = asyncio.ensure_future(batcher.submit("gone"))
+        kept = asyncio.ensure_future(batcher.submit("kept"))
+        await asyncio.sleep(0)
+        gone.cancel()
+        return await kept
+
+    assert asyncio.run(main()) == "KEPT"
+    assert dispatch.batches == [["kept"]]
+
+
+def test_due_users_get_a_checkin_through_batched_calls():
+    profile = {"name": "Ana", "goal": "Ship", "education": "BSc"}
+    recent = datetime.now(timezone.utc).isoformat()
+    for user_id in ("checkin-a", "checkin-b", "checkin-c"):
+        update_user_memory(user_id, {"profile": {**profile, "user_id": user_id}, "tasks": [], "history": [],
+                                     "last_check": None})
+    update_user_memory("checkin-recent", {"profile": profile, "last_check": recent})
+    update_user_memory("checkin-no-setup", {})
+    llm = FakeMentorAgent(latency=0)
+    batcher = MicroBatcher(llm.abatch, max_batch_size=8, max_wait=0.01)
+
+    users = ["checkin-a", "checkin-b", "checkin-c", "checkin-recent", "checkin-no-setup"]
+    summary = asyncio.run(generate_checkins(users, batcher=batcher))
+    assert (summary["generated"], summary["skipped"], summary["failed"]) == (3, 2, 0)
+    assert summary["batches"] == 1
+    checkins = get_user_memory("checkin-a")["checkins"]
+    assert len(checkins) == 1 and checkins[0]["message"].startswith("Here is some guidance")
+    assert get_user_memory("checkin-recent")["last_check"] == recent
@@ -0,0 +1,102 @@
+import asyncio
+from typing import List, Optional
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from conftest import API, sse_events
+from mentor_agent.agents.provider_router import ProviderRouter
+from mentor_agent.states import mentor_flow
+
+TRAILER = "\nSENTIMENT: neutral\nTOPIC: general"
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Streams `tokens` one chunk at a time, raising instead of sending token number `fail_at`"""
+    tokens: List[str]
+    fail_at: Optional[int] = None
+    delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage("".join(self.tokens)))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        for i, token in enumerate(self.tokens):
+            if i == self.fail_at:
+                raise RuntimeError("connection reset mid-stream")
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class ChatModelProvider:
+    cost_per_1k_tokens = 0.0
+
+    def __init__(self, name: str, llm: ScriptedChatModel):
+        self.name = name
+        self.llm = llm
+        self.calls = 0
+
+    async def arun(self, prompt: str):
+        self.calls += 1
+        return {"input": prompt, "output": (await self.llm.ainvoke(prompt)).content}
+
+
+def stream_turn(api, bot_id: str) -> list:
+    async def run(client):
+        await client.post(f"{API}/setup/", data={"user_id": bot_id, "name": "Sam", "education": "BSc", "goal": "Ship"})
+        response = await client.post(f"{API}/chat/", params={"bot_id": bot_id, "stream": "true"},
+                                     data={"text_input": "Plan my week"})
+        return sse_events(response.text)
+    return api(run)
+
+
+def shown_reply(events: list) -> str:
+    """The text a client shows: token events since the last reset"""
+    text = ""
+    for event, data in events:
+        if event == "reset":
+            text = ""
+        elif event == "token":
+            text += data
+    return text
+
+
+def test_failover_mid_stream_resets_the_streamed_reply(api, monkeypatch):
+    first = ChatModelProvider("first", ScriptedChatModel(tokens=["RESPONSE:\n", "First", " attempt", " more"], fail_at=3))
+    second = ChatModelProvider("second", ScriptedChatModel(tokens=["RESPONSE:", "\nSecond", " attempt wins.", TRAILER]))
+    monkeypatch.setattr(mentor_flow, "_mentor_llm", ProviderRouter([first, second]))
+
+    events = stream_turn(api, "stream-failover")
+
+    kinds = [event for event, _ in events]
+    assert kinds.index("reset") > kinds.index("token")
+    assert shown_reply(events) == "Second attempt wins."
+    assert events[-1] == ("done", {"response": "Second attempt wins.",
+                                   "analytics": {"sentiment": "neutral", "topic": "general"}})
+
+
+def test_failure_before_any_reply_text_needs_no_reset(api, monkeypatch):
+    # Only the held-back RESPONSE header had arrived when the first provider failed
+    first = ChatModelProvider("first", ScriptedChatModel(tokens=["RESPONSE:", "\nLost"], fail_at=1))
+    second = ChatModelProvider("second", ScriptedChatModel(tokens=["RESPONSE:\n", "Second", TRAILER]))
+    monkeypatch.setattr(mentor_flow, "_mentor_llm", ProviderRouter([first, second]))
+
+    events = stream_turn(api, "stream-header-only")
+
+    assert [event for event, _ in events] == ["token", "done"]
+    assert shown_reply(events) == "Second"
+
+
+def test_streamed_turns_are_not_hedged(api, monkeypatch):
+    slow = ChatModelProvider("slow", ScriptedChatModel(tokens=["RESPONSE:\n", "Slow but sure", TRAILER], delay=0.2))
+    fast = ChatModelProvider("fast", ScriptedChatModel(tokens=["RESPONSE:\n", "Fast", TRAILER]))
+    monkeypatch.setattr(mentor_flow, "_mentor_llm", ProviderRouter([slow, fast], hedge_delay=0.01))
+    monkeypatch.setattr(mentor_flow, "LLM_HEDGE_REQUESTS", True)
+
+    events = stream_turn(api, "stream-hedge")
+
+    assert shown_reply(events) == "Slow but sure"
+    assert (slow.calls, fast.calls) == (1, 0)
@@ -0,0 +1,76 @@
+import json
+import pytest
+from mentor_agent.memory.codecs import MAGIC, HEADER_SIZE, FORMAT_VERSION, FLAG_ZSTD, MemoryCodec, build_codec
+
+RECORD = {"profile": {"name": "Ana", "goal": "Ship v1 ✨"}, "tasks": [{"task": "write docs", "done": False}],
+          "history_offset": 3, "summary": "x" * 2000}
+SPECS = ["json", "orjson", "msgpack", "json+zstd", "orjson+zstd", "msgpack+zstd"]
+PACKAGES = {"orjson": "orjson", "msgpack": "msgpack", "zstd": "zstandard"}
+
+
+def codec_or_skip(spec: str) -> MemoryCodec:
+    for part in spec.split("+"):
+        if part in PACKAGES:
+            pytest.importorskip(PACKAGES[part])
+    return build_codec(spec)
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_records_round_trip_behind_a_header(spec):
+    codec = codec_or_skip(spec)
+    encoded = codec.encode(RECORD)
+
+    assert encoded[:len(MAGIC)] == MAGIC
+    version, serializer_id, flags = encoded[len(MAGIC):HEADER_SIZE]
+    assert (version, serializer_id) == (FORMAT_VERSION, codec.serializer.id)
+    assert bool(flags & FLAG_ZSTD) == codec.compress
+    assert codec.decode(encoded) == RECORD
+    assert codec.is_current(encoded)
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_any_codec_reads_rows_another_one_wrote(spec):
+    writer = codec_or_skip(spec)
+    reader = build_codec("json")
+    assert reader.decode(writer.encode(RECORD)) == RECORD
+    # orjson writes the same wire format as json, so its rows need no rewrite
+    assert reader.is_current(writer.encode(RECORD)) == (spec in ("json", "orjson"))
+
+
+def test_small_bodies_are_stored_uncompressed():
+    codec = codec_or_skip("json+zstd")
+    small = {"input": "hi", "response": "hello"}
+    encoded = codec.encode(small)
+    assert not encoded[HEADER_SIZE - 1] & FLAG_ZSTD
+    assert encoded[HEADER_SIZE:] == json.dumps(small, separators=(",", ":")).encode()
+    assert codec.is_current(encoded)
+
+
+def test_legacy_json_text_still_decodes():
+    codec = build_codec("auto")
+    legacy = json.dumps(RECORD)
+    assert codec.decode(legacy) == RECORD
+    assert codec.decode(legacy.encode()) == RECORD
+    assert not codec.is_current(legacy)
+
+
+def test_rows_from_a_newer_format_are_refused():
+    codec = build_codec("json")
+    newer = MAGIC + bytes((FORMAT_VERSION + 1, 1, 0)) + b"{}"
+    with pytest.raises(ValueError, match="newer"):
+        codec.decode(newer)
+
+
+def test_reencode_rewrites_legacy_rows_in_place(memory_store):
+    history = [{"input": "hi", "response": "hello"}]
+    memory_store._conn.execute("INSERT INTO user_records (user_id, data) VALUES (?, ?)",
+                               ("ana", json.dumps({"profile": RECORD["profile"]})))
+    memory_store._conn.execute("INSERT INTO user_history (user_id, seq, entry) VALUES (?, ?, ?)",
+                               ("ana", 0, json.dumps(history[0])))
+    memory_store.save("ben", {"profile": {"name": "Ben"}})
+
+    assert memory_store.reencode() == {"records": 1, "history": 1}
+    assert memory_store.load("ana") == {"profile": RECORD["profile"], "history": history}
+    stored = [data for (data,) in memory_store._conn.execute("SELECT data FROM user_records")]
+    assert all(memory_store.codec.is_current(data) for data in stored)
+    assert memory_store.reencode() == {"records": 0, "history": 0}
@@ -0,0 +1,43 @@
+from conftest import API
+from mentor_agent.services.conversation_log import conversation_log
+
+SETUP = {"user_id": "log-user", "name": "Dana", "education": "BSc", "goal": "Ship my first SaaS"}
+
+
+async def setup_and_chat(client, message: str):
+    response = await client.post(f"{API}/setup/", data=SETUP)
+    assert response.status_code == 200, response.text
+    response = await client.post(f"{API}/chat/", params={"bot_id": SETUP["user_id"]}, data={"text_input": message})
+    assert response.status_code == 200, response.text
+
+
+def test_turns_after_a_new_setup_are_persisted(api, auth_headers):
+    headers = auth_headers(SETUP["user_id"])
+
+    async def run(client):
+        await setup_and_chat(client, "First plan, please")
+        await setup_and_chat(client, "Second plan, please")
+        conversation_log.flush()
+        response = await client.get(f"{API}/chat/history", params={"bot_id": SETUP["user_id"]}, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()["turns"]
+
+    turns = api(run)
+    stored = conversation_log.sink.page(SETUP["user_id"], None, 10)
+    assert [row["input"] for row in stored] == ["Second plan, please", "First plan, please"]
+    assert [turn["input"] for turn in turns] == ["Second plan, please", "First plan, please"]
+    assert conversation_log.stats()["duplicates"] == 0
+
+
+def test_history_is_only_readable_by_the_bot_owner(api, auth_headers):
+    intruder = auth_headers("history-intruder")
+
+    async def run(client):
+        await setup_and_chat(client, "Private plans")
+        anonymous = await client.get(f"{API}/chat/history", params={"bot_id": SETUP["user_id"]})
+        other_user = await client.get(f"{API}/chat/history", params={"bot_id": SETUP["user_id"]}, headers=intruder)
+        return anonymous.status_code, other_user.status_code
+
+    anonymous, other_user = api(run)
+    assert anonymous in (401, 403)
+    assert other_user == 403
@@ -0,0 +1,43 @@
+import asyncio
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+from mentor_agent.agents import groq_agent
+from mentor_agent.agents.llm_gateway import LLMGateway
+
+
+class ToolCallingChatModel(BaseChatModel):
+    """Asks for the `count_tasks` tool, then replies with the tool's result"""
+
+    @property
+    def _llm_type(self) -> str:
+        return "tool-calling"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        results = [message.content for message in messages if isinstance(message, ToolMessage)]
+        if results:
+            message = AIMessage(f"You have {results[-1]} tasks")
+        else:
+            message = AIMessage("", tool_calls=[{"name": "count_tasks", "args": {}, "id": "call-1"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@tool
+def count_tasks() -> int:
+    """Number of open tasks"""
+    return 3
+
+
+def test_agent_with_tools_returns_its_final_reply(monkeypatch):
+    monkeypatch.setattr(groq_agent, "ChatGroq", lambda **kwargs: ToolCallingChatModel())
+    monkeypatch.setattr(groq_agent, "get_gateway", lambda name: LLMGateway(name, rpm=6000, tpm=10 ** 7))
+    agent = groq_agent.GroqMentorAgent(groq_api_key="test", tools=[count_tasks])
+
+    expected = {"input": "How busy am I?", "output": "You have 3 tasks"}
+    assert agent.run("How busy am I?") == expected
+    assert asyncio.run(agent.arun("How busy am I?")) == expected
+    assert asyncio.run(agent.abatch(["How busy am I?"])) == [expected]
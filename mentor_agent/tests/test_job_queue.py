@@ -0,0 +1,109 @@
+import pytest
+from conftest import API
+from mentor_agent.services import job_queue as jobs
+from mentor_agent.services.job_queue import JobQueue, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    """make_queue(**options) -> JobQueue over the test's database file; workers are stopped afterwards"""
+    queues = []
+
+    def make(**options) -> JobQueue:
+        queue = JobQueue(db_path=str(tmp_path / "jobs.db"), **options)
+        queues.append(queue)
+        return queue
+    yield make
+    for queue in queues:
+        queue.stop()
+
+
+def echo(context, payload: dict) -> dict:
+    context.progress(0.5, "halfway")
+    return {"echo": payload["text"]}
+
+
+def fail(context, payload: dict):
+    raise ValueError("unreadable document")
+
+
+def test_jobs_run_and_keep_their_result(make_queue):
+    queue = make_queue(workers=1)
+    queue.register("echo", echo)
+    job_id = queue.submit("echo", {"text": "hi"}, user_id="ana")
+    assert queue.get(job_id)["status"] == QUEUED
+
+    queue.start()
+    queue._queue.join()
+    job = queue.get(job_id)
+    assert (job["status"], job["progress"], job["message"], job["result"]) == (SUCCEEDED, 1.0, "done", {"echo": "hi"})
+    assert job["user_id"] == "ana"
+
+
+def test_handler_errors_mark_the_job_failed(make_queue):
+    queue = make_queue(workers=1)
+    queue.register("fail", fail)
+    job_id = queue.submit("fail", {})
+    queue.start()
+    queue._queue.join()
+    job = queue.get(job_id)
+    assert (job["status"], job["error"], job["result"]) == (FAILED, "unreadable document", None)
+
+
+def test_unknown_job_kinds_are_refused(make_queue):
+    with pytest.raises(ValueError, match="No handler"):
+        make_queue().submit("transcode", {})
+
+
+def test_unfinished_jobs_are_picked_up_after_a_restart(make_queue, monkeypatch):
+    before = make_queue()
+    before.register("echo", echo)
+    queued = before.submit("echo", {"text": "queued"})
+    stale = before.submit("echo", {"text": "stale"})
+    before._claim(stale)  # claimed by a process that then died
+
+    after = make_queue(workers=1)
+    after.register("echo", echo)
+    monkeypatch.setattr(jobs, "JOB_STALE_AFTER", 0)
+    after.start()
+    after._queue.join()
+    assert [after.get(job_id)["status"] for job_id in (queued, stale)] == [SUCCEEDED, SUCCEEDED]
+
+
+def test_running_jobs_that_are_still_fresh_are_left_alone(make_queue):
+    before = make_queue()
+    before.register("echo", echo)
+    job_id = before.submit("echo", {"text": "busy"})
+    before._claim(job_id)  # another live worker process is on it
+
+    after = make_queue(workers=1)
+    after.register("echo", echo)
+    after.start()
+    after._queue.join()
+    assert after.get(job_id)["status"] == RUNNING
+
+
+def test_a_job_runs_in_only_one_process(make_queue):
+    calls = []
+    workers = [make_queue(), make_queue()]
+    for queue in workers:
+        queue.register("count", lambda context, payload: calls.append(payload))
+    job_id = workers[0].submit("count", {"n": 1})
+
+    for queue in workers:
+        queue._run(job_id)
+    assert calls == [{"n": 1}]
+    assert workers[1].get(job_id)["status"] == SUCCEEDED
+
+
+def test_job_status_route(api, monkeypatch):
+    monkeypatch.setitem(jobs.job_queue._handlers, "echo", echo)
+    job_id = jobs.job_queue.submit("echo", {"text": "hi"})
+    jobs.job_queue._run(job_id)
+
+    async def run(client):
+        found = await client.get(f"{API}/jobs/{job_id}")
+        missing = await client.get(f"{API}/jobs/not-a-job")
+        return found.status_code, found.json()["result"], missing.status_code
+
+    assert api(run) == (200, {"echo": "hi"}, 404)
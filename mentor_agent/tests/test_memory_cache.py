@@ -0,0 +1,120 @@
+import pytest
+from mentor_agent.memory.cache import MemoryCache
+from mentor_agent.memory.store import SQLiteMemoryStore
+
+
+class CountingStore:
+    """Forwards to a store, counting the writes that reach it"""
+
+    def __init__(self, store, fail: bool = False):
+        self.store = store
+        self.fail = fail
+        self.saves = 0
+        self.appends = 0
+
+    def load(self, user_id: str) -> dict:
+        return self.store.load(user_id)
+
+    def save(self, user_id: str, user_data: dict):
+        if self.fail:
+            raise OSError("disk full")
+        self.saves += 1
+        self.store.save(user_id, user_data)
+
+    def append_history(self, user_id: str, entries: list):
+        if self.fail:
+            raise OSError("disk full")
+        self.appends += 1
+        self.store.append_history(user_id, entries)
+
+
+@pytest.fixture
+def make_cache():
+    """make_cache(store, **options) -> MemoryCache that only flushes when asked; closed after the test"""
+    caches = []
+
+    def make(store, **options) -> MemoryCache:
+        cache = MemoryCache(store, flush_interval=3600, **options)
+        caches.append(cache)
+        return cache
+    yield make
+    for cache in caches:
+        cache._stop.set()
+
+
+def record(goal: str, history: list = ()) -> dict:
+    return {"profile": {"goal": goal}, "tasks": [], "history": list(history)}
+
+
+def test_writes_are_coalesced_until_the_flush(memory_store, make_cache):
+    store = CountingStore(memory_store)
+    cache = make_cache(store)
+
+    cache.put("ana", record("Ship v1"))
+    cache.put("ana", record("Ship v2"))
+    cache.append_history("ana", {"input": "hi", "response": "hello"})
+    assert cache.get("ana")["profile"]["goal"] == "Ship v2"
+    assert store.saves == 0 and memory_store.load("ana") == {}
+
+    cache.flush()
+    assert (store.saves, store.appends) == (1, 0)
+    reopened = SQLiteMemoryStore(db_path=memory_store.db_path, legacy_path=None)
+    assert reopened.load("ana") == record("Ship v2", [{"input": "hi", "response": "hello"}])
+    assert cache.stats()["queued"] == 0
+
+
+def test_history_of_an_uncached_user_is_appended_without_a_full_save(memory_store, make_cache):
+    memory_store.save("ben", record("Launch", [{"input": "a", "response": "b"}]))
+    store = CountingStore(memory_store)
+    cache = make_cache(store)
+
+    cache.append_history("ben", {"input": "c", "response": "d"})
+    # A read before the flush already sees the queued entry
+    assert [entry["input"] for entry in cache.get("ben")["history"]] == ["a", "c"]
+    cache.flush()
+    assert (store.saves, store.appends) == (0, 1)
+    assert [entry["input"] for entry in memory_store.load("ben")["history"]] == ["a", "c"]
+
+
+def test_least_recently_used_records_are_evicted(memory_store, make_cache):
+    for user_id in ("u1", "u2", "u3"):
+        memory_store.save(user_id, record(user_id))
+    size = MemoryCache._estimate_size(memory_store.load("u1"))
+    cache = make_cache(memory_store, max_bytes=2 * size)
+
+    cache.get("u1")
+    cache.get("u2")
+    cache.get("u1")  # u2 is now the least recently used
+    cache.get("u3")
+    assert list(cache._entries) == ["u1", "u3"]
+    assert cache.stats()["evictions"] == 1
+
+    cache.get("u1")
+    cache.get("u2")
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 4
+
+
+def test_an_evicted_record_is_read_back_from_the_write_queue(memory_store, make_cache):
+    size = MemoryCache._estimate_size(record("xx"))
+    cache = make_cache(memory_store, max_bytes=size)
+
+    cache.put("cara", record("c1"))
+    cache.put("dan", record("d1"))  # evicts cara before her write reached the store
+    assert "cara" not in cache._entries
+    assert cache.get("cara")["profile"]["goal"] == "c1"
+    cache.flush()
+    assert memory_store.load("cara")["profile"]["goal"] == "c1"
+
+
+def test_a_failed_flush_keeps_the_writes_queued(memory_store, make_cache):
+    store = CountingStore(memory_store, fail=True)
+    cache = make_cache(store)
+
+    cache.put("eve", record("Grow"))
+    with pytest.raises(OSError):
+        cache.flush()
+    assert cache.stats()["queued"] == 1
+
+    store.fail = False
+    cache.flush()
+    assert memory_store.load("eve")["profile"]["goal"] == "Grow"
@@ -0,0 +1,44 @@
+import pytest
+from mentor_agent.states.output_parser import parse_mentor_output, StreamingReplyParser
+
+WEEK_PLAN = ("RESPONSE:\nWeek plan:\n\n**Topic:** Arrays\n- two pointers on sorted arrays\n- sliding window\n"
+             "SENTIMENT: positive\nTOPIC: DSA")
+WEEK_PLAN_REPLY = "Week plan:\n\n**Topic:** Arrays\n- two pointers on sorted arrays\n- sliding window"
+STUCK = "Sentiment: people often feel stuck at this stage, and that is fine."
+
+
+def streamed_reply(text: str, chunk: int) -> str:
+    """What a streaming client shows when the model output arrives in `chunk`-character tokens"""
+    parser = StreamingReplyParser()
+    shown = [parser.feed(text[i:i + chunk]) for i in range(0, len(text), chunk)]
+    return "".join(shown) + parser.flush()
+
+
+def test_topic_line_inside_the_reply_is_kept():
+    result = parse_mentor_output(WEEK_PLAN)
+    assert result["reply"] == WEEK_PLAN_REPLY
+    assert result["analytics"] == {"sentiment": "positive", "topic": "DSA"}
+
+
+def test_reply_starting_with_sentiment_is_kept():
+    assert parse_mentor_output(STUCK)["reply"] == STUCK
+    structured = parse_mentor_output(f"RESPONSE:\n{STUCK}\n\nSENTIMENT: neutral\nTOPIC: motivation")
+    assert structured["reply"] == STUCK
+    assert structured["analytics"] == {"sentiment": "neutral", "topic": "motivation"}
+
+
+def test_trailer_with_markdown_is_removed():
+    result = parse_mentor_output("**RESPONSE:**\nShip it.\n\n**SENTIMENT:** Positive 😊\n**TOPIC:** Career\n")
+    assert result["reply"] == "Ship it."
+    assert result["analytics"] == {"sentiment": "positive", "topic": "Career"}
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 7, 1000])
+@pytest.mark.parametrize("text, reply", [
+    (WEEK_PLAN, WEEK_PLAN_REPLY),
+    (STUCK, STUCK),
+    (f"RESPONSE:\n{STUCK}\nSENTIMENT: neutral\nTOPIC: motivation", STUCK),
+])
+def test_streamed_reply_matches_parsed_reply(text, reply, chunk):
+    assert streamed_reply(text, chunk) == reply
+    assert parse_mentor_output(text)["reply"] == reply
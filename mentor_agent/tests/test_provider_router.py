@@ -0,0 +1,108 @@
+import time
+import asyncio
+import pytest
+from mentor_agent.agents import provider_router
+from mentor_agent.agents.fake_agent import FakeMentorAgent
+from mentor_agent.agents.provider_router import ProviderRouter, NoProviderAvailable, CIRCUIT_FAILURES, CIRCUIT_COOLDOWN
+
+
+def broken(name: str = "broken") -> FakeMentorAgent:
+    return FakeMentorAgent(name=name, latency=0, failure_rate=1.0)
+
+
+def healthy(name: str = "healthy", latency: float = 0) -> FakeMentorAgent:
+    return FakeMentorAgent(name=name, latency=latency)
+
+
+def test_calls_fail_over_down_the_ranking():
+    bad, good = broken(), healthy()
+    router = ProviderRouter([bad, good])
+
+    assert router.run("hi")["input"] == "hi"
+    assert asyncio.run(router.arun("hi"))["input"] == "hi"
+    assert (bad.calls, good.calls) == (1, 2)  # after its first failure the broken provider ranks last
+    assert router.snapshot()["broken"]["error_rate"] > 0
+    assert router.snapshot()["healthy"]["error_rate"] == 0
+
+
+def test_no_provider_left_raises():
+    router = ProviderRouter([broken("a"), broken("b")])
+    with pytest.raises(NoProviderAvailable, match="a provider failure.*b provider failure"):
+        router.run("hi")
+    with pytest.raises(NoProviderAvailable):
+        asyncio.run(router.arun("hi"))
+
+
+def test_providers_rank_by_latency_errors_and_cost():
+    fast, slow, pricey = healthy("fast"), healthy("slow"), healthy("pricey")
+    pricey.cost_per_1k_tokens = 1.0
+    router = ProviderRouter([slow, pricey, fast], cost_weight=2.0)
+    for _ in range(5):
+        router.stats["fast"].record(0.1, ok=True)
+        router.stats["slow"].record(1.0, ok=True)
+        router.stats["pricey"].record(0.1, ok=True)
+    assert [p.name for p in router.ranked()] == ["fast", "slow", "pricey"]
+
+    # Errors outweigh latency: two recent failures put the fast provider behind the slow one
+    router.stats["fast"].record(0.1, ok=False)
+    router.stats["fast"].record(0.1, ok=False)
+    assert [p.name for p in router.ranked()] == ["slow", "fast", "pricey"]
+
+
+def test_repeated_failures_open_the_circuit_until_the_cooldown(fake_clock):
+    clock = fake_clock(provider_router)
+    bad, good = broken(), healthy()
+    router = ProviderRouter([bad, good])
+    for _ in range(CIRCUIT_FAILURES):
+        router.stats["broken"].record(0.1, ok=False)
+
+    assert router.snapshot()["broken"]["circuit_open"]
+    assert [p.name for p in router.ranked()] == ["healthy"]
+    router.run("hi")
+    assert bad.calls == 0
+
+    clock.advance(CIRCUIT_COOLDOWN)
+    assert not router.snapshot()["broken"]["circuit_open"]
+    assert [p.name for p in router.ranked()] == ["healthy", "broken"]
+
+
+def test_with_every_circuit_open_all_providers_are_still_tried():
+    a, b = broken("a"), healthy("b")
+    router = ProviderRouter([a, b])
+    for stats in router.stats.values():
+        for _ in range(CIRCUIT_FAILURES):
+            stats.record(0.1, ok=False)
+
+    assert router.run("hi")["input"] == "hi"
+    assert (a.calls, b.calls) == (1, 1)
+
+
+def test_a_hedged_call_takes_the_first_answer():
+    slow, fast = healthy("slow", latency=1.0), healthy("fast", latency=0.01)
+    router = ProviderRouter([slow, fast], hedge_delay=0.05)
+
+    started = time.monotonic()
+    assert asyncio.run(router.arun("hi", hedge=True))["input"] == "hi"
+    assert time.monotonic() - started < 0.5
+    assert (slow.calls, fast.calls) == (0, 1)
+    # The cancelled slow call isn't held against its provider
+    assert (router.stats["slow"].calls, router.stats["slow"].error_rate) == (0, 0.0)
+
+
+def test_without_hedging_only_the_best_provider_is_called():
+    slow, fast = healthy("slow", latency=0.1), healthy("fast", latency=0.01)
+    router = ProviderRouter([slow, fast], hedge_delay=0.01)
+
+    asyncio.run(router.arun("hi", hedge=False))
+    assert (slow.calls, fast.calls) == (1, 0)
+
+
+def test_prompts_a_batch_fails_are_retried_singly_elsewhere():
+    bad, good = broken(), healthy()
+    router = ProviderRouter([bad, good])
+
+    results = asyncio.run(router.abatch(["a", "b", "c"]))
+    assert [result["input"] for result in results] == ["a", "b", "c"]
+    assert router.snapshot()["broken"]["calls"] == 3
+    assert router.snapshot()["broken"]["circuit_open"]
+    assert good.calls == 3
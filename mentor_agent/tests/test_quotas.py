@@ -0,0 +1,159 @@
+import asyncio
+import pytest
+from conftest import API
+
+PROFILE = {"name": "Ada", "education": "BSc", "goal": "Ship"}
+
+
+def test_setup_uploads_count_against_the_upload_quota(api, tier_limits):
+    tier_limits(upload_bytes_per_day=1024)
+
+    async def run(client):
+        response = await client.post(f"{API}/setup/", data={"user_id": "quota-setup-upload", **PROFILE},
+                                     files={"file": ("notes.pdf", b"%PDF" + b"x" * 2048, "application/pdf")})
+        return response.status_code
+
+    assert api(run) == 413
+
+
+def test_setup_counts_against_the_request_rate(api, tier_limits):
+    tier_limits(requests_per_minute=2)
+
+    async def run(client):
+        return [(await client.post(f"{API}/setup/", data={"user_id": "quota-setup-rate", **PROFILE})).status_code
+                for _ in range(3)]
+
+    assert api(run) == [200, 200, 429]
+
+
+def test_deduplicated_chat_turns_are_charged_once(api, auth_headers, tier_limits, monkeypatch):
+    from mentor_agent.agents.fake_agent import FakeMentorAgent
+    from mentor_agent.agents.provider_router import ProviderRouter
+    from mentor_agent.services.turn_coordinator import chat_turns
+    from mentor_agent.states import mentor_flow
+
+    manager = tier_limits(llm_tokens_per_day=1_000_000)
+    # Slow enough that the second request arrives while the first turn is still running
+    monkeypatch.setattr(mentor_flow, "_mentor_llm", ProviderRouter([FakeMentorAgent(latency=0.2)]))
+    deduplicated = chat_turns.deduplicated
+
+    async def run(client):
+        await client.post(f"{API}/setup/", data={"user_id": "quota-dedup-bot", **PROFILE})
+        requests = [client.post(f"{API}/chat/", params={"bot_id": "quota-dedup-bot"},
+                                data={"text_input": "Plan my week"}, headers=auth_headers(user_id))
+                    for user_id in ("quota-dedup-a", "quota-dedup-b")]
+        return [response.status_code for response in await asyncio.gather(*requests)]
+
+    assert api(run) == [200, 200]
+    assert chat_turns.deduplicated == deduplicated + 1
+    buckets = manager._limiters["free", "llm_tokens_per_day"]._buckets
+    charged = [1_000_000 - buckets[user_id][0] for user_id in ("quota-dedup-a", "quota-dedup-b")]
+    # Only the caller whose request ran the LLM call pays for it
+    assert sorted(charged)[0] == 0 and sorted(charged)[1] > 0
+
+
+def test_token_buckets_refuse_when_empty_and_refill_over_time(fake_clock):
+    from mentor_agent.backends import rate_limit
+    clock = fake_clock(rate_limit)
+    buckets = rate_limit.KeyedTokenBuckets(limit=3, period=60)
+
+    assert [buckets.try_acquire("ana") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.try_acquire("ana") == pytest.approx(20.0)
+    assert buckets.try_acquire("ben") == 0.0  # every key has its own bucket
+
+    clock.advance(20)
+    assert buckets.try_acquire("ana") == 0.0
+    clock.advance(3600)
+    assert buckets.try_acquire("ana", 3) == 0.0  # refills up to the limit, not beyond
+    assert buckets.try_acquire("ana") > 0
+
+
+def test_usage_charged_afterwards_can_overdraw_the_bucket(fake_clock):
+    from mentor_agent.backends import rate_limit
+    clock = fake_clock(rate_limit)
+    buckets = rate_limit.KeyedTokenBuckets(limit=100, period=100)
+
+    assert buckets.wait_time("ana") == 0.0
+    buckets.charge("ana", 150)
+    # Blocked until the balance is positive again: 50 owed plus one token at 1 token/s
+    assert buckets.wait_time("ana") == pytest.approx(51.0)
+    clock.advance(51)
+    assert buckets.wait_time("ana") == 0.0
+
+
+def test_token_buckets_forget_the_least_recently_used_keys(fake_clock):
+    from mentor_agent.backends import rate_limit
+    fake_clock(rate_limit)
+    buckets = rate_limit.KeyedTokenBuckets(limit=1, period=60, max_keys=2)
+
+    buckets.try_acquire("a")
+    buckets.try_acquire("b")
+    buckets.try_acquire("a")
+    buckets.try_acquire("c")
+    assert list(buckets._buckets) == ["a", "c"]
+
+
+def test_window_limiter_counts_in_the_shared_backend(fake_clock):
+    from mentor_agent.backends import rate_limit
+    from mentor_agent.backends.memory import InMemoryBackend
+    clock = fake_clock(rate_limit)
+    clock.now = 600.0  # start of a 60 s window
+    backend = InMemoryBackend()
+    # Two workers' limiters over the same backend share one counter per key
+    workers = [rate_limit.KeyedWindowLimiter(backend, "quota:free:rpm", limit=3, period=60) for _ in range(2)]
+
+    assert [workers[i % 2].try_acquire("ana") for i in range(3)] == [0.0, 0.0, 0.0]
+    clock.advance(15)
+    assert workers[0].try_acquire("ana") == pytest.approx(45.0)
+    assert workers[1].try_acquire("ben") == 0.0
+
+    workers[0].charge("ben", 5)
+    assert workers[1].wait_time("ben") == pytest.approx(45.0)
+    clock.advance(45)  # the next window starts from zero
+    assert workers[1].wait_time("ben") == 0.0
+    assert workers[0].try_acquire("ana", 3) == 0.0
+
+
+def test_fixed_window_limiter_is_shared_by_every_worker(fake_clock):
+    from mentor_agent.backends import rate_limit
+    from mentor_agent.backends.memory import InMemoryBackend
+    clock = fake_clock(rate_limit)
+    clock.now = 600.0
+    backend = InMemoryBackend()
+    workers = [rate_limit.FixedWindowLimiter(backend, "groq:rpm", limit=2, window=60) for _ in range(2)]
+
+    assert workers[0].try_acquire() == 0.0
+    assert workers[1].try_acquire() == 0.0
+    # Refused with the time left in the window plus at most 5% jitter
+    assert 60.0 <= workers[0].try_acquire() <= 63.0
+    clock.advance(60)
+    assert workers[1].try_acquire() == 0.0
+
+
+def test_quota_manager_picks_limiters_by_backend_and_tier():
+    from mentor_agent.backends.memory import InMemoryBackend
+    from mentor_agent.backends.rate_limit import KeyedTokenBuckets, KeyedWindowLimiter
+    from mentor_agent.services.quotas import Caller, QuotaExceeded, QuotaManager, DEFAULT_TIER_LIMITS
+
+    class SharedBackend(InMemoryBackend):
+        shared = True
+
+    local = QuotaManager(backend=InMemoryBackend(), tiers=DEFAULT_TIER_LIMITS, enabled=True)
+    shared = QuotaManager(backend=SharedBackend(), tiers=DEFAULT_TIER_LIMITS, enabled=True)
+    assert isinstance(local._limiters["free", "requests_per_minute"], KeyedTokenBuckets)
+    assert isinstance(shared._limiters["free", "requests_per_minute"], KeyedWindowLimiter)
+
+    # A tier without configured limits is held to the anonymous tier's
+    assert local._limiter(Caller("ana", "trial"), "requests_per_minute") is local._limiters["free", "requests_per_minute"]
+    # An upload larger than the whole daily allowance can't succeed by waiting
+    with pytest.raises(QuotaExceeded) as rejected:
+        local.check_upload(Caller("ana", "free"), DEFAULT_TIER_LIMITS["free"]["upload_bytes_per_day"] + 1)
+    assert rejected.value.retry_after is None
+
+
+def test_unknown_limits_in_the_tier_config_are_refused():
+    from mentor_agent.services.quotas import parse_tier_limits
+
+    assert parse_tier_limits('{"pro": {"requests_per_minute": 60}}')["pro"]["requests_per_minute"] == 60
+    with pytest.raises(ValueError, match="requests_per_hour"):
+        parse_tier_limits('{"pro": {"requests_per_hour": 60}}')
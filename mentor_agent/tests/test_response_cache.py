@@ -0,0 +1,79 @@
+import re
+from mentor_agent.agents.response_cache import response_cache
+from mentor_agent.memory.store import update_user_memory
+from mentor_agent.models.conversation_state import MentorState
+from mentor_agent.states import mentor_flow
+from conftest import API
+
+PROFILE = {"personality": "Concise", "mentor_type": "Tech Mentor", "goal": "Ship my first SaaS", "education": "BSc"}
+QUESTION = "How should I price my product?"
+
+
+class EchoNameLLM:
+    """Replies with the name from the prompt, so a leaked reply is easy to spot"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def run(self, prompt: str):
+        self.prompts.append(prompt)
+        name = re.search(r"^Name: (.*)$", prompt, re.MULTILINE).group(1)
+        return {"output": f"RESPONSE:\nHi {name}, start with one paid tier.\nSENTIMENT: neutral\nTOPIC: pricing"}
+
+
+def setup_user(user_id: str, name: str, history: list = (), summary: str = ""):
+    update_user_memory(user_id, {"profile": {**PROFILE, "user_id": user_id, "name": name},
+                                 "tasks": [{"task": f"{name}'s secret task"}], "history": list(history),
+                                 "summary": summary, "documents": [], "last_check": None})
+
+
+def ask(user_id: str, question: str = QUESTION) -> str:
+    return mentor_flow.analyze_and_respond(MentorState(user_id=user_id, input=question))["reply"]
+
+
+def test_shared_replies_carry_no_personal_context(monkeypatch):
+    llm = EchoNameLLM()
+    monkeypatch.setattr(mentor_flow, "get_mentor_llm", lambda: llm)
+    monkeypatch.setattr(response_cache, "enabled", True)
+
+    setup_user("cache-alice", "Alice", history=[{"input": "I run a bakery", "response": "Nice"}],
+               summary="Alice wants to open a second bakery")
+    setup_user("cache-bob", "Bob", history=[{"input": "I sell plugins", "response": "Cool"}])
+
+    alice_reply = ask("cache-alice")
+    # Same profile fields and question: Bob is answered from the cache despite his own history
+    assert ask("cache-bob") == alice_reply
+    assert len(llm.prompts) == 1
+    for private in ("Alice", "bakery", "secret task"):
+        assert private not in llm.prompts[0] and private not in alice_reply
+    assert PROFILE["goal"] in llm.prompts[0]
+
+
+def test_personal_prompt_without_the_cache(monkeypatch):
+    llm = EchoNameLLM()
+    monkeypatch.setattr(mentor_flow, "get_mentor_llm", lambda: llm)
+
+    setup_user("nocache-carol", "Carol", history=[{"input": "I teach piano", "response": "Lovely"}])
+
+    assert "Carol" in ask("nocache-carol")
+    assert "I teach piano" in llm.prompts[0]
+
+
+def test_one_users_new_setup_keeps_the_replies_others_share(monkeypatch, api):
+    llm = EchoNameLLM()
+    monkeypatch.setattr(mentor_flow, "get_mentor_llm", lambda: llm)
+    monkeypatch.setattr(response_cache, "enabled", True)
+
+    setup_user("shared-dave", "Dave")
+    setup_user("shared-erin", "Erin")
+    ask("shared-dave", "Should I hire a designer?")
+
+    # Dave moves on to a new goal; Erin still has the profile the cached reply was made for
+    form = {**PROFILE, "user_id": "shared-dave", "name": "Dave", "goal": "Grow my newsletter"}
+    response = api(lambda client: client.post(f"{API}/setup/", data=form))
+    assert response.status_code == 200
+
+    ask("shared-erin", "Should I hire a designer?")
+    assert len(llm.prompts) == 1
+    ask("shared-dave", "Should I hire a designer?")
+    assert len(llm.prompts) == 2
@@ -0,0 +1,16 @@
+import os
+import sys
+import subprocess
+
+# Loaded on first use (or by the background warm-up), never by importing the app
+DEFERRED = ("numpy", "langchain_core", "langgraph", "langchain_groq", "supabase", "fitz", "docx")
+
+
+def test_importing_the_app_leaves_heavy_modules_unloaded():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    code = f"import sys, mentor_agent.main; print(*[m for m in {DEFERRED!r} if m in sys.modules])"
+    env = {**os.environ, "GROQ_API_KEY": "", "LLM_PROVIDERS": "groq"}
+    completed = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True,
+                               timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.splitlines()[-1] == ""
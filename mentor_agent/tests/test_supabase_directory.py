@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from supabase_auth.errors import AuthApiError
+from conftest import API
+from mentor_agent.services import auth_service, supabase_directory as directory_module
+from mentor_agent.services.supabase_directory import SupabaseUserDirectory
+
+
+class FakeAdmin:
+    """Supabase Auth admin API over a dict of email -> id, counting the pages it serves"""
+
+    def __init__(self, users: dict):
+        self.users = users
+        self.pages = 0
+
+    def list_users(self, page: int = 1, per_page: int = 50) -> list:
+        self.pages += 1
+        users = [SimpleNamespace(email=email, id=auth_id) for email, auth_id in self.users.items()]
+        return users[(page - 1) * per_page:page * per_page]
+
+    def create_user(self, attributes: dict):
+        raise AuthApiError("A user with this email address has already been registered", 422, "email_exists")
+
+
+def test_sync_pages_through_auth_and_answers_from_the_mirror():
+    admin = FakeAdmin({f"user{i}@example.com": f"id-{i}" for i in range(5)})
+    directory = SupabaseUserDirectory(admin=admin, page_size=2)
+
+    assert directory.sync() == 5
+    assert admin.pages == 3
+    assert directory.lookup(" User3@Example.com ") == "id-3"
+    assert not directory.exists("nobody@example.com")
+    assert (admin.pages, directory.resyncs) == (3, 0)
+
+
+def test_a_miss_on_a_stale_mirror_asks_auth_again(fake_clock):
+    clock = fake_clock(directory_module)
+    admin = FakeAdmin({"ana@example.com": "id-ana"})
+    directory = SupabaseUserDirectory(admin=admin, max_age=60, negative_ttl=30)
+    directory.sync()
+    # Created in Auth by someone else; no profile row needed
+    admin.users["ben@example.com"] = "id-ben"
+    assert directory.lookup("ben@example.com") is None
+
+    clock.advance(61)
+    assert directory.lookup("ben@example.com") == "id-ben"
+    assert directory.resyncs == 1
+    # The resync refreshed the mirror, so other misses are answered locally again
+    assert directory.lookup("cy@example.com") is None
+    assert directory.resyncs == 1
+
+
+def test_misses_are_remembered_until_their_ttl(fake_clock):
+    clock = fake_clock(directory_module)
+    directory = SupabaseUserDirectory(admin=FakeAdmin({}), max_age=0, negative_ttl=30)
+
+    assert directory.lookup("cy@example.com") is None
+    clock.advance(1)
+    assert directory.lookup("cy@example.com") is None
+    assert directory.resyncs == 1
+    clock.advance(30)
+    assert directory.lookup("cy@example.com") is None
+    assert directory.resyncs == 2
+
+
+def test_registering_an_email_auth_already_has_is_refused(api, monkeypatch):
+    admin = FakeAdmin({})
+    directory = SupabaseUserDirectory(admin=admin)
+    directory.sync()
+    monkeypatch.setattr(auth_service, "get_supabase", lambda: SimpleNamespace(auth=SimpleNamespace(admin=admin)))
+    monkeypatch.setattr(auth_service, "SUPABASE_SERVICE_ROLE_KEY", "service-role-key")
+    monkeypatch.setattr(auth_service, "supabase_directory", directory)
+
+    async def register(client):
+        return await client.post(f"{API}/auth/register", json={"email": "taken@example.com", "password": "pw",
+                                                               "name": "Taken"})
+
+    response = api(register)
+    assert (response.status_code, response.json()["detail"]) == (400, "User already exists in Supabase")
+    assert auth_service.user_repository.get_by_email("taken@example.com") is None
+    # The mirror missed this account, so the next check goes back to Auth
+    admin.users["taken@example.com"] = "id-taken"
+    assert directory.exists("taken@example.com")
+    assert directory.resyncs == 1
@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from mentor_agent.services.turn_coordinator import TurnCoordinator, UserBusy
+
+
+class Turns:
+    """Chat turns that take `delay` seconds, logging when each starts and ends"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.log = []
+        self.calls = 0
+
+    def __call__(self, name: str, fail: bool = False):
+        async def fn():
+            self.calls += 1
+            self.log.append(("start", name))
+            await asyncio.sleep(self.delay)
+            self.log.append(("end", name))
+            if fail:
+                raise RuntimeError(f"{name} failed")
+            return name
+        return fn
+
+
+def test_a_users_turns_run_one_at_a_time_in_arrival_order():
+    coordinator, turns = TurnCoordinator(), Turns()
+
+    async def main():
+        return await asyncio.gather(*(coordinator.run("ana", name, turns(name)) for name in ("one", "two", "three")))
+
+    assert asyncio.run(main()) == [("one", False), ("two", False), ("three", False)]
+    assert turns.log == [("start", "one"), ("end", "one"), ("start", "two"), ("end", "two"),
+                         ("start", "three"), ("end", "three")]
+    assert coordinator.stats()["users"] == 0
+
+
+def test_different_users_do_not_wait_on_each_other():
+    coordinator, turns = TurnCoordinator(), Turns()
+
+    async def main():
+        await asyncio.gather(coordinator.run("ana", "hi", turns("ana")), coordinator.run("ben", "hi", turns("ben")))
+
+    asyncio.run(main())
+    assert turns.log[:2] == [("start", "ana"), ("start", "ben")]
+
+
+def test_identical_in_flight_turns_share_one_call():
+    coordinator, turns = TurnCoordinator(), Turns()
+
+    async def main():
+        first = await asyncio.gather(coordinator.run("ana", "Plan my week!", turns("a")),
+                                     coordinator.run("ana", "plan my  week", turns("b")))
+        # Once the turn is done the same question is a new turn
+        return first, await coordinator.run("ana", "Plan my week!", turns("c"))
+
+    assert asyncio.run(main()) == ([("a", False), ("a", True)], ("c", False))
+    assert turns.calls == 2
+    assert coordinator.deduplicated == 1
+
+
+def test_a_full_queue_refuses_new_turns_but_not_duplicates():
+    coordinator, turns = TurnCoordinator(max_pending=2), Turns()
+
+    async def main():
+        running = [asyncio.ensure_future(coordinator.run("ana", name, turns(name))) for name in ("one", "two")]
+        await asyncio.sleep(0)
+        assert coordinator.is_full("ana") and not coordinator.is_full("ben")
+        with pytest.raises(UserBusy):
+            await coordinator.run("ana", "three", turns("three"))
+        duplicate = await coordinator.run("ana", "two", turns("two again"))
+        return duplicate, await asyncio.gather(*running)
+
+    assert asyncio.run(main()) == (("two", True), [("one", False), ("two", False)])
+    assert coordinator.rejected == 1
+    assert coordinator.stats() == {"users": 0, "pending": 0, "deduplicated": 1, "rejected": 1}
+
+
+def test_a_failed_turn_fails_every_caller_and_frees_the_slot():
+    coordinator, turns = TurnCoordinator(), Turns()
+
+    async def main():
+        results = await asyncio.gather(coordinator.run("ana", "hi", turns("a", fail=True)),
+                                       coordinator.run("ana", "hi", turns("b")), return_exceptions=True)
+        return results, await coordinator.run("ana", "hi", turns("c"))
+
+    results, retry = asyncio.run(main())
+    assert [str(result) for result in results] == ["a failed", "a failed"]
+    assert retry == ("c", False)
+
+
+def test_a_turn_completes_when_its_caller_goes_away():
+    coordinator, turns = TurnCoordinator(), Turns()
+
+    async def main():
+        caller = asyncio.ensure_future(coordinator.run("ana", "hi", turns("a")))
+        await asyncio.sleep(0.005)
+        caller.cancel()
+        await asyncio.sleep(turns.delay * 2)
+
+    asyncio.run(main())
+    assert turns.log == [("start", "a"), ("end", "a")]
+    assert coordinator.stats()["pending"] == 0
+
+
+def test_streamed_turns_queue_with_the_users_other_turns():
+    coordinator, turns = TurnCoordinator(), Turns()
+
+    async def streamed():
+        async with coordinator.turn("ana"):
+            await turns("streamed")()
+
+    async def main():
+        await asyncio.gather(coordinator.run("ana", "hi", turns("plain")), streamed())
+
+    asyncio.run(main())
+    # One finishes before the other starts
+    assert [event for event, _ in turns.log] == ["start", "end", "start", "end"]
+    assert turns.log[0][1] == turns.log[1][1]
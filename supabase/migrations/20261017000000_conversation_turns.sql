@@ -0,0 +1,37 @@
+/*
+  # Conversation turns
+
+  1. Tables
+    - `conversation_turns` - one row per chat turn, written in batches by the API
+      - `bot_id` is the mentor bot id the API chats under
+      - `seq` is the turn's position in that bot's history
+      - `idempotency_key` (`<bot_id>:<seq>`) makes retried batch inserts no-ops
+      - `conversation_id` optionally links the turn to a `conversations` row
+
+  2. Security
+    - Row Level Security enabled; the API writes with the service role key
+    - Users can read turns of their own conversations
+*/
+
+CREATE TABLE IF NOT EXISTS conversation_turns (
+  id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+  conversation_id uuid REFERENCES conversations(id) ON DELETE CASCADE,
+  bot_id text NOT NULL,
+  seq integer NOT NULL,
+  idempotency_key text NOT NULL UNIQUE,
+  input text NOT NULL,
+  response text NOT NULL,
+  analytics jsonb NOT NULL DEFAULT '{}',
+  created_at timestamptz NOT NULL DEFAULT now(),
+  UNIQUE(bot_id, seq)
+);
+
+-- Keyset pagination reads a bot's turns newest first by seq
+CREATE INDEX IF NOT EXISTS conversation_turns_bot_seq_idx ON conversation_turns (bot_id, seq DESC);
+
+ALTER TABLE conversation_turns ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view turns of their own conversations" ON conversation_turns
+  FOR SELECT USING (
+    conversation_id IN (SELECT id FROM conversations WHERE user_id = auth.uid())
+  );